@@ -1,44 +1,63 @@
 from datetime import datetime, timedelta
+from functools import lru_cache
 import hashlib
 import secrets
 from typing import Optional
 from uuid import UUID
 import logging
 
-from jose import JWTError, jwt
-from passlib.context import CryptContext
-from passlib.exc import UnknownHashError
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import lambda_stmt, select
+from sqlalchemy.orm import Session, joinedload
 
 from app.config import (
+    DB_REPLICA_STICKY_COOKIE_NAME,
     JWT_SECRET_KEY,
     JWT_ALGORITHM,
     JWT_ACCESS_EXPIRE_MINUTES,
     JWT_REFRESH_EXPIRE_DAYS,
 )
-from app.database import get_db
+from app.database import DatabaseRunner, get_db, get_db_runner, get_read_db_runner, recent_writers
+from app.hot_queries import hot_query
 from app.models import User
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 logger = logging.getLogger(__name__)
 
+# passlib/bcrypt and jose (with its cryptography backend) are imported on first
+# use rather than at startup, so a cold instance answers sooner.
+
+
+@lru_cache(maxsize=1)
+def _password_context():
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def preload_password_hashing() -> None:
+    """Resolve passlib's bcrypt backend without paying for a full hash."""
+    _password_context().handler("bcrypt").get_backend()
+
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return _password_context().hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
+    from passlib.exc import UnknownHashError
+
     try:
-        return pwd_context.verify(plain_password, hashed_password)
+        return _password_context().verify(plain_password, hashed_password)
     except (UnknownHashError, ValueError):
         logger.warning("Unable to verify password due to invalid hash format.")
         return False
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    from jose import jwt
+
     to_encode = data.copy()
     to_encode["type"] = "access"
     if expires_delta:
@@ -60,6 +79,8 @@ def hash_refresh_token(token: str) -> str:
 
 
 def decode_token(token: str, expected_type: Optional[str] = None) -> Optional[dict]:
+    from jose import JWTError, jwt
+
     try:
         payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
         if expected_type and payload.get("type") != expected_type:
@@ -69,31 +90,74 @@ def decode_token(token: str, expected_type: Optional[str] = None) -> Optional[di
         return None
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-) -> User:
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Token inválido ou expirado.",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+def _user_id_from_access_token(token: str) -> UUID:
     payload = decode_token(token, expected_type="access")
     if payload is None:
-        raise credentials_exception
+        raise _credentials_exception()
 
     user_id_raw = payload.get("sub")
     if user_id_raw is None:
-        raise credentials_exception
+        raise _credentials_exception()
 
     try:
-        user_id = UUID(str(user_id_raw))
+        return UUID(str(user_id_raw))
     except ValueError:
-        raise credentials_exception
+        raise _credentials_exception()
 
-    user = db.query(User).filter(User.id == user_id).first()
+
+def _load_current_user(db: Session, user_id: UUID) -> User:
+    # Runs on every authenticated request; the lambda keeps it a cached statement.
+    user = db.scalars(
+        lambda_stmt(lambda: select(User).options(joinedload(User.plan_profile)).where(User.id == user_id))
+    ).first()
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    # Lets the session's commit hook remember this user as a recent writer.
+    db.info["user_id"] = user.id
+    return user
 
+
+@hot_query("current_user")
+async def warm_current_user(runner: DatabaseRunner, user_id: UUID) -> None:
+    # An unknown id answers 401; the statement is compiled either way.
+    try:
+        await runner.run(_load_current_user, user_id)
+    except HTTPException:
+        pass
+
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> User:
+    return _load_current_user(db, _user_id_from_access_token(token))
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: DatabaseRunner = Depends(get_db_runner),
+) -> User:
+    user_id = _user_id_from_access_token(token)
+    return await db.run(_load_current_user, user_id)
+
+
+async def get_current_user_for_read(
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+    db: DatabaseRunner = Depends(get_db_runner),
+    read_db: DatabaseRunner = Depends(get_read_db_runner),
+) -> User:
+    # Authentication always hits the primary; a freshly registered user may
+    # not have reached the replicas yet.
+    user = await get_current_user_async(token, db)
+    if recent_writers.wrote_recently(user.id, request.cookies.get(DB_REPLICA_STICKY_COOKIE_NAME)):
+        read_db.use_primary()
     return user
@@ -0,0 +1,91 @@
+import argparse
+import json
+import logging
+from pathlib import Path
+
+from app.database import SessionLocal
+from app.services.maintenance_service import run_auth_sweeper
+from app.services.plan_service import backfill_plan_profiles
+from app.services.reconciliation_service import reconcile_hotmart_export
+
+
+def _sweep_auth(args: argparse.Namespace) -> int:
+    purged = run_auth_sweeper()
+    print(json.dumps(purged))
+    return 0
+
+
+def _reconcile_hotmart(args: argparse.Namespace) -> int:
+    report = reconcile_hotmart_export(args.export, dry_run=args.dry_run)
+    print(json.dumps(report.as_dict(), ensure_ascii=False, indent=2))
+    return 0
+
+
+def _backfill_plan_profiles(args: argparse.Namespace) -> int:
+    db = SessionLocal()
+    try:
+        result = backfill_plan_profiles(db, batch_size=args.batch_size)
+    finally:
+        db.close()
+    print(json.dumps(result))
+    return 0
+
+
+def _migrate(args: argparse.Namespace) -> int:
+    from alembic import command
+    from alembic.config import Config
+
+    root = Path(__file__).resolve().parent.parent
+    config = Config(str(root / "alembic.ini"), attributes={"configure_logger": False})
+    config.set_main_option("script_location", str(root / "migrations"))
+    if args.database_url:
+        config.set_main_option("sqlalchemy.url", args.database_url)
+    command.upgrade(config, args.revision, sql=args.sql)
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="ProvaLab maintenance commands")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    sweep = subcommands.add_parser(
+        "sweep-auth",
+        help="Delete expired or revoked refresh sessions, verification codes and reset tokens.",
+    )
+    sweep.set_defaults(handler=_sweep_auth)
+
+    reconcile = subcommands.add_parser(
+        "reconcile-hotmart",
+        help="Apply a Hotmart sales export (CSV, JSON or JSON Lines) to users_profile and print the diff.",
+    )
+    reconcile.add_argument("export", type=Path, help="Path to the exported sales file.")
+    reconcile.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only report what would change.",
+    )
+    reconcile.set_defaults(handler=_reconcile_hotmart)
+
+    backfill = subcommands.add_parser(
+        "backfill-plan-profiles",
+        help="Create users_profile rows for users that have none and repair inconsistent plans.",
+    )
+    backfill.add_argument("--batch-size", type=int, default=1000)
+    backfill.set_defaults(handler=_backfill_plan_profiles)
+
+    migrate = subcommands.add_parser(
+        "migrate",
+        help="Create or upgrade the database schema with the Alembic migrations.",
+    )
+    migrate.add_argument("revision", nargs="?", default="head", help="Target revision (default: head).")
+    migrate.add_argument("--database-url", help="Overrides DATABASE_URL.")
+    migrate.add_argument("--sql", action="store_true", help="Print the SQL instead of running it.")
+    migrate.set_defaults(handler=_migrate)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
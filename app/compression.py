@@ -0,0 +1,144 @@
+"""Response body compression: Accept-Encoding negotiation, gzip and brotli.
+
+Per-request compression (``app.middleware.CompressionMiddleware``) uses cheap
+levels, since it runs on every response. Bodies that are cached and served
+many times are compressed once, at the highest levels, into a
+``PrecompressedBody`` and sent with ``PrecompressedResponse``.
+
+brotli is optional: without the package only gzip is offered.
+"""
+import gzip
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Mapping, Optional
+
+from fastapi import Response
+
+from app.config import COMPRESSION_BROTLI_QUALITY, COMPRESSION_GZIP_LEVEL
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+# Preferred first.
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def _accepted_qualities(accept_encoding: str) -> dict[str, float]:
+    qualities = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        if not coding:
+            continue
+        quality = 1.0
+        name, _, value = params.strip().partition("=")
+        if name.strip() == "q":
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        qualities[coding.strip().lower()] = quality
+    return qualities
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """The best supported coding the client accepts, or ``None`` for identity."""
+    if not accept_encoding:
+        return None
+    qualities = _accepted_qualities(accept_encoding)
+    wildcard = qualities.get("*", 0.0)
+    for encoding in SUPPORTED_ENCODINGS:
+        if qualities.get(encoding, wildcard) > 0:
+            return encoding
+    return None
+
+
+def compress(body: bytes, encoding: str, *, best: bool = False) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=11 if best else COMPRESSION_BROTLI_QUALITY)
+    # mtime=0 keeps the output (and so its length) deterministic.
+    return gzip.compress(body, compresslevel=9 if best else COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+def weaken_etag(etag: str) -> str:
+    # A strong ETag promises byte-identical bodies, which an encoded variant
+    # is not; If-None-Match compares weakly, so revalidation still matches.
+    return etag if etag.startswith("W/") else f"W/{etag}"
+
+
+@dataclass(frozen=True, slots=True)
+class PrecompressedBody:
+    identity: bytes
+    variants: Mapping[str, bytes]
+
+    def encoded(self, encoding: Optional[str]) -> tuple[bytes, Optional[str]]:
+        if encoding in self.variants:
+            return self.variants[encoding], encoding
+        return self.identity, None
+
+
+def precompress(body: bytes) -> PrecompressedBody:
+    """Every supported variant at the best level; ones that do not shrink the body are left out."""
+    variants = {}
+    for encoding in SUPPORTED_ENCODINGS:
+        compressed = compress(body, encoding, best=True)
+        if len(compressed) < len(body):
+            variants[encoding] = compressed
+    return PrecompressedBody(identity=body, variants=variants)
+
+
+class PrecompressedResponse(Response):
+    """Sends the variant of a ``PrecompressedBody`` matching ``accept_encoding``.
+
+    The middleware leaves it alone, since ``Content-Encoding`` is already set.
+    """
+
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        body: PrecompressedBody,
+        accept_encoding: str = "",
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+    ):
+        content, encoding = body.encoded(choose_encoding(accept_encoding))
+        super().__init__(content, status_code=status_code, headers=headers)
+        self.headers["Vary"] = "Accept-Encoding"
+        if encoding is not None:
+            self.headers["Content-Encoding"] = encoding
+            if "etag" in self.headers:
+                self.headers["ETag"] = weaken_etag(self.headers["etag"])
+
+
+class PrecompressedCache:
+    """Small LRU of ``PrecompressedBody`` per worker, keyed by the body's ETag.
+
+    Keys change with the data, so entries never need invalidating: stale
+    ones just age out.
+    """
+
+    def __init__(self, max_entries: int):
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, PrecompressedBody] = OrderedDict()
+
+    def get(self, key: str) -> Optional[PrecompressedBody]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, body: PrecompressedBody) -> None:
+        if self._max_entries <= 0:
+            return
+        self._entries[key] = body
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -9,6 +9,20 @@ DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
 DB_POOL_TIMEOUT_SECONDS = int(os.getenv("DB_POOL_TIMEOUT_SECONDS", "10"))
 DB_POOL_RECYCLE_SECONDS = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
 DB_CONNECT_TIMEOUT_SECONDS = int(os.getenv("DB_CONNECT_TIMEOUT_SECONDS", "10"))
+# "transaction" when DATABASE_URL points at a transaction pooler (PgBouncer,
+# Supabase port 6543): the app stops pooling on its own side and avoids named
+# prepared statements. DB_POOLER_POOL_SIZE=0 means one connection per checkout.
+DB_POOLER_MODE = os.getenv("DB_POOLER_MODE", "session").strip().lower()
+DB_POOLER_POOL_SIZE = int(os.getenv("DB_POOLER_POOL_SIZE", "0"))
+# Serve the hot routers through an asyncio engine (asyncpg / aiosqlite) instead of the threadpool.
+DB_ASYNC_MODE = os.getenv("DB_ASYNC_MODE", "false").strip().lower() == "true"
+DATABASE_REPLICA_URLS = [
+    url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()
+]
+DB_REPLICA_STICKY_SECONDS = float(os.getenv("DB_REPLICA_STICKY_SECONDS", "5"))
+# Signed cookie carrying a user's last write to whichever worker serves the next read.
+DB_REPLICA_STICKY_COOKIE_NAME = os.getenv("DB_REPLICA_STICKY_COOKIE_NAME", "recent_write")
+DB_REPLICA_RETRY_SECONDS = float(os.getenv("DB_REPLICA_RETRY_SECONDS", "30"))
 JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "supersecretkey_change_in_production_minimum_32_chars")
 JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 JWT_EXPIRE_MINUTES = int(os.getenv("JWT_EXPIRE_MINUTES", "60"))  # 1 hour (legacy var)
@@ -27,12 +41,16 @@ BACKEND_CORS_ORIGINS = [
     for origin in os.getenv("BACKEND_CORS_ORIGINS", "http://localhost:5173").split(",")
     if origin.strip()
 ]
+# How long browsers may reuse a preflight answer (Chromium caps it at 7200).
+CORS_MAX_AGE_SECONDS = int(os.getenv("CORS_MAX_AGE_SECONDS", "7200"))
 auto_create_default = "false" if ENVIRONMENT == "production" else "true"
 AUTO_CREATE_TABLES = (
     os.getenv("AUTO_CREATE_TABLES", auto_create_default).strip().lower() == "true"
 )
 
 GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID", "")
+GOOGLE_JWKS_URL = os.getenv("GOOGLE_JWKS_URL", "https://www.googleapis.com/oauth2/v3/certs")
+GOOGLE_JWKS_DEFAULT_TTL_SECONDS = int(os.getenv("GOOGLE_JWKS_DEFAULT_TTL_SECONDS", "3600"))
 EMAIL_VERIFICATION_EXPIRATION_MINUTES = int(
     os.getenv("EMAIL_VERIFICATION_EXPIRATION_MINUTES", "10")
 )
@@ -66,3 +84,91 @@ HOTMART_CHECKOUT_URL = os.getenv(
     "HOTMART_CHECKOUT_URL", "https://provalab-launchpad.vercel.app"
 )
 HOTMART_WEBHOOK_TOKEN = os.getenv("HOTMART_WEBHOOK_TOKEN", "")
+
+HTTP_CLIENT_TIMEOUT_SECONDS = float(os.getenv("HTTP_CLIENT_TIMEOUT_SECONDS", "10"))
+HTTP_CLIENT_CONNECT_TIMEOUT_SECONDS = float(os.getenv("HTTP_CLIENT_CONNECT_TIMEOUT_SECONDS", "5"))
+HTTP_CLIENT_MAX_CONNECTIONS = int(os.getenv("HTTP_CLIENT_MAX_CONNECTIONS", "50"))
+HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS = int(
+    os.getenv("HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS", "20")
+)
+HTTP_CLIENT_KEEPALIVE_EXPIRY_SECONDS = float(
+    os.getenv("HTTP_CLIENT_KEEPALIVE_EXPIRY_SECONDS", "30")
+)
+HTTP_CLIENT_MAX_CONNECTIONS_PER_HOST = int(
+    os.getenv("HTTP_CLIENT_MAX_CONNECTIONS_PER_HOST", "10")
+)
+HTTP_CLIENT_RETRIES = int(os.getenv("HTTP_CLIENT_RETRIES", "2"))
+HTTP_CLIENT_RETRY_BACKOFF_SECONDS = float(os.getenv("HTTP_CLIENT_RETRY_BACKOFF_SECONDS", "0.2"))
+
+# Per dependency (google, resend). Calls run on sync handlers, so each one can
+# hold MAX_CONCURRENT + MAX_QUEUE worker threads; startup refuses budgets that
+# add up to more than half of THREADPOOL_SIZE.
+OUTBOUND_BULKHEAD_MAX_CONCURRENT = int(os.getenv("OUTBOUND_BULKHEAD_MAX_CONCURRENT", "4"))
+OUTBOUND_BULKHEAD_MAX_QUEUE = int(os.getenv("OUTBOUND_BULKHEAD_MAX_QUEUE", "4"))
+OUTBOUND_BULKHEAD_QUEUE_TIMEOUT_SECONDS = float(
+    os.getenv("OUTBOUND_BULKHEAD_QUEUE_TIMEOUT_SECONDS", "2")
+)
+CIRCUIT_BREAKER_WINDOW_SIZE = int(os.getenv("CIRCUIT_BREAKER_WINDOW_SIZE", "20"))
+CIRCUIT_BREAKER_MIN_CALLS = int(os.getenv("CIRCUIT_BREAKER_MIN_CALLS", "10"))
+CIRCUIT_BREAKER_FAILURE_RATE = float(os.getenv("CIRCUIT_BREAKER_FAILURE_RATE", "0.5"))
+CIRCUIT_BREAKER_SLOW_CALL_SECONDS = float(os.getenv("CIRCUIT_BREAKER_SLOW_CALL_SECONDS", "5"))
+CIRCUIT_BREAKER_SLOW_CALL_RATE = float(os.getenv("CIRCUIT_BREAKER_SLOW_CALL_RATE", "0.8"))
+CIRCUIT_BREAKER_OPEN_SECONDS = int(os.getenv("CIRCUIT_BREAKER_OPEN_SECONDS", "30"))
+
+AUTH_SWEEPER_ENABLED = os.getenv("AUTH_SWEEPER_ENABLED", "true").strip().lower() == "true"
+AUTH_SWEEPER_INTERVAL_SECONDS = int(os.getenv("AUTH_SWEEPER_INTERVAL_SECONDS", "900"))
+AUTH_SWEEPER_BATCH_SIZE = int(os.getenv("AUTH_SWEEPER_BATCH_SIZE", "500"))
+AUTH_SWEEPER_MAX_BATCHES = int(os.getenv("AUTH_SWEEPER_MAX_BATCHES", "20"))
+AUTH_ARTIFACT_RETENTION_HOURS = int(os.getenv("AUTH_ARTIFACT_RETENTION_HOURS", "24"))
+
+HOTMART_INBOX_WORKER_ENABLED = (
+    os.getenv("HOTMART_INBOX_WORKER_ENABLED", "true").strip().lower() == "true"
+)
+HOTMART_INBOX_POLL_SECONDS = int(os.getenv("HOTMART_INBOX_POLL_SECONDS", "30"))
+HOTMART_INBOX_BATCH_SIZE = int(os.getenv("HOTMART_INBOX_BATCH_SIZE", "100"))
+HOTMART_INBOX_MAX_ATTEMPTS = int(os.getenv("HOTMART_INBOX_MAX_ATTEMPTS", "8"))
+HOTMART_INBOX_RETRY_BASE_SECONDS = int(os.getenv("HOTMART_INBOX_RETRY_BASE_SECONDS", "30"))
+HOTMART_INBOX_LEASE_SECONDS = int(os.getenv("HOTMART_INBOX_LEASE_SECONDS", "300"))
+HOTMART_RECONCILE_BATCH_SIZE = int(os.getenv("HOTMART_RECONCILE_BATCH_SIZE", "1000"))
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").strip().upper()
+# "json" (one object per line) or "text".
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").strip().lower()
+# Fraction of INFO logs kept per route, e.g. "/auth/refresh=0.1,/auth/me=0.05".
+LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "")
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").strip().lower() == "true"
+# Shared directory for per-worker metric files; prometheus_client reads the
+# same variable, so it must be set before the app is imported.
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR", "").strip()
+
+# Production server (python -m app.server). WEB_CONCURRENCY=0 starts one
+# worker per CPU available to the process.
+SERVER_HOST = os.getenv("HOST", "0.0.0.0")
+SERVER_PORT = int(os.getenv("PORT", "8000"))
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "0"))
+SERVER_GRACEFUL_TIMEOUT_SECONDS = int(os.getenv("SERVER_GRACEFUL_TIMEOUT_SECONDS", "30"))
+SERVER_KEEPALIVE_SECONDS = int(os.getenv("SERVER_KEEPALIVE_SECONDS", "5"))
+# Recycle a worker after this many requests (plus jitter); 0 disables it.
+SERVER_MAX_REQUESTS = int(os.getenv("SERVER_MAX_REQUESTS", "0"))
+# Worker threads for sync endpoints and DatabaseRunner hops (anyio's default is 40).
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "40"))
+
+# Warm-up after startup: /ready answers 503 until it finishes.
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").strip().lower() == "true"
+WARMUP_POOL_CONNECTIONS = int(os.getenv("WARMUP_POOL_CONNECTIONS", "5"))
+
+SQL_STATS_ENABLED = os.getenv("SQL_STATS_ENABLED", "true").strip().lower() == "true"
+# Identical statements repeated this many times in one request are logged as a likely N+1.
+SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "5"))
+
+# Response compression. Bodies smaller than COMPRESSION_MIN_SIZE bytes go out
+# as is. Per-request levels favour CPU: on the exercise lists gzip 1 keeps 99%
+# of level 9's savings for under a quarter of the time. Cached bodies are
+# compressed once, at the best levels.
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").strip().lower() == "true"
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "1"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+# Pre-compressed /exercises/seo pages kept per worker.
+SEO_CACHE_SIZE = int(os.getenv("SEO_CACHE_SIZE", "256"))
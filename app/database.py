@@ -1,19 +1,49 @@
+import hashlib
+import hmac
 import logging
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Callable, TypeVar
 
-from sqlalchemy import create_engine
-from sqlalchemy.engine import make_url
+from fastapi import Depends
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.exc import InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool, StaticPool
+from starlette.concurrency import run_in_threadpool
 from app.config import (
     DATABASE_URL,
+    DATABASE_REPLICA_URLS,
+    DB_ASYNC_MODE,
     DB_CONNECT_TIMEOUT_SECONDS,
     DB_MAX_OVERFLOW,
     DB_POOL_SIZE,
+    DB_POOLER_MODE,
+    DB_POOLER_POOL_SIZE,
     DB_POOL_TIMEOUT_SECONDS,
+    DB_REPLICA_RETRY_SECONDS,
+    DB_REPLICA_STICKY_SECONDS,
+    JWT_SECRET_KEY,
+)
+from app.metrics import (
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_CHECKOUT_WAIT_SECONDS,
+    DB_POOL_CHECKOUTS_TOTAL,
+    DB_POOL_OPEN_CONNECTIONS,
+    DB_POOL_OVERFLOW,
+    DB_READ_ROUTING_TOTAL,
 )
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 
 def _normalize_database_url(raw_url: str | None) -> str:
     if not raw_url:
@@ -34,6 +64,11 @@ def _normalize_database_url(raw_url: str | None) -> str:
             "Supabase pooler URL detected on port 5432. "
             "If your project uses transaction mode, switch DATABASE_URL to port 6543."
         )
+    if "pooler.supabase.com" in host and url.port == 6543 and DB_POOLER_MODE != "transaction":
+        logger.warning(
+            "Supabase transaction pooler (port 6543) detected. "
+            "Set DB_POOLER_MODE=transaction to stop pooling twice."
+        )
 
     query = dict(url.query)
     if "supabase.com" in host and "sslmode" not in query:
@@ -46,28 +81,111 @@ def _normalize_database_url(raw_url: str | None) -> str:
 normalized_database_url = _normalize_database_url(DATABASE_URL)
 database_url = make_url(normalized_database_url)
 
-engine_kwargs = {
-    "pool_pre_ping": True,
-    "pool_recycle": 300,
-}
-
-if database_url.drivername.startswith("sqlite"):
-    # SQLite does not support the PostgreSQL connection/pool keyword set.
-    engine_kwargs["connect_args"] = {"check_same_thread": False}
-else:
-    engine_kwargs.update(
-        {
+class _TimedCheckoutMixin:
+    # The pool has no "before checkout" event, so waiting time is measured
+    # around the internal get. It includes opening a connection when the pool
+    # has to grow.
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT_SECONDS.labels(pool=self.logging_name or "default").observe(
+                time.perf_counter() - started
+            )
+
+
+class TimedQueuePool(_TimedCheckoutMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def instrument_pool(target: Engine | AsyncEngine, name: str) -> None:
+    """Publish pool usage gauges for ``target`` from SQLAlchemy pool events."""
+    sync_engine = target.sync_engine if isinstance(target, AsyncEngine) else target
+
+    def _update_overflow() -> None:
+        pool = sync_engine.pool
+        if isinstance(pool, QueuePool):
+            DB_POOL_OVERFLOW.labels(pool=name).set(max(pool.overflow(), 0))
+
+    @event.listens_for(sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record) -> None:
+        DB_POOL_OPEN_CONNECTIONS.labels(pool=name).inc()
+        _update_overflow()
+
+    @event.listens_for(sync_engine, "close")
+    def _on_close(dbapi_connection, connection_record) -> None:
+        DB_POOL_OPEN_CONNECTIONS.labels(pool=name).dec()
+        _update_overflow()
+
+    @event.listens_for(sync_engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+        DB_POOL_CHECKOUTS_TOTAL.labels(pool=name).inc()
+        DB_POOL_CHECKED_OUT.labels(pool=name).inc()
+
+    @event.listens_for(sync_engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record) -> None:
+        DB_POOL_CHECKED_OUT.labels(pool=name).dec()
+
+
+if DB_POOLER_MODE not in {"session", "transaction"}:
+    raise RuntimeError("DB_POOLER_MODE must be 'session' or 'transaction'.")
+
+
+def _pool_kwargs(queue_pool_class: type[QueuePool]) -> dict[str, Any]:
+    if DB_POOLER_MODE != "transaction":
+        return {
+            "poolclass": queue_pool_class,
             "pool_size": DB_POOL_SIZE,
             "max_overflow": DB_MAX_OVERFLOW,
             "pool_timeout": DB_POOL_TIMEOUT_SECONDS,
-            "connect_args": {"connect_timeout": DB_CONNECT_TIMEOUT_SECONDS},
+            "pool_recycle": 300,
+            "pool_pre_ping": True,
         }
-    )
 
-engine = create_engine(
-    normalized_database_url,
-    **engine_kwargs,
-)
+    # The pooler already multiplexes server connections, and connecting to it
+    # is cheap, so a second pool here only adds idle clients. No pre-ping
+    # either: a dead connection fails its first statement, SQLAlchemy flags
+    # the disconnect and invalidates the pool, and the next checkout reconnects.
+    if DB_POOLER_POOL_SIZE <= 0:
+        return {"poolclass": NullPool}
+    return {
+        "poolclass": queue_pool_class,
+        "pool_size": DB_POOLER_POOL_SIZE,
+        "max_overflow": 0,
+        "pool_timeout": DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": 300,
+    }
+
+
+def _engine_kwargs(url: URL) -> dict[str, Any]:
+    if url.drivername.startswith("sqlite"):
+        # SQLite does not support the PostgreSQL connection/pool keyword set.
+        return {
+            "pool_pre_ping": True,
+            "pool_recycle": 300,
+            "connect_args": {"check_same_thread": False},
+        }
+
+    # psycopg2 never prepares statements server-side, so it needs no
+    # transaction-pooler specific connect arguments.
+    return {
+        **_pool_kwargs(TimedQueuePool),
+        "connect_args": {"connect_timeout": DB_CONNECT_TIMEOUT_SECONDS},
+    }
+
+
+def _create_sync_engine(url: URL, name: str) -> Engine:
+    sync_engine = create_engine(url, pool_logging_name=name, **_engine_kwargs(url))
+    instrument_pool(sync_engine, name)
+    return sync_engine
+
+
+engine = _create_sync_engine(database_url, "primary")
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -80,3 +198,373 @@ def get_db():
         raise
     finally:
         db.close()
+
+
+def _async_database_url(url: URL) -> URL:
+    if url.drivername.startswith("sqlite"):
+        return url.set(drivername="sqlite+aiosqlite")
+
+    # asyncpg takes ssl/timeouts as connect() arguments, not libpq query options.
+    query = dict(url.query)
+    query.pop("sslmode", None)
+    query.pop("connect_timeout", None)
+    return url.set(drivername="postgresql+asyncpg", query=query)
+
+
+def _create_async_engine(url: URL, name: str) -> AsyncEngine:
+    async_url = _async_database_url(url)
+    async_engine_kwargs: dict[str, Any] = {"pool_logging_name": name}
+    if async_url.drivername.startswith("sqlite"):
+        async_engine_kwargs.update({"pool_pre_ping": True, "pool_recycle": 300})
+    else:
+        connect_args: dict[str, Any] = {"timeout": DB_CONNECT_TIMEOUT_SECONDS}
+        if url.query.get("sslmode") in {"require", "verify-ca", "verify-full"}:
+            connect_args["ssl"] = "require"
+        if DB_POOLER_MODE == "transaction":
+            # asyncpg always prepares statements. Behind a transaction pooler
+            # consecutive statements may reach different server connections,
+            # so nothing is cached and every statement gets a unique name.
+            connect_args.update(
+                {
+                    "statement_cache_size": 0,
+                    "prepared_statement_cache_size": 0,
+                    "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+                }
+            )
+        async_engine_kwargs.update(_pool_kwargs(TimedAsyncQueuePool))
+        async_engine_kwargs["connect_args"] = connect_args
+    created = create_async_engine(async_url, **async_engine_kwargs)
+    instrument_pool(created, name)
+    return created
+
+
+async_engine: AsyncEngine | None = None
+AsyncSessionLocal: async_sessionmaker[AsyncSession] | None = None
+if DB_ASYNC_MODE:
+    async_engine = _create_async_engine(database_url, "primary_async")
+    # Attributes must stay loaded after commit: response serialization runs
+    # outside the greenlet and cannot lazy-load.
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as session:
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            raise
+
+
+class ReplicaSet:
+    """Round-robin over read replicas, skipping ones that recently failed.
+
+    A replica whose connection fails is taken out of rotation for
+    ``retry_seconds``; the first pick after that window tries it again.
+    """
+
+    def __init__(
+        self,
+        engines: list[Engine | AsyncEngine],
+        *,
+        retry_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.engines = list(engines)
+        self._retry_seconds = retry_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._cursor = 0
+        self._down_until: dict[int, float] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    def choose(self) -> Engine | AsyncEngine | None:
+        with self._lock:
+            now = self._clock()
+            for _ in range(len(self.engines)):
+                index = self._cursor % len(self.engines)
+                self._cursor += 1
+                if self._down_until.get(index, 0.0) <= now:
+                    return self.engines[index]
+        return None
+
+    def mark_down(self, engine: Engine | AsyncEngine) -> None:
+        with self._lock:
+            self._down_until[self.engines.index(engine)] = self._clock() + self._retry_seconds
+        logger.warning(
+            "db_replica_down host=%s retry_in_seconds=%s",
+            engine.url.host or engine.url.database,
+            self._retry_seconds,
+        )
+
+
+class RecentWriters:
+    """Users who committed a write in the last ``window_seconds`` (read-your-writes).
+
+    The in-process record only covers the worker that handled the write. The
+    same window also travels with the client as a signed marker
+    (``write_marker``, sent back as a cookie), so any worker can honour it.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float,
+        secret: str,
+        clock: Callable[[], float] = time.monotonic,
+        wall_clock: Callable[[], float] = time.time,
+    ):
+        self.window_seconds = window_seconds
+        self._secret = secret.encode()
+        self._clock = clock
+        self._wall_clock = wall_clock
+        self._lock = threading.Lock()
+        self._until: dict[Any, float] = {}
+
+    def mark(self, user_id: Any) -> None:
+        now = self._clock()
+        with self._lock:
+            self._until[user_id] = now + self.window_seconds
+            if len(self._until) > 10_000:
+                self._until = {key: until for key, until in self._until.items() if until > now}
+
+    def __contains__(self, user_id: Any) -> bool:
+        with self._lock:
+            return self._until.get(user_id, 0.0) > self._clock()
+
+    def _signature(self, payload: str) -> str:
+        return hmac.new(self._secret, payload.encode(), hashlib.sha256).hexdigest()[:32]
+
+    def write_marker(self, user_id: Any) -> str:
+        # Wall-clock expiry: monotonic clocks are not comparable across processes.
+        payload = f"{user_id}.{int(self._wall_clock() + self.window_seconds) + 1}"
+        return f"{payload}.{self._signature(payload)}"
+
+    def wrote_recently(self, user_id: Any, marker: str | None = None) -> bool:
+        if user_id in self:
+            return True
+        if not marker:
+            return False
+        payload, _, signature = marker.rpartition(".")
+        marked_user, _, expires_at = payload.rpartition(".")
+        if not hmac.compare_digest(signature, self._signature(payload)) or marked_user != str(user_id):
+            return False
+        try:
+            return int(expires_at) > self._wall_clock()
+        except ValueError:
+            return False
+
+
+# Per request: the user whose write was committed, for the sticky cookie.
+request_writer: ContextVar[dict | None] = ContextVar("request_writer", default=None)
+
+
+def _create_replica_set() -> ReplicaSet:
+    engines: list[Engine | AsyncEngine] = []
+    for index, raw_url in enumerate(DATABASE_REPLICA_URLS):
+        url = make_url(_normalize_database_url(raw_url))
+        name = f"replica{index}"
+        engines.append(_create_async_engine(url, name) if DB_ASYNC_MODE else _create_sync_engine(url, name))
+    return ReplicaSet(engines, retry_seconds=DB_REPLICA_RETRY_SECONDS)
+
+
+replica_set = _create_replica_set()
+recent_writers = RecentWriters(DB_REPLICA_STICKY_SECONDS, JWT_SECRET_KEY)
+
+
+@event.listens_for(Session, "after_flush")
+def _note_flushed_writes(session: Session, flush_context) -> None:
+    session.info["has_writes"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _note_statement_writes(orm_execute_state) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["has_writes"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _remember_recent_writer(session: Session) -> None:
+    # get_current_user tags the session with the caller's id; their next reads
+    # stay on the primary until replicas have caught up with this commit.
+    if session.info.pop("has_writes", False) and replica_set and session.info.get("user_id"):
+        recent_writers.mark(session.info["user_id"])
+        writer = request_writer.get()
+        if writer is not None:
+            writer["user_id"] = session.info["user_id"]
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_writes(session: Session, previous_transaction) -> None:
+    session.info.pop("has_writes", None)
+
+
+def dispose_engines_after_fork() -> None:
+    """Drop pooled connections inherited from the parent process.
+
+    ``close=False`` leaves the parent's sockets alone (closing them here would
+    break the parent's connections) and gives this process fresh, empty pools.
+    """
+    engines = [engine, async_engine, *replica_set.engines]
+    for target in engines:
+        if isinstance(target, AsyncEngine):
+            target.sync_engine.dispose(close=False)
+        elif target is not None:
+            target.dispose(close=False)
+
+
+def _run_and_release(session: Session, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    result = fn(session, *args, **kwargs)
+    # Give the connection back before leaving the worker thread. A request
+    # parked between two hops would otherwise hold it while every worker
+    # blocks on pool checkout, deadlocking the threadpool.
+    if session.in_transaction():
+        session.commit()
+    return result
+
+
+class DatabaseRunner:
+    """Runs synchronous ORM code against the request's session.
+
+    Routes keep using the regular ``Session`` API and call
+    ``await db.run(fn, *args)``. In sync mode ``fn`` runs in the threadpool;
+    in async mode it runs through ``AsyncSession.run_sync`` on the event loop,
+    where every round trip is awaited instead of pinning a worker thread.
+
+    Runners handed out by ``get_read_db_runner`` send work to a replica when
+    one is configured and healthy, unless ``use_primary()`` was called.
+    """
+
+    def __init__(
+        self,
+        session: Session | None = None,
+        async_session: AsyncSession | None = None,
+        replicas: ReplicaSet | None = None,
+    ):
+        self.session = session
+        self.async_session = async_session
+        if session is not None:
+            # Same semantics as AsyncSessionLocal: loaded objects survive the
+            # per-hop commit.
+            session.expire_on_commit = False
+        self._replicas = replicas if replicas else None
+        self._replica_engine: Engine | AsyncEngine | None = None
+        self._replica_session: Session | AsyncSession | None = None
+
+    def use_primary(self) -> None:
+        self._replicas = None
+
+    async def _run_on_primary(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        if self.async_session is not None:
+            return await self.async_session.run_sync(fn, *args, **kwargs)
+        return await run_in_threadpool(_run_and_release, self.session, fn, *args, **kwargs)
+
+    async def _run_on_replica(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        if self._replica_session is None:
+            if isinstance(self._replica_engine, AsyncEngine):
+                self._replica_session = AsyncSession(
+                    bind=self._replica_engine, autoflush=False, expire_on_commit=False
+                )
+            else:
+                self._replica_session = Session(bind=self._replica_engine, autoflush=False, expire_on_commit=False)
+        if isinstance(self._replica_session, AsyncSession):
+            return await self._replica_session.run_sync(fn, *args, **kwargs)
+        return await run_in_threadpool(_run_and_release, self._replica_session, fn, *args, **kwargs)
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        if self._replicas is not None and self._replica_engine is None:
+            self._replica_engine = self._replicas.choose()
+        if self._replicas is None or self._replica_engine is None:
+            DB_READ_ROUTING_TOTAL.labels(target="primary").inc()
+            return await self._run_on_primary(fn, *args, **kwargs)
+
+        try:
+            result = await self._run_on_replica(fn, *args, **kwargs)
+        except (OperationalError, InterfaceError, OSError):
+            self._replicas.mark_down(self._replica_engine)
+            await self.close_replica()
+            self.use_primary()
+            DB_READ_ROUTING_TOTAL.labels(target="primary_fallback").inc()
+            return await self._run_on_primary(fn, *args, **kwargs)
+        DB_READ_ROUTING_TOTAL.labels(target="replica").inc()
+        return result
+
+    async def rollback(self) -> None:
+        if self.async_session is not None:
+            await self.async_session.rollback()
+        else:
+            await run_in_threadpool(self.session.rollback)
+
+    async def close_replica(self) -> None:
+        replica_session, self._replica_session = self._replica_session, None
+        self._replica_engine = None
+        if isinstance(replica_session, AsyncSession):
+            await replica_session.close()
+        elif replica_session is not None:
+            await run_in_threadpool(replica_session.close)
+
+
+async def _get_sync_db_runner(db: Session = Depends(get_db)) -> DatabaseRunner:
+    return DatabaseRunner(session=db)
+
+
+async def _get_async_db_runner(
+    async_session: AsyncSession = Depends(get_async_db),
+) -> DatabaseRunner:
+    return DatabaseRunner(async_session=async_session)
+
+
+async def _get_sync_read_db_runner(db: Session = Depends(get_db)) -> AsyncIterator[DatabaseRunner]:
+    runner = DatabaseRunner(session=db, replicas=replica_set)
+    try:
+        yield runner
+    finally:
+        await runner.close_replica()
+
+
+async def _get_async_read_db_runner(
+    async_session: AsyncSession = Depends(get_async_db),
+) -> AsyncIterator[DatabaseRunner]:
+    runner = DatabaseRunner(async_session=async_session, replicas=replica_set)
+    try:
+        yield runner
+    finally:
+        await runner.close_replica()
+
+
+@asynccontextmanager
+async def isolated_runner(*, use_replicas: bool = True) -> AsyncIterator[DatabaseRunner]:
+    """A runner on a session of its own, for queries fanned out concurrently in one request.
+
+    Each checks out its own pooled connection while it runs, so the request's
+    session is neither shared across tasks nor held for the whole fan-out.
+    """
+    replicas = replica_set if use_replicas else None
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as async_session:
+            runner = DatabaseRunner(async_session=async_session, replicas=replicas)
+            try:
+                yield runner
+            finally:
+                await runner.close_replica()
+        return
+
+    session = SessionLocal()
+    runner = DatabaseRunner(session=session, replicas=replicas)
+    try:
+        yield runner
+    finally:
+        await runner.close_replica()
+        await run_in_threadpool(session.close)
+
+
+def shares_single_connection() -> bool:
+    # StaticPool (in-memory SQLite) hands every session the same DBAPI
+    # connection: concurrent sessions would interleave on it.
+    factory = AsyncSessionLocal if AsyncSessionLocal is not None else SessionLocal
+    return isinstance(factory.kw["bind"].pool, StaticPool)
+
+
+get_db_runner = _get_async_db_runner if DB_ASYNC_MODE else _get_sync_db_runner
+get_read_db_runner = _get_async_read_db_runner if DB_ASYNC_MODE else _get_sync_read_db_runner
@@ -1,44 +1,54 @@
 from fastapi import Depends
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 
-from app.auth import get_current_user
+from app.auth import get_current_user_async
 from app.config import HOTMART_CHECKOUT_URL
-from app.database import get_db
+from app.database import DatabaseRunner, get_db_runner
 from app.exceptions import FreeLimitReachedError
 from app.models import User
-from app.services.plan_service import ensure_user_plan_profile
-
+from app.services.plan_service import (
+    consume_free_use,
+    ensure_user_plan_profile,
+    get_plan_profile,
+    is_premium_profile,
+)
+
+
+def _enforce_plan_limit(db: Session, current_user: User, increment_use: bool) -> None:
+    # get_current_user eager-loads plan_profile, so premium users and
+    # read-only checks never touch the database again.
+    plan_profile = get_plan_profile(current_user)
+    if is_premium_profile(plan_profile):
+        return
+
+    if not increment_use:
+        if plan_profile.uses_count >= plan_profile.free_uses:
+            raise FreeLimitReachedError(checkout_url=HOTMART_CHECKOUT_URL)
+        return
 
-def check_plan_limit(
-    increment_use: bool = True,
-):
-    def dependency(
-        db: Session = Depends(get_db),
-        current_user: User = Depends(get_current_user),
-    ) -> User:
-        had_plan_profile = current_user.plan_profile is not None
+    if current_user.plan_profile is None:
+        # Only accounts that predate eager provisioning get here.
         plan_profile = ensure_user_plan_profile(current_user)
+        db.add(current_user)
+        db.flush()
 
-        if plan_profile.plan == "premium" or plan_profile.is_premium:
-            if not had_plan_profile:
-                db.add(current_user)
-                db.commit()
-            return current_user
+    uses_count = consume_free_use(db, current_user.id)
+    db.commit()
+    if uses_count is None:
+        raise FreeLimitReachedError(checkout_url=HOTMART_CHECKOUT_URL)
 
-        if plan_profile.uses_count >= plan_profile.free_uses:
-            if not had_plan_profile:
-                db.add(current_user)
-                db.commit()
-            raise FreeLimitReachedError(checkout_url=HOTMART_CHECKOUT_URL)
+    set_committed_value(plan_profile, "uses_count", uses_count)
 
-        if increment_use:
-            plan_profile.uses_count += 1
-            db.add(current_user)
-            db.commit()
-        elif not had_plan_profile:
-            db.add(current_user)
-            db.commit()
 
+def check_plan_limit(
+    increment_use: bool = True,
+):
+    async def dependency(
+        db: DatabaseRunner = Depends(get_db_runner),
+        current_user: User = Depends(get_current_user_async),
+    ) -> User:
+        await db.run(_enforce_plan_limit, current_user, increment_use)
         return current_user
 
     return dependency
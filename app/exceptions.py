@@ -2,3 +2,10 @@ class FreeLimitReachedError(Exception):
     def __init__(self, checkout_url: str):
         self.checkout_url = checkout_url
         super().__init__("FREE_LIMIT_REACHED")
+
+
+class DependencyUnavailableError(Exception):
+    def __init__(self, dependency: str, retry_after_seconds: int):
+        self.dependency = dependency
+        self.retry_after_seconds = retry_after_seconds
+        super().__init__(f"DEPENDENCY_UNAVAILABLE:{dependency}")
@@ -0,0 +1,32 @@
+"""Queries the hot routes run, registered for the startup warm-up.
+
+Each module registers a hook next to the query it exercises, so renaming or
+reshaping a query keeps its warm-up in the same place. A hook receives the
+same kind of runner the routes get and a user id that matches no row; it runs
+its query once (and serialises the result like the route does) so the lambda
+statements are analysed and compiled before the first request.
+"""
+import uuid
+from typing import Awaitable, Callable
+
+from app.database import DatabaseRunner
+
+HotQuery = Callable[[DatabaseRunner, uuid.UUID], Awaitable[object]]
+
+_hot_queries: dict[str, HotQuery] = {}
+
+
+def hot_query(name: str) -> Callable[[HotQuery], HotQuery]:
+    """Register the decorated hook under ``name`` for the warm-up to run."""
+
+    def _register(hook: HotQuery) -> HotQuery:
+        if name in _hot_queries:
+            raise ValueError(f"Hot query {name!r} is already registered.")
+        _hot_queries[name] = hook
+        return hook
+
+    return _register
+
+
+def registered_hot_queries() -> dict[str, HotQuery]:
+    return dict(_hot_queries)
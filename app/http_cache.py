@@ -0,0 +1,53 @@
+"""Conditional GET helpers: strong ETags, ``If-None-Match`` and 304 responses.
+
+Routes derive the ETag from a version they can read cheaply (an
+``updated_at`` column, the ids of a page, an aggregate) and check it before
+loading or serializing the body:
+
+    if has_validators(request):
+        etag = make_etag("profile", user_id, updated_at)
+        if is_not_modified(request, etag):
+            return not_modified(etag)
+
+No ``Last-Modified`` is sent: HTTP dates have second precision, so a second
+update within the same second would still get a 304 through
+``If-Modified-Since``. The ETag covers the full timestamp.
+"""
+import hashlib
+from typing import Any
+
+from fastapi import Request, Response
+
+# Part of every ETag: bump it when a response shape changes, so clients
+# holding bodies rendered by the previous code do not get a 304 for them.
+ETAG_VERSION = 1
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag over the version ``parts`` (ids, timestamps, counters)."""
+    digest = hashlib.blake2b(repr((ETAG_VERSION, parts)).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def has_validators(request: Request) -> bool:
+    return "if-none-match" in request.headers
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as required for If-None-Match.
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def cache_headers(etag: str, *, private: bool = True) -> dict[str, str]:
+    # no-cache: caches may store the body but must revalidate it every time,
+    # which is exactly the cheap If-None-Match round trip.
+    return {"ETag": etag, "Cache-Control": "private, no-cache" if private else "public, no-cache"}
+
+
+def not_modified(etag: str, *, private: bool = True) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag, private=private))
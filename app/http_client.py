@@ -0,0 +1,340 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Any
+
+import httpx
+
+from app.config import (
+    HTTP_CLIENT_CONNECT_TIMEOUT_SECONDS,
+    HTTP_CLIENT_KEEPALIVE_EXPIRY_SECONDS,
+    HTTP_CLIENT_MAX_CONNECTIONS,
+    HTTP_CLIENT_MAX_CONNECTIONS_PER_HOST,
+    HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_CLIENT_RETRIES,
+    HTTP_CLIENT_RETRY_BACKOFF_SECONDS,
+    HTTP_CLIENT_TIMEOUT_SECONDS,
+)
+from app.metrics import OUTBOUND_HTTP_DURATION_SECONDS, OUTBOUND_HTTP_RETRIES_TOTAL
+from app.resilience import get_dependency_guard
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+RETRYABLE_STATUS_CODES = {502, 503, 504}
+USER_AGENT = "ProvaLab/1.0 (+https://provalab.com.br)"
+
+
+def _is_healthy(response: httpx.Response) -> bool:
+    # Client errors are the caller's fault; only throttling and 5xx count against the provider.
+    return response.status_code < 500 and response.status_code != 429
+
+
+class OutboundHTTPError(Exception):
+    def __init__(self, message: str, status_code: int | None = None, body: str | None = None):
+        self.status_code = status_code
+        self.body = body
+        super().__init__(message)
+
+
+class OutboundHttpClient:
+    """Process-wide HTTP client with keep-alive pools shared by every outbound call.
+
+    The underlying httpx clients are created on first use, so importing this
+    module does not open sockets. Sync and async callers get separate pools
+    because httpx ties async connections to the running event loop.
+    """
+
+    def __init__(
+        self,
+        *,
+        timeout_seconds: float,
+        connect_timeout_seconds: float,
+        max_connections: int,
+        max_keepalive_connections: int,
+        keepalive_expiry_seconds: float,
+        max_connections_per_host: int,
+        retries: int,
+        retry_backoff_seconds: float,
+        transport: httpx.BaseTransport | None = None,
+        async_transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self._timeout = httpx.Timeout(timeout_seconds, connect=connect_timeout_seconds)
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry_seconds,
+        )
+        self._max_connections_per_host = max_connections_per_host
+        self._retries = retries
+        self._retry_backoff_seconds = retry_backoff_seconds
+        self._transport = transport
+        self._async_transport = async_transport
+        self._client: httpx.Client | None = None
+        self._async_client: httpx.AsyncClient | None = None
+        self._lock = threading.Lock()
+        self._host_semaphores: dict[str, threading.BoundedSemaphore] = {}
+        self._async_host_semaphores: dict[str, asyncio.Semaphore] = {}
+
+    def _get_client(self) -> httpx.Client:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = httpx.Client(
+                        timeout=self._timeout,
+                        limits=self._limits,
+                        headers={"User-Agent": USER_AGENT},
+                        transport=self._transport,
+                    )
+        return self._client
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(
+                timeout=self._timeout,
+                limits=self._limits,
+                headers={"User-Agent": USER_AGENT},
+                transport=self._async_transport,
+            )
+        return self._async_client
+
+    def _host_semaphore(self, host: str) -> threading.BoundedSemaphore:
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            with self._lock:
+                semaphore = self._host_semaphores.setdefault(
+                    host, threading.BoundedSemaphore(self._max_connections_per_host)
+                )
+        return semaphore
+
+    def _async_host_semaphore(self, host: str) -> asyncio.Semaphore:
+        semaphore = self._async_host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._async_host_semaphores.setdefault(
+                host, asyncio.Semaphore(self._max_connections_per_host)
+            )
+        return semaphore
+
+    def _should_retry(
+        self,
+        method: str,
+        attempt: int,
+        retries: int,
+        response: httpx.Response | None,
+        error: httpx.HTTPError | None,
+    ) -> bool:
+        if attempt >= retries:
+            return False
+        if isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)):
+            # The request never reached the server, so even a POST is safe to repeat.
+            return True
+        if method not in IDEMPOTENT_METHODS:
+            return False
+        if error is not None:
+            return isinstance(error, httpx.TransportError)
+        return response is not None and response.status_code in RETRYABLE_STATUS_CODES
+
+    def _finish_attempt(
+        self,
+        method: str,
+        host: str,
+        attempt: int,
+        retries: int,
+        response: httpx.Response | None,
+        error: httpx.HTTPError | None,
+        started: float,
+    ) -> float | None:
+        """Records one attempt; returns the backoff before the next one, or None to stop."""
+        status = str(response.status_code) if response is not None else "error"
+        OUTBOUND_HTTP_DURATION_SECONDS.labels(host=host, method=method, status=status).observe(
+            time.perf_counter() - started
+        )
+        if not self._should_retry(method, attempt, retries, response, error):
+            return None
+        OUTBOUND_HTTP_RETRIES_TOTAL.labels(host=host, method=method).inc()
+        logger.warning(
+            "outbound_http_retry method=%s host=%s attempt=%s reason=%s",
+            method,
+            host,
+            attempt + 1,
+            type(error).__name__ if error else response.status_code,
+        )
+        return self._retry_backoff_seconds * (2 ** attempt)
+
+    def _send(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: dict[str, str] | None = None,
+        json: Any = None,
+        params: dict[str, str] | None = None,
+        timeout: float | None = None,
+        retries: int | None = None,
+    ) -> httpx.Response:
+        method = method.upper()
+        host = httpx.URL(url).host
+        retries = self._retries if retries is None else retries
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            response: httpx.Response | None = None
+            error: httpx.HTTPError | None = None
+            with self._host_semaphore(host):
+                try:
+                    response = self._get_client().request(
+                        method,
+                        url,
+                        headers=headers,
+                        json=json,
+                        params=params,
+                        timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT,
+                    )
+                except httpx.HTTPError as exc:
+                    error = exc
+            backoff = self._finish_attempt(method, host, attempt, retries, response, error, started)
+            if backoff is None:
+                break
+            attempt += 1
+            time.sleep(backoff)
+
+        if error is not None:
+            raise OutboundHTTPError(f"{method} {host} failed: {error!r}") from error
+        return response
+
+    async def _asend(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: dict[str, str] | None = None,
+        json: Any = None,
+        params: dict[str, str] | None = None,
+        timeout: float | None = None,
+        retries: int | None = None,
+    ) -> httpx.Response:
+        method = method.upper()
+        host = httpx.URL(url).host
+        retries = self._retries if retries is None else retries
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            response: httpx.Response | None = None
+            error: httpx.HTTPError | None = None
+            async with self._async_host_semaphore(host):
+                try:
+                    response = await self._get_async_client().request(
+                        method,
+                        url,
+                        headers=headers,
+                        json=json,
+                        params=params,
+                        timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT,
+                    )
+                except httpx.HTTPError as exc:
+                    error = exc
+            backoff = self._finish_attempt(method, host, attempt, retries, response, error, started)
+            if backoff is None:
+                break
+            attempt += 1
+            await asyncio.sleep(backoff)
+
+        if error is not None:
+            raise OutboundHTTPError(f"{method} {host} failed: {error!r}") from error
+        return response
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        dependency: str | None = None,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        if dependency is None:
+            return self._send(method, url, **kwargs)
+
+        guard = get_dependency_guard(dependency)
+        with guard.admit():
+            started = time.perf_counter()
+            try:
+                response = self._send(method, url, **kwargs)
+            except Exception:
+                # Any error, not only HTTP ones, so a half-open trial is never left in flight.
+                guard.breaker.record(False, time.perf_counter() - started)
+                raise
+            except BaseException:
+                # Cancelled: says nothing about the dependency, but the trial slot is freed.
+                guard.breaker.release_trial()
+                raise
+            guard.breaker.record(_is_healthy(response), time.perf_counter() - started)
+            return response
+
+    async def arequest(
+        self,
+        method: str,
+        url: str,
+        *,
+        dependency: str | None = None,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        if dependency is None:
+            return await self._asend(method, url, **kwargs)
+
+        guard = get_dependency_guard(dependency)
+        async with guard.admit_async():
+            started = time.perf_counter()
+            try:
+                response = await self._asend(method, url, **kwargs)
+            except Exception:
+                # Any error, not only HTTP ones, so a half-open trial is never left in flight.
+                guard.breaker.record(False, time.perf_counter() - started)
+                raise
+            except BaseException:
+                # Cancelled: says nothing about the dependency, but the trial slot is freed.
+                guard.breaker.release_trial()
+                raise
+            guard.breaker.record(_is_healthy(response), time.perf_counter() - started)
+            return response
+
+    def get_json(
+        self,
+        url: str,
+        *,
+        headers: dict[str, str] | None = None,
+        timeout: float | None = None,
+        dependency: str | None = None,
+    ) -> tuple[Any, httpx.Headers]:
+        response = self.request("GET", url, headers=headers, timeout=timeout, dependency=dependency)
+        if response.status_code >= 400:
+            raise OutboundHTTPError(
+                f"GET {response.url.host} returned {response.status_code}",
+                status_code=response.status_code,
+                body=response.text,
+            )
+        return response.json(), response.headers
+
+    def close(self) -> None:
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    async def aclose(self) -> None:
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+        self._async_host_semaphores.clear()
+        self.close()
+
+
+http_client = OutboundHttpClient(
+    timeout_seconds=HTTP_CLIENT_TIMEOUT_SECONDS,
+    connect_timeout_seconds=HTTP_CLIENT_CONNECT_TIMEOUT_SECONDS,
+    max_connections=HTTP_CLIENT_MAX_CONNECTIONS,
+    max_keepalive_connections=HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry_seconds=HTTP_CLIENT_KEEPALIVE_EXPIRY_SECONDS,
+    max_connections_per_host=HTTP_CLIENT_MAX_CONNECTIONS_PER_HOST,
+    retries=HTTP_CLIENT_RETRIES,
+    retry_backoff_seconds=HTTP_CLIENT_RETRY_BACKOFF_SECONDS,
+)
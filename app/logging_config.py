@@ -0,0 +1,128 @@
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import random
+from datetime import datetime, timezone
+
+from app.config import LOG_FORMAT, LOG_LEVEL, LOG_SAMPLE_RATES
+
+# Attributes every LogRecord has; anything else was passed through ``extra=``.
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with the ``extra=`` fields at the top level."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exc_info"] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class RouteSamplingFilter(logging.Filter):
+    """Keeps only a fraction of the INFO/DEBUG records of busy routes.
+
+    Records opt in by passing ``extra={"route": ...}``; the rate comes from
+    ``LOG_SAMPLE_RATES`` (``"/auth/refresh=0.1,/health=0"``). Warnings and
+    errors are always kept.
+    """
+
+    def __init__(self, rates: dict[str, float], rng: random.Random | None = None):
+        super().__init__()
+        self._rates = rates
+        self._random = (rng or random.Random()).random
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rates.get(getattr(record, "route", None))
+        if rate is None:
+            return True
+        if self._random() >= rate:
+            return False
+        record.sample_rate = rate
+        return True
+
+
+_traceback_formatter = logging.Formatter()
+
+
+class RecordQueueHandler(logging.handlers.QueueHandler):
+    """Enqueues the record as logged, leaving all formatting to the listener.
+
+    The stdlib ``prepare`` merges the arguments and the traceback into
+    ``msg`` and drops ``exc_info``, so the JSON output would lose its
+    ``exc_info`` field. Here only what cannot cross a thread boundary is
+    resolved: the traceback becomes ``exc_text``.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _traceback_formatter.formatException(record.exc_info)
+            # Traceback objects keep frames (and their locals) alive.
+            record.exc_info = None
+        return record
+
+
+def parse_sample_rates(raw: str) -> dict[str, float]:
+    rates = {}
+    for item in raw.split(","):
+        route, separator, rate = item.strip().rpartition("=")
+        if separator and route:
+            rates[route] = min(max(float(rate), 0.0), 1.0)
+    return rates
+
+
+_listener: logging.handlers.QueueListener | None = None
+_queue_handler: RecordQueueHandler | None = None
+
+
+def start_logging() -> None:
+    """Route the root logger through a queue drained by a background thread.
+
+    Callers on the event loop only enqueue the record; formatting to JSON and
+    writing to stderr happen on the listener thread.
+    """
+    global _listener, _queue_handler
+    stop_logging()
+
+    output = logging.StreamHandler()
+    if LOG_FORMAT == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _queue_handler = RecordQueueHandler(log_queue)
+    _queue_handler.addFilter(RouteSamplingFilter(parse_sample_rates(LOG_SAMPLE_RATES)))
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+
+    root = logging.getLogger()
+    root.addHandler(_queue_handler)
+    root.setLevel(LOG_LEVEL)
+    _listener.start()
+
+
+def stop_logging() -> None:
+    """Flush queued records and detach the queue handler."""
+    global _listener, _queue_handler
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
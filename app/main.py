@@ -1,52 +1,115 @@
+import asyncio
 import logging
+import os
 import time
+from contextlib import asynccontextmanager
 
+import anyio.to_thread
 from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, Response
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+
+from app.database import async_engine, engine, Base
+from app.config import (
+    AUTH_SWEEPER_ENABLED,
+    AUTH_SWEEPER_INTERVAL_SECONDS,
+    AUTO_CREATE_TABLES,
+    BACKEND_CORS_ORIGINS,
+    COMPRESSION_ENABLED,
+    CORS_MAX_AGE_SECONDS,
+    HOTMART_INBOX_POLL_SECONDS,
+    HOTMART_INBOX_WORKER_ENABLED,
+    METRICS_ENABLED,
+    SQL_STATS_ENABLED,
+    THREADPOOL_SIZE,
+    WARMUP_ENABLED,
+)
+from app.exceptions import DependencyUnavailableError, FreeLimitReachedError
+from app.http_client import http_client
+from app.logging_config import start_logging, stop_logging
+from app.metrics import mark_worker_dead, render_metrics
+from app.middleware import (
+    AuthAuditMiddleware,
+    CompressionMiddleware,
+    MetricsMiddleware,
+    ReadYourWritesMiddleware,
+    SQLStatsMiddleware,
+    observe_threadpool,
+)
+from app.resilience import check_thread_budget
+from app.routers import auth, profiles, exercises, attempts, dashboard, hotmart, vestibular
+from app.scheduler import run_periodically
+from app.services.hotmart_service import drain_hotmart_inbox
+from app.services.maintenance_service import run_auth_sweeper
+from app.warmup import run_warmup, warmup_state
+
+logger = logging.getLogger(__name__)
 
-from app.database import engine, Base
-from app.config import AUTO_CREATE_TABLES, BACKEND_CORS_ORIGINS
-from app.exceptions import FreeLimitReachedError
-from app.routers import auth, profiles, exercises, attempts, hotmart, vestibular
 
-if AUTO_CREATE_TABLES:
+def _create_tables() -> None:
+    # Development convenience only; production schemas come from
+    # ``python -m app.cli migrate``. Running it here instead of at import keeps
+    # module loading free of network round trips.
+    start = time.perf_counter()
     Base.metadata.create_all(bind=engine)
+    logger.info("schema_create_all duration_ms=%.2f", (time.perf_counter() - start) * 1000)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start_logging()
+    check_thread_budget(THREADPOOL_SIZE)
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    # app.server creates the tables once in the master before forking.
+    if AUTO_CREATE_TABLES and not getattr(app.state, "schema_created", False):
+        await run_in_threadpool(_create_tables)
+
+    background_jobs = []
+    if WARMUP_ENABLED:
+        # Runs while the server already answers /health; /ready waits for it.
+        background_jobs.append(asyncio.create_task(run_warmup(app)))
+    else:
+        warmup_state.ready = True
+    if AUTH_SWEEPER_ENABLED:
+        background_jobs.append(
+            asyncio.create_task(
+                run_periodically("auth_sweeper", AUTH_SWEEPER_INTERVAL_SECONDS, run_auth_sweeper)
+            )
+        )
+    if HOTMART_INBOX_WORKER_ENABLED:
+        background_jobs.append(
+            asyncio.create_task(
+                run_periodically("hotmart_inbox", HOTMART_INBOX_POLL_SECONDS, drain_hotmart_inbox)
+            )
+        )
+
+    yield
+
+    for job in background_jobs:
+        job.cancel()
+    await asyncio.gather(*background_jobs, return_exceptions=True)
+    await http_client.aclose()
+    if async_engine is not None:
+        await async_engine.dispose()
+    mark_worker_dead(os.getpid())
+    stop_logging()
+
 
 app = FastAPI(
     title="ProvaLab API",
     description="API para plataforma de exercícios educacionais",
     version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
-logger = logging.getLogger(__name__)
-
 
 @app.options("/{path:path}")
 async def options_handler(path: str):
     return Response(status_code=200)
 
 
-@app.middleware("http")
-async def auth_audit_middleware(request: Request, call_next):
-    start = time.perf_counter()
-    response = await call_next(request)
-    elapsed_ms = (time.perf_counter() - start) * 1000
-
-    if request.url.path.startswith("/auth"):
-        client_ip = request.client.host if request.client else "unknown"
-        logger.info(
-            "auth_audit method=%s path=%s status=%s ip=%s duration_ms=%.2f",
-            request.method,
-            request.url.path,
-            response.status_code,
-            client_ip,
-            elapsed_ms,
-        )
-
-    return response
-
-
 @app.exception_handler(FreeLimitReachedError)
 async def free_limit_reached_handler(
     request: Request,
@@ -61,6 +124,35 @@ async def free_limit_reached_handler(
     )
 
 
+@app.exception_handler(DependencyUnavailableError)
+async def dependency_unavailable_handler(
+    request: Request,
+    exc: DependencyUnavailableError,
+):
+    logger.warning(
+        "dependency_unavailable dependency=%s path=%s retry_after=%s",
+        exc.dependency,
+        request.url.path,
+        exc.retry_after_seconds,
+    )
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Serviço temporariamente indisponível. Tente novamente em instantes."},
+        headers={"Retry-After": str(exc.retry_after_seconds)},
+    )
+
+
+# Innermost first: the audit log reads the SQL stats from the request state,
+# and compression sits inside the metrics so its CPU time is measured.
+app.add_middleware(ReadYourWritesMiddleware)
+if COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+if SQL_STATS_ENABLED:
+    app.add_middleware(SQLStatsMiddleware)
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+app.add_middleware(AuthAuditMiddleware)
+
 # Configurar CORS
 cors_allow_credentials = "*" not in BACKEND_CORS_ORIGINS
 
@@ -70,6 +162,11 @@ app.add_middleware(
     allow_credentials=cors_allow_credentials,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Lets browser clients read the validator for their own If-None-Match.
+    expose_headers=["ETag"],
+    # Preflights are answered here, before routing (options_handler only sees
+    # plain OPTIONS requests); max_age lets browsers reuse each answer.
+    max_age=CORS_MAX_AGE_SECONDS,
 )
 
 # Registrar rotas
@@ -79,6 +176,7 @@ app.include_router(exercises.router)
 app.include_router(attempts.router)
 app.include_router(hotmart.router)
 app.include_router(vestibular.router)
+app.include_router(dashboard.router)
 
 
 @app.get("/")
@@ -93,3 +191,23 @@ def root():
 @app.get("/health")
 def health():
     return {"status": "ok"}
+
+
+@app.get("/ready")
+async def ready():
+    if not warmup_state.ready:
+        return JSONResponse(status_code=503, content={"status": "warming_up", "steps": warmup_state.steps})
+    return {
+        "status": "ready",
+        "warmup_ms": round(warmup_state.duration_ms, 2),
+        "steps": warmup_state.steps,
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    if not METRICS_ENABLED:
+        return Response(status_code=404)
+    observe_threadpool()
+    payload, content_type = render_metrics()
+    return Response(content=payload, media_type=content_type)
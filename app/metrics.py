@@ -0,0 +1,171 @@
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from app.config import PROMETHEUS_MULTIPROC_DIR
+
+OUTBOUND_HTTP_DURATION_SECONDS = Histogram(
+    "outbound_http_request_duration_seconds",
+    "Latency of outbound HTTP calls made by the shared client.",
+    ["host", "method", "status"],
+    buckets=(0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0),
+)
+OUTBOUND_HTTP_RETRIES_TOTAL = Counter(
+    "outbound_http_retries_total",
+    "Outbound HTTP attempts that were retried.",
+    ["host", "method"],
+)
+
+DEPENDENCY_CIRCUIT_STATE = Gauge(
+    "dependency_circuit_state",
+    "Circuit breaker state per outbound dependency (0=closed, 1=half_open, 2=open).",
+    ["dependency"],
+    multiprocess_mode="livemax",
+)
+DEPENDENCY_CALLS_TOTAL = Counter(
+    "dependency_calls_total",
+    "Calls to outbound dependencies by outcome.",
+    ["dependency", "outcome"],
+)
+DEPENDENCY_BULKHEAD_IN_FLIGHT = Gauge(
+    "dependency_bulkhead_in_flight",
+    "Calls currently holding a bulkhead slot.",
+    ["dependency"],
+    multiprocess_mode="livesum",
+)
+DEPENDENCY_BULKHEAD_QUEUED = Gauge(
+    "dependency_bulkhead_queued",
+    "Calls waiting for a bulkhead slot.",
+    ["dependency"],
+    multiprocess_mode="livesum",
+)
+
+AUTH_SWEEPER_ROWS_PURGED_TOTAL = Counter(
+    "auth_sweeper_rows_purged_total",
+    "Expired or revoked auth rows deleted by the sweeper.",
+    ["table"],
+)
+AUTH_SWEEPER_RUN_DURATION_SECONDS = Histogram(
+    "auth_sweeper_run_duration_seconds",
+    "Duration of one auth sweeper run.",
+)
+
+HOTMART_INBOX_EVENTS_TOTAL = Counter(
+    "hotmart_inbox_events_total",
+    "Hotmart webhook events by inbox outcome.",
+    ["outcome"],
+)
+HOTMART_INBOX_PROCESSING_LAG_SECONDS = Histogram(
+    "hotmart_inbox_processing_lag_seconds",
+    "Time between receiving a Hotmart webhook and finishing its processing.",
+    buckets=(0.1, 0.5, 1.0, 5.0, 30.0, 60.0, 300.0, 900.0, 3600.0, 21600.0),
+)
+
+DB_READ_ROUTING_TOTAL = Counter(
+    "db_read_routing_total",
+    "Read-runner database calls by target (replica, primary, primary_fallback).",
+    ["target"],
+)
+
+HTTP_REQUEST_DURATION_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Latency of HTTP requests by route template.",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being handled.",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+HTTP_REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "SQL statements issued per HTTP request.",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+HTTP_REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds",
+    "Cumulative SQL execution time per HTTP request.",
+    ["route"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+SQL_N_PLUS_ONE_TOTAL = Counter(
+    "sql_n_plus_one_total",
+    "Requests that repeated an identical SQL statement past the N+1 threshold.",
+    ["route"],
+)
+
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections",
+    "Connections currently checked out of the SQLAlchemy pool.",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_OPEN_CONNECTIONS = Gauge(
+    "db_pool_open_connections",
+    "Connections currently open in the SQLAlchemy pool (idle and checked out).",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow_connections",
+    "Connections open beyond pool_size (max_overflow in use).",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKOUTS_TOTAL = Counter(
+    "db_pool_checkouts_total",
+    "Connection checkouts from the SQLAlchemy pool.",
+    ["pool"],
+)
+DB_POOL_CHECKOUT_WAIT_SECONDS = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection, including opening a new one.",
+    ["pool"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+THREADPOOL_BUSY_THREADS = Gauge(
+    "threadpool_busy_threads",
+    "Worker threads of the sync-endpoint threadpool currently in use.",
+    multiprocess_mode="livesum",
+)
+THREADPOOL_MAX_THREADS = Gauge(
+    "threadpool_max_threads",
+    "Size of the sync-endpoint threadpool.",
+    multiprocess_mode="livesum",
+)
+THREADPOOL_QUEUED_TASKS = Gauge(
+    "threadpool_queued_tasks",
+    "Calls waiting for a free threadpool worker.",
+    multiprocess_mode="livesum",
+)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Serialize every metric in the text exposition format.
+
+    With ``PROMETHEUS_MULTIPROC_DIR`` set (one directory shared by all
+    uvicorn/gunicorn workers) the values of every worker are aggregated, so
+    any worker can answer the scrape.
+    """
+    if PROMETHEUS_MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_worker_dead(pid: int) -> None:
+    if PROMETHEUS_MULTIPROC_DIR:
+        multiprocess.mark_process_dead(pid)
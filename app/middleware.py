@@ -0,0 +1,305 @@
+import logging
+import math
+import time
+from http.cookies import SimpleCookie
+
+import anyio.to_thread
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.compression import choose_encoding, compress, weaken_etag
+from app.config import (
+    COMPRESSION_MIN_SIZE,
+    DB_REPLICA_STICKY_COOKIE_NAME,
+    ENVIRONMENT,
+    METRICS_ENABLED,
+    REFRESH_TOKEN_COOKIE_SAMESITE,
+    REFRESH_TOKEN_COOKIE_SECURE,
+    SQL_N_PLUS_ONE_THRESHOLD,
+)
+from app.database import recent_writers, request_writer
+from app.metrics import (
+    HTTP_REQUEST_DB_QUERIES,
+    HTTP_REQUEST_DB_SECONDS,
+    HTTP_REQUEST_DURATION_SECONDS,
+    HTTP_REQUESTS_IN_FLIGHT,
+    SQL_N_PLUS_ONE_TOTAL,
+    THREADPOOL_BUSY_THREADS,
+    THREADPOOL_MAX_THREADS,
+    THREADPOOL_QUEUED_TASKS,
+)
+from app.query_stats import track_queries
+
+# Plain ASGI middlewares: unlike @app.middleware("http") (BaseHTTPMiddleware)
+# they add no extra task or response stream per request, and they only watch
+# the messages going to the client.
+
+logger = logging.getLogger(__name__)
+
+
+def route_label(scope: Scope) -> str:
+    # The route template keeps label cardinality bounded (no ids in paths).
+    return getattr(scope.get("route"), "path", "unmatched")
+
+
+def observe_threadpool() -> None:
+    # Sync endpoints and run_in_threadpool share anyio's default limiter.
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    THREADPOOL_BUSY_THREADS.set(limiter.borrowed_tokens)
+    THREADPOOL_MAX_THREADS.set(limiter.total_tokens)
+    THREADPOOL_QUEUED_TASKS.set(limiter.statistics().tasks_waiting)
+
+
+class SQLStatsMiddleware:
+    """Counts the SQL each request runs, adds ``Server-Timing`` and flags N+1 patterns."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        with track_queries() as stats:
+            # Outer middlewares read the stats from the request state.
+            scope.setdefault("state", {})["query_stats"] = stats
+
+            async def send_with_timing(message: Message) -> None:
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    elapsed_ms = (time.perf_counter() - start) * 1000
+                    MutableHeaders(scope=message).append(
+                        "Server-Timing",
+                        f'app;dur={elapsed_ms:.2f}, db;dur={stats.duration_ms:.2f};desc="{stats.count} queries"',
+                    )
+                await send(message)
+
+            await self.app(scope, receive, send_with_timing)
+
+        route = route_label(scope)
+        if METRICS_ENABLED:
+            HTTP_REQUEST_DB_QUERIES.labels(route=route).observe(stats.count)
+            HTTP_REQUEST_DB_SECONDS.labels(route=route).observe(stats.duration_seconds)
+        for statement, repeats in stats.repeated_statements(SQL_N_PLUS_ONE_THRESHOLD):
+            if METRICS_ENABLED:
+                SQL_N_PLUS_ONE_TOTAL.labels(route=route).inc()
+            logger.warning(
+                "sql_n_plus_one method=%s route=%s repeats=%s statement=%s",
+                scope["method"],
+                route,
+                repeats,
+                " ".join(statement.split())[:300],
+                extra={"route": route, "repeats": repeats},
+            )
+        logger.debug(
+            "request_sql method=%s route=%s status=%s queries=%s db_ms=%.2f duration_ms=%.2f",
+            scope["method"],
+            route,
+            status_code,
+            stats.count,
+            stats.duration_ms,
+            (time.perf_counter() - start) * 1000,
+            extra={"route": route},
+        )
+
+
+class MetricsMiddleware:
+    """Request latency and in-flight gauges, labelled by route template."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        in_flight = HTTP_REQUESTS_IN_FLIGHT.labels(method=scope["method"])
+        in_flight.inc()
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_flight.dec()
+            HTTP_REQUEST_DURATION_SECONDS.labels(
+                method=scope["method"],
+                route=route_label(scope),
+                status=str(status_code),
+            ).observe(time.perf_counter() - start)
+            observe_threadpool()
+
+
+class AuthAuditMiddleware:
+    """Logs one structured line per ``/auth`` request; other paths pass straight through."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith("/auth"):
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            client = scope.get("client")
+            query_stats = scope.get("state", {}).get("query_stats")
+            queries = query_stats.count if query_stats else 0
+            db_ms = query_stats.duration_ms if query_stats else 0.0
+            logger.info(
+                "auth_audit method=%s path=%s status=%s ip=%s duration_ms=%.2f queries=%s db_ms=%.2f",
+                scope["method"],
+                scope["path"],
+                status_code,
+                client[0] if client else "unknown",
+                elapsed_ms,
+                queries,
+                db_ms,
+                extra={
+                    "event": "auth_audit",
+                    "route": route_label(scope),
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status_code,
+                    "ip": client[0] if client else "unknown",
+                    "duration_ms": round(elapsed_ms, 2),
+                    "queries": queries,
+                    "db_ms": round(db_ms, 2),
+                },
+            )
+
+
+class ReadYourWritesMiddleware:
+    """Sends the signed ``recent_write`` cookie after a request that committed a user's write.
+
+    Workers do not share their in-process record of recent writers; the cookie
+    lets whichever worker serves the user's next read keep it on the primary.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        # Same attributes as the refresh token cookie.
+        self._samesite = (
+            REFRESH_TOKEN_COOKIE_SAMESITE if REFRESH_TOKEN_COOKIE_SAMESITE in {"lax", "strict", "none"} else "lax"
+        )
+        self._secure = REFRESH_TOKEN_COOKIE_SECURE and ENVIRONMENT not in {"development", "test"}
+
+    def _cookie(self, user_id) -> str:
+        cookie: SimpleCookie = SimpleCookie()
+        cookie[DB_REPLICA_STICKY_COOKIE_NAME] = recent_writers.write_marker(user_id)
+        morsel = cookie[DB_REPLICA_STICKY_COOKIE_NAME]
+        morsel["max-age"] = math.ceil(recent_writers.window_seconds)
+        morsel["path"] = "/"
+        morsel["httponly"] = True
+        morsel["samesite"] = self._samesite
+        if self._secure:
+            morsel["secure"] = True
+        return morsel.OutputString()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        writer: dict = {}
+        token = request_writer.set(writer)
+
+        async def send_with_marker(message: Message) -> None:
+            if message["type"] == "http.response.start" and "user_id" in writer:
+                MutableHeaders(scope=message).append("Set-Cookie", self._cookie(writer["user_id"]))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_marker)
+        finally:
+            request_writer.reset(token)
+
+
+def _is_compressible(content_type: str) -> bool:
+    return content_type.startswith("text/") or any(kind in content_type for kind in ("json", "xml", "javascript"))
+
+
+class CompressionMiddleware:
+    """gzip/brotli for single-message responses of at least ``minimum_size`` bytes.
+
+    Streaming responses, bodies that already carry ``Content-Encoding`` (such
+    as ``PrecompressedResponse``) and non-text types are sent untouched.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        start_message: Message | None = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                # Held until the first body chunk tells whether to compress.
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            passthrough = True
+            headers = MutableHeaders(scope=start_message)
+            body = message.get("body", b"")
+            if "content-encoding" in headers or not _is_compressible(headers.get("content-type", "")):
+                await send(start_message)
+                await send(message)
+                return
+
+            headers.add_vary_header("Accept-Encoding")
+            compressed = None
+            if encoding is not None and not message.get("more_body", False) and len(body) >= self.minimum_size:
+                compressed = compress(body, encoding)
+            if compressed is None or len(compressed) >= len(body):
+                await send(start_message)
+                await send(message)
+                return
+
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            if "etag" in headers:
+                headers["ETag"] = weaken_etag(headers["etag"])
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
+        if start_message is not None and not passthrough:
+            await send(start_message)
@@ -14,6 +14,7 @@ from sqlalchemy import (
     Uuid,
     UniqueConstraint,
     CheckConstraint,
+    func,
 )
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -43,6 +44,8 @@ class User(Base):
     google_id = Column(String(255), unique=True, nullable=True, index=True)
     email_verified = Column(Boolean, nullable=False, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Case-insensitive lookups (Hotmart buyers, reconciliation) filter on lower(email).
+    __table_args__ = (Index("idx_users_email_lower", func.lower(email)),)
     
     profile = relationship("Profile", back_populates="user", uselist=False)
     plan_profile = relationship(
@@ -67,6 +70,7 @@ class User(Base):
         "RefreshSession", back_populates="user", cascade="all, delete-orphan"
     )
 
+
 class Profile(Base):
     __tablename__ = "profiles"
     
@@ -99,6 +103,7 @@ class Exercise(Base):
     level = Column(String(50), nullable=True)
     exam_year = Column(Integer, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     attempts = relationship("ExerciseAttempt", back_populates="exercise")
 
@@ -106,6 +111,8 @@ class ExerciseAttempt(Base):
     __tablename__ = "exercise_attempts"
     __table_args__ = (
         Index("idx_attempts_user_created_at", "user_id", "created_at"),
+        # exclude_answered anti-join: NOT IN (attempts of this user) probes by exercise.
+        Index("idx_attempts_user_exercise", "user_id", "exercise_id"),
     )
     
     id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -172,6 +179,11 @@ class UserVestibularProgress(Base):
 
 class EmailVerificationCode(Base):
     __tablename__ = "email_verification_codes"
+    __table_args__ = (
+        Index("idx_verification_codes_user_created_at", "user_id", "created_at"),
+        Index("idx_verification_codes_request_ip_created_at", "request_ip", "created_at"),
+        Index("idx_verification_codes_expires_at", "expires_at"),
+    )
 
     id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(
@@ -189,6 +201,11 @@ class EmailVerificationCode(Base):
 
 class PasswordResetToken(Base):
     __tablename__ = "password_reset_tokens"
+    __table_args__ = (
+        Index("idx_password_reset_user_created_at", "user_id", "created_at"),
+        Index("idx_password_reset_request_ip_created_at", "request_ip", "created_at"),
+        Index("idx_password_reset_expires_at", "expires_at"),
+    )
 
     id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(
@@ -205,6 +222,11 @@ class PasswordResetToken(Base):
 
 class RefreshSession(Base):
     __tablename__ = "refresh_sessions"
+    __table_args__ = (
+        Index("idx_refresh_sessions_user_id", "user_id"),
+        Index("idx_refresh_sessions_expires_at", "expires_at"),
+        Index("idx_refresh_sessions_revoked_at", "revoked_at"),
+    )
 
     id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(
@@ -236,3 +258,25 @@ class UserProfile(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     user = relationship("User", back_populates="plan_profile")
+
+
+class HotmartWebhookEvent(Base):
+    __tablename__ = "hotmart_webhook_inbox"
+    __table_args__ = (
+        Index("idx_hotmart_inbox_status_next_attempt", "status", "next_attempt_at"),
+        Index("idx_hotmart_inbox_buyer_received", "buyer_email", "received_at"),
+    )
+
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    idempotency_key = Column(String(255), nullable=False, unique=True)
+    event_name = Column(String(100), nullable=False, default="")
+    buyer_email = Column(String(255), nullable=True)
+    purchase_id = Column(Text, nullable=True)
+    purchase_status = Column(String(50), nullable=True)
+    payload = Column(JSON, nullable=False)
+    status = Column(String(20), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    detail = Column(Text, nullable=True)
+    received_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    processed_at = Column(DateTime, nullable=True)
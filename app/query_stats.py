@@ -0,0 +1,71 @@
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+@dataclass
+class QueryStats:
+    """SQL statements issued while a request (or a ``track_queries`` block) ran."""
+
+    count: int = 0
+    duration_seconds: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+
+    @property
+    def duration_ms(self) -> float:
+        return self.duration_seconds * 1000
+
+    def repeated_statements(self, threshold: int) -> list[tuple[str, int]]:
+        """Identical statements run at least ``threshold`` times, the usual N+1 shape."""
+        return [
+            (statement, repeats)
+            for statement, repeats in self.statements.most_common()
+            if repeats >= threshold
+        ]
+
+
+# The object is shared by reference, so statements run from threadpool workers
+# and ``AsyncSession.run_sync`` (which inherit a copy of the context) still
+# land in the request's stats.
+_current_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_statement_timer(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _current_stats.get() is not None:
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_statement(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _current_stats.get()
+    started = conn.info.get("query_started_at")
+    if stats is None or not started:
+        return
+    stats.count += 1
+    stats.duration_seconds += time.perf_counter() - started.pop()
+    stats.statements[statement] += 1
+
+
+@event.listens_for(Engine, "handle_error")
+def _discard_failed_statement(exception_context) -> None:
+    connection = exception_context.connection
+    started = connection.info.get("query_started_at") if connection is not None else None
+    if started:
+        started.pop()
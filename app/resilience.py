@@ -0,0 +1,299 @@
+import asyncio
+import logging
+import math
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Callable, Iterator
+
+from app.config import (
+    CIRCUIT_BREAKER_FAILURE_RATE,
+    CIRCUIT_BREAKER_MIN_CALLS,
+    CIRCUIT_BREAKER_OPEN_SECONDS,
+    CIRCUIT_BREAKER_SLOW_CALL_RATE,
+    CIRCUIT_BREAKER_SLOW_CALL_SECONDS,
+    CIRCUIT_BREAKER_WINDOW_SIZE,
+    OUTBOUND_BULKHEAD_MAX_CONCURRENT,
+    OUTBOUND_BULKHEAD_MAX_QUEUE,
+    OUTBOUND_BULKHEAD_QUEUE_TIMEOUT_SECONDS,
+)
+from app.exceptions import DependencyUnavailableError
+from app.metrics import (
+    DEPENDENCY_BULKHEAD_IN_FLIGHT,
+    DEPENDENCY_BULKHEAD_QUEUED,
+    DEPENDENCY_CALLS_TOTAL,
+    DEPENDENCY_CIRCUIT_STATE,
+)
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitBreaker:
+    """Opens after too many failed or slow calls in a rolling window of outcomes.
+
+    While open every call is rejected with the remaining cool-down as Retry-After.
+    After the cool-down a single trial call is let through (half-open); its
+    outcome decides whether the breaker closes again or re-opens.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        window_size: int,
+        min_calls: int,
+        failure_rate: float,
+        slow_call_seconds: float,
+        slow_call_rate: float,
+        open_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self._window: deque[tuple[bool, bool]] = deque(maxlen=window_size)
+        self._min_calls = min_calls
+        self._failure_rate = failure_rate
+        self._slow_call_seconds = slow_call_seconds
+        self._slow_call_rate = slow_call_rate
+        self._open_seconds = open_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        DEPENDENCY_CIRCUIT_STATE.labels(dependency=name).set(0)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self._open_seconds:
+            self._set_state(HALF_OPEN)
+        return self._state
+
+    def _set_state(self, state: str) -> None:
+        if state != self._state:
+            logger.warning("circuit_breaker_transition dependency=%s from=%s to=%s", self.name, self._state, state)
+        self._state = state
+        DEPENDENCY_CIRCUIT_STATE.labels(dependency=self.name).set(_STATE_VALUES[state])
+
+    def _retry_after_seconds(self) -> int:
+        remaining = self._open_seconds - (self._clock() - self._opened_at)
+        return max(1, math.ceil(remaining))
+
+    def reject_if_open(self) -> None:
+        with self._lock:
+            if self._current_state() != OPEN:
+                return
+            retry_after = self._retry_after_seconds()
+        DEPENDENCY_CALLS_TOTAL.labels(dependency=self.name, outcome="short_circuited").inc()
+        raise DependencyUnavailableError(self.name, retry_after)
+
+    def before_call(self) -> None:
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return
+            if state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+            retry_after = self._retry_after_seconds() if state == OPEN else 1
+        DEPENDENCY_CALLS_TOTAL.labels(dependency=self.name, outcome="short_circuited").inc()
+        raise DependencyUnavailableError(self.name, retry_after)
+
+    def record(self, success: bool, duration_seconds: float) -> None:
+        slow = duration_seconds >= self._slow_call_seconds
+        DEPENDENCY_CALLS_TOTAL.labels(
+            dependency=self.name,
+            outcome="success" if success else "failure",
+        ).inc()
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._trial_in_flight = False
+                if success and not slow:
+                    self._window.clear()
+                    self._set_state(CLOSED)
+                else:
+                    self._open()
+                return
+
+            self._window.append((success, slow))
+            if len(self._window) < self._min_calls:
+                return
+            failures = sum(1 for ok, _ in self._window if not ok)
+            slow_calls = sum(1 for _, is_slow in self._window if is_slow)
+            if (
+                failures / len(self._window) >= self._failure_rate
+                or slow_calls / len(self._window) >= self._slow_call_rate
+            ):
+                self._open()
+
+    def release_trial(self) -> None:
+        """Frees the half-open trial slot of a call that ended without an outcome (cancelled)."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def _open(self) -> None:
+        self._opened_at = self._clock()
+        self._window.clear()
+        self._set_state(OPEN)
+
+
+class Bulkhead:
+    """Caps concurrent calls to one dependency and bounds how many may wait.
+
+    Callers beyond ``max_concurrent + max_queue`` are rejected immediately, and
+    queued callers give up after ``queue_timeout_seconds``, so a slow provider can
+    only ever hold a fixed number of worker threads.
+    """
+
+    def __init__(self, name: str, *, max_concurrent: int, max_queue: int, queue_timeout_seconds: float):
+        self.name = name
+        self._max_concurrent = max_concurrent
+        self._max_queue = max_queue
+        self._queue_timeout_seconds = queue_timeout_seconds
+        self._semaphore = threading.BoundedSemaphore(max_concurrent)
+        self._async_semaphore: asyncio.Semaphore | None = None
+        self._lock = threading.Lock()
+        self._queued = 0
+
+    def _reject(self) -> DependencyUnavailableError:
+        DEPENDENCY_CALLS_TOTAL.labels(dependency=self.name, outcome="rejected").inc()
+        return DependencyUnavailableError(self.name, 1)
+
+    def _enqueue(self) -> None:
+        with self._lock:
+            if self._queued >= self._max_queue:
+                raise self._reject()
+            self._queued += 1
+        DEPENDENCY_BULKHEAD_QUEUED.labels(dependency=self.name).inc()
+
+    def _dequeue(self) -> None:
+        with self._lock:
+            self._queued -= 1
+        DEPENDENCY_BULKHEAD_QUEUED.labels(dependency=self.name).dec()
+
+    @contextmanager
+    def acquire(self) -> Iterator[None]:
+        if not self._semaphore.acquire(blocking=False):
+            self._enqueue()
+            try:
+                acquired = self._semaphore.acquire(timeout=self._queue_timeout_seconds)
+            finally:
+                self._dequeue()
+            if not acquired:
+                raise self._reject()
+        DEPENDENCY_BULKHEAD_IN_FLIGHT.labels(dependency=self.name).inc()
+        try:
+            yield
+        finally:
+            DEPENDENCY_BULKHEAD_IN_FLIGHT.labels(dependency=self.name).dec()
+            self._semaphore.release()
+
+    @asynccontextmanager
+    async def acquire_async(self) -> AsyncIterator[None]:
+        if self._async_semaphore is None:
+            self._async_semaphore = asyncio.Semaphore(self._max_concurrent)
+        semaphore = self._async_semaphore
+        if semaphore.locked():
+            self._enqueue()
+            try:
+                await asyncio.wait_for(semaphore.acquire(), timeout=self._queue_timeout_seconds)
+            except asyncio.TimeoutError:
+                raise self._reject()
+            finally:
+                self._dequeue()
+        else:
+            await semaphore.acquire()
+        DEPENDENCY_BULKHEAD_IN_FLIGHT.labels(dependency=self.name).inc()
+        try:
+            yield
+        finally:
+            DEPENDENCY_BULKHEAD_IN_FLIGHT.labels(dependency=self.name).dec()
+            semaphore.release()
+
+
+class DependencyGuard:
+    def __init__(self, name: str, breaker: CircuitBreaker, bulkhead: Bulkhead):
+        self.name = name
+        self.breaker = breaker
+        self.bulkhead = bulkhead
+
+    @contextmanager
+    def admit(self) -> Iterator[None]:
+        # Cheap check first so an open breaker never makes callers queue.
+        self.breaker.reject_if_open()
+        with self.bulkhead.acquire():
+            self.breaker.before_call()
+            yield
+
+    @asynccontextmanager
+    async def admit_async(self) -> AsyncIterator[None]:
+        self.breaker.reject_if_open()
+        async with self.bulkhead.acquire_async():
+            self.breaker.before_call()
+            yield
+
+
+# Dependencies called from request handlers. Their calls block a threadpool
+# worker while in flight and while queued in the bulkhead.
+OUTBOUND_DEPENDENCIES = ("google", "resend")
+
+
+def check_thread_budget(
+    threadpool_size: int,
+    *,
+    max_concurrent: int = OUTBOUND_BULKHEAD_MAX_CONCURRENT,
+    max_queue: int = OUTBOUND_BULKHEAD_MAX_QUEUE,
+) -> None:
+    """Refuse to start when stalled dependencies could hold half the threadpool or more.
+
+    A slow provider holds up to ``max_concurrent + max_queue`` workers; all of
+    them together must leave most of the pool to requests that never leave the
+    database.
+    """
+    budget = len(OUTBOUND_DEPENDENCIES) * (max_concurrent + max_queue)
+    if budget * 2 > threadpool_size:
+        raise RuntimeError(
+            f"Outbound bulkheads can hold {budget} of {threadpool_size} worker threads; "
+            "lower OUTBOUND_BULKHEAD_MAX_CONCURRENT/OUTBOUND_BULKHEAD_MAX_QUEUE or raise THREADPOOL_SIZE."
+        )
+
+
+_guards: dict[str, DependencyGuard] = {}
+_guards_lock = threading.Lock()
+
+
+def get_dependency_guard(name: str) -> DependencyGuard:
+    guard = _guards.get(name)
+    if guard is None:
+        with _guards_lock:
+            guard = _guards.get(name)
+            if guard is None:
+                guard = DependencyGuard(
+                    name,
+                    CircuitBreaker(
+                        name,
+                        window_size=CIRCUIT_BREAKER_WINDOW_SIZE,
+                        min_calls=CIRCUIT_BREAKER_MIN_CALLS,
+                        failure_rate=CIRCUIT_BREAKER_FAILURE_RATE,
+                        slow_call_seconds=CIRCUIT_BREAKER_SLOW_CALL_SECONDS,
+                        slow_call_rate=CIRCUIT_BREAKER_SLOW_CALL_RATE,
+                        open_seconds=CIRCUIT_BREAKER_OPEN_SECONDS,
+                    ),
+                    Bulkhead(
+                        name,
+                        max_concurrent=OUTBOUND_BULKHEAD_MAX_CONCURRENT,
+                        max_queue=OUTBOUND_BULKHEAD_MAX_QUEUE,
+                        queue_timeout_seconds=OUTBOUND_BULKHEAD_QUEUE_TIMEOUT_SECONDS,
+                    ),
+                )
+                _guards[name] = guard
+    return guard
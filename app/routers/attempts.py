@@ -1,111 +1,136 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import case, func
-from sqlalchemy.orm import Session, joinedload
-
-from app.auth import get_current_user
-from app.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import case, func, lambda_stmt, select
+from sqlalchemy.orm import Session
+
+from app.auth import get_current_user_async, get_current_user_for_read
+from app.database import DatabaseRunner, get_db_runner, get_read_db_runner
+from app.hot_queries import hot_query
+from app.http_cache import cache_headers, is_not_modified, make_etag, not_modified
 from app.models import Exercise, ExerciseAttempt, User
 from app.schemas import AttemptCreate, AttemptResponse, ProgressResponse, StatsResponse
+from app.serializers import (
+    ATTEMPT_COLUMNS,
+    EXERCISE_COLUMNS,
+    AttemptRow,
+    ProgressRow,
+    attempt_list_serializer,
+    attempt_rows,
+    json_response,
+    progress_serializer,
+)
 
 router = APIRouter(prefix="/attempts", tags=["Tentativas"])
 
 
 def _get_user_stats(db: Session, user_id) -> tuple[int, int, int]:
-    total, correct = (
-        db.query(
-            func.count(ExerciseAttempt.id),
-            func.coalesce(
-                func.sum(case((ExerciseAttempt.is_correct.is_(True), 1), else_=0)),
-                0,
-            ),
+    total, correct = db.execute(
+        lambda_stmt(
+            lambda: select(
+                func.count(ExerciseAttempt.id),
+                func.coalesce(
+                    func.sum(case((ExerciseAttempt.is_correct.is_(True), 1), else_=0)),
+                    0,
+                ),
+            ).where(ExerciseAttempt.user_id == user_id)
         )
-        .filter(ExerciseAttempt.user_id == user_id)
-        .one()
-    )
+    ).one()
     accuracy = round((correct / total * 100)) if total > 0 else 0
     return total, correct, accuracy
 
 
+@hot_query("attempt_stats")
+async def warm_attempt_stats(runner: DatabaseRunner, user_id) -> None:
+    total, correct, accuracy = await runner.run(_get_user_stats, user_id)
+    StatsResponse(total=total, correct=correct, accuracy=accuracy).model_dump(mode="json")
+
+
+def _recent_attempts(db: Session, user_id, limit: int) -> list[AttemptRow]:
+    rows = db.execute(
+        lambda_stmt(
+            lambda: select(*ATTEMPT_COLUMNS, *EXERCISE_COLUMNS)
+            .outerjoin(Exercise, Exercise.id == ExerciseAttempt.exercise_id)
+            .where(ExerciseAttempt.user_id == user_id)
+            .order_by(ExerciseAttempt.created_at.desc())
+            .limit(limit)
+        )
+    ).all()
+    return attempt_rows(rows)
+
+
+def _load_progress(db: Session, user_id) -> ProgressRow:
+    attempts = _recent_attempts(db, user_id, 100)
+    total, correct, accuracy = _get_user_stats(db, user_id)
+    return {"attempts": attempts, "stats": {"total": total, "correct": correct, "accuracy": accuracy}}
+
+
+def _create_attempt(db: Session, user_id, attempt_data: AttemptCreate) -> ExerciseAttempt:
+    # The response embeds the exercise, so load it whole instead of probing for its id.
+    exercise = db.get(Exercise, attempt_data.exercise_id)
+    if exercise is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Exercício não encontrado.",
+        )
+
+    new_attempt = ExerciseAttempt(
+        user_id=user_id,
+        exercise_id=exercise.id,
+        user_answer=attempt_data.user_answer,
+        is_correct=attempt_data.is_correct,
+        time_spent_seconds=attempt_data.time_spent_seconds,
+        # id and created_at have Python-side defaults, so nothing needs to be
+        # read back after the INSERT.
+    )
+    new_attempt.exercise = exercise
+    db.add(new_attempt)
+    db.commit()
+    return new_attempt
+
+
 @router.get("", response_model=List[AttemptResponse])
-def get_attempts(
+async def get_attempts(
     limit: int = Query(50, ge=1, le=200, description="Limite de resultados"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: DatabaseRunner = Depends(get_db_runner),
+    current_user: User = Depends(get_current_user_async),
 ):
     """Obter histórico de tentativas do usuário."""
-    attempts = (
-        db.query(ExerciseAttempt)
-        .options(joinedload(ExerciseAttempt.exercise))
-        .filter(ExerciseAttempt.user_id == current_user.id)
-        .order_by(ExerciseAttempt.created_at.desc())
-        .limit(limit)
-        .all()
-    )
-    return attempts
+    return json_response(attempt_list_serializer, await db.run(_recent_attempts, current_user.id, limit))
 
 
 @router.get("/stats", response_model=StatsResponse)
-def get_stats(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+async def get_stats(
+    request: Request,
+    response: Response,
+    db: DatabaseRunner = Depends(get_read_db_runner),
+    current_user: User = Depends(get_current_user_for_read),
 ):
     """Obter estatísticas do usuário."""
-    total, correct, accuracy = _get_user_stats(db, current_user.id)
+    total, correct, accuracy = await db.run(_get_user_stats, current_user.id)
+    # The counters are the version: one indexed aggregate, and a poll that
+    # matches skips building and serializing the response.
+    etag = make_etag("attempts/stats", current_user.id, total, correct)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    response.headers.update(cache_headers(etag))
     return StatsResponse(total=total, correct=correct, accuracy=accuracy)
 
 
 @router.get("/progress", response_model=ProgressResponse)
-def get_progress(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+async def get_progress(
+    db: DatabaseRunner = Depends(get_db_runner),
+    current_user: User = Depends(get_current_user_async),
 ):
     """Obter dados de progresso do usuário."""
-    attempts = (
-        db.query(ExerciseAttempt)
-        .options(joinedload(ExerciseAttempt.exercise))
-        .filter(ExerciseAttempt.user_id == current_user.id)
-        .order_by(ExerciseAttempt.created_at.desc())
-        .limit(100)
-        .all()
-    )
-    total, correct, accuracy = _get_user_stats(db, current_user.id)
-
-    return ProgressResponse(
-        attempts=attempts,
-        stats=StatsResponse(total=total, correct=correct, accuracy=accuracy),
-    )
+    return json_response(progress_serializer, await db.run(_load_progress, current_user.id))
 
 
 @router.post("", response_model=AttemptResponse)
-def create_attempt(
+async def create_attempt(
     attempt_data: AttemptCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: DatabaseRunner = Depends(get_db_runner),
+    current_user: User = Depends(get_current_user_async),
 ):
     """Registrar nova tentativa de exercício."""
-    exercise_exists = (
-        db.query(Exercise.id)
-        .filter(Exercise.id == attempt_data.exercise_id)
-        .first()
-    )
-    if not exercise_exists:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Exercício não encontrado.",
-        )
-
-    new_attempt = ExerciseAttempt(
-        user_id=current_user.id,
-        exercise_id=attempt_data.exercise_id,
-        user_answer=attempt_data.user_answer,
-        is_correct=attempt_data.is_correct,
-        time_spent_seconds=attempt_data.time_spent_seconds,
-    )
-    db.add(new_attempt)
-    db.commit()
-    db.refresh(new_attempt)
-    db.refresh(new_attempt, ["exercise"])
-
-    return new_attempt
+    return await db.run(_create_attempt, current_user.id, attempt_data)
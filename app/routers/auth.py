@@ -28,7 +28,7 @@ from app.config import (
     REFRESH_TOKEN_COOKIE_SAMESITE,
     REFRESH_TOKEN_COOKIE_SECURE,
 )
-from app.database import get_db
+from app.database import DatabaseRunner, get_db, get_db_runner
 from app.models import Profile, RefreshSession, User
 from app.schemas import (
     AuthSessionResponse,
@@ -257,7 +257,13 @@ def login(
             message="E-mail não verificado. Enviamos um novo código de confirmação.",
         )
 
-    access_token = create_access_token(data={"sub": str(user.id)})
+    # Built before the commit below expires the user; otherwise serializing it
+    # would reload the user and its profile.
+    session_response = AuthSessionResponse(
+        access_token=create_access_token(data={"sub": str(user.id)}),
+        user=user,
+        profile=user.profile,
+    )
     _issue_refresh_session(
         response=response,
         db=db,
@@ -266,14 +272,10 @@ def login(
     )
     logger.info(
         "auth_login_success user_id=%s duration_ms=%.2f",
-        str(user.id),
+        session_response.user.id,
         (time.perf_counter() - start) * 1000,
     )
-    return AuthSessionResponse(
-        access_token=access_token,
-        user=user,
-        profile=user.profile,
-    )
+    return session_response
 
 
 @router.post("/google", response_model=GoogleAuthResponse)
@@ -282,7 +284,12 @@ def google_auth(
     request: Request,
     db: Session = Depends(get_db),
 ):
-    result = start_google_auth(payload.access_token, db, request.client.host if request.client else None)
+    result = start_google_auth(
+        payload.access_token,
+        db,
+        request.client.host if request.client else None,
+        id_token=payload.id_token,
+    )
     magic_token = create_access_token(
         data={
             "sub": result["user_id"],
@@ -384,16 +391,12 @@ def verify_email_link(
     return TokenResponse(access_token=access_token)
 
 
-@router.post("/refresh", response_model=TokenResponse)
-def refresh_session(
-    request: Request,
+def _rotate_refresh_session(
+    db: Session,
+    refresh_token: str,
     response: Response,
-    db: Session = Depends(get_db),
-):
-    refresh_token = request.cookies.get(REFRESH_TOKEN_COOKIE_NAME)
-    if not refresh_token:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Sessão expirada.")
-
+    request_ip: str | None,
+) -> TokenResponse:
     refresh_token_hash = hash_refresh_token(refresh_token)
     current_session = (
         db.query(RefreshSession)
@@ -429,11 +432,29 @@ def refresh_session(
         response=response,
         db=db,
         user=user,
-        request_ip=request.client.host if request.client else None,
+        request_ip=request_ip,
     )
     return TokenResponse(access_token=access_token)
 
 
+@router.post("/refresh", response_model=TokenResponse)
+async def refresh_session(
+    request: Request,
+    response: Response,
+    db: DatabaseRunner = Depends(get_db_runner),
+):
+    refresh_token = request.cookies.get(REFRESH_TOKEN_COOKIE_NAME)
+    if not refresh_token:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Sessão expirada.")
+
+    return await db.run(
+        _rotate_refresh_session,
+        refresh_token,
+        response,
+        request.client.host if request.client else None,
+    )
+
+
 @router.post("/logout")
 def logout(
     request: Request,
@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Optional
+
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.auth import get_current_user_async
+from app.config import DB_REPLICA_STICKY_COOKIE_NAME
+from app.database import isolated_runner, recent_writers, shares_single_connection
+from app.models import Profile, User
+from app.routers.attempts import _get_user_stats, _recent_attempts
+from app.routers.profiles import _get_profile
+from app.routers.vestibular import _get_user_vestibular_stats
+from app.schemas import (
+    AttemptResponse,
+    DashboardResponse,
+    ProfileResponse,
+    StatsResponse,
+    UserPlanResponse,
+    UserResponse,
+    VestibularStatsResponse,
+)
+from app.serializers import AttemptRow
+from app.services.plan_service import get_plan_profile, is_premium_profile
+
+router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
+logger = logging.getLogger(__name__)
+
+SECTION_UNAVAILABLE = "Seção indisponível no momento."
+
+
+def _profile(profile: Optional[Profile]) -> Optional[ProfileResponse]:
+    return ProfileResponse.model_validate(profile) if profile is not None else None
+
+
+def _stats(row: tuple[int, int, int]) -> StatsResponse:
+    total, correct, accuracy = row
+    return StatsResponse(total=total, correct=correct, accuracy=accuracy)
+
+
+def _vestibular_stats(row: tuple[int, int, int]) -> VestibularStatsResponse:
+    total, correct, accuracy = row
+    return VestibularStatsResponse(exercicios_feitos=total, respostas_corretas=correct, taxa_acerto=accuracy)
+
+
+def _attempts(rows: list[AttemptRow]) -> list[AttemptResponse]:
+    return [AttemptResponse.model_validate(row) for row in rows]
+
+
+async def _load_section(
+    name: str,
+    limiter: asyncio.Semaphore,
+    use_replicas: bool,
+    fn: Callable[..., Any],
+    *args: Any,
+) -> tuple[str, Any, float, bool]:
+    async with limiter:
+        start = time.perf_counter()
+        try:
+            async with isolated_runner(use_replicas=use_replicas) as runner:
+                value = await runner.run(fn, *args)
+        except (SQLAlchemyError, OSError):
+            logger.exception("dashboard_section_failed section=%s", name)
+            return name, None, (time.perf_counter() - start) * 1000, False
+        return name, value, (time.perf_counter() - start) * 1000, True
+
+
+@router.get("", response_model=DashboardResponse)
+async def get_dashboard(
+    request: Request,
+    attempts_limit: int = Query(10, ge=1, le=50, description="Tentativas recentes"),
+    current_user: User = Depends(get_current_user_async),
+):
+    """Perfil, plano, estatísticas e tentativas recentes em uma única chamada.
+
+    As seções são consultadas em paralelo, cada uma na sua conexão; uma seção
+    que falhar volta vazia e aparece em ``errors``.
+    """
+    plan_profile = get_plan_profile(current_user)
+    # (name, loader, converter); the user and the plan came with authentication.
+    sections: list[tuple[str, tuple, Callable[[Any], Any]]] = [
+        ("profile", (_get_profile, current_user.id), _profile),
+        ("stats", (_get_user_stats, current_user.id), _stats),
+        ("attempts", (_recent_attempts, current_user.id, attempts_limit), _attempts),
+    ]
+    if is_premium_profile(plan_profile):
+        sections.append(("vestibular_stats", (_get_user_vestibular_stats, current_user.id), _vestibular_stats))
+
+    # A user who just wrote reads from the primary, as on the single-section routes.
+    use_replicas = not recent_writers.wrote_recently(
+        current_user.id, request.cookies.get(DB_REPLICA_STICKY_COOKIE_NAME)
+    )
+    limiter = asyncio.Semaphore(1 if shares_single_connection() else len(sections))
+    results = await asyncio.gather(
+        *(_load_section(name, limiter, use_replicas, *loader) for name, loader, _ in sections)
+    )
+
+    converters = {name: convert for name, _, convert in sections}
+    payload: dict[str, Any] = {}
+    errors: dict[str, str] = {}
+    timings_ms: dict[str, float] = {}
+    for name, value, elapsed_ms, ok in results:
+        timings_ms[name] = round(elapsed_ms, 2)
+        if ok:
+            payload[name] = converters[name](value)
+        else:
+            errors[name] = SECTION_UNAVAILABLE
+
+    return DashboardResponse(
+        user=UserResponse.model_validate(current_user),
+        plan=UserPlanResponse.model_validate(plan_profile),
+        errors=errors,
+        timings_ms=timings_ms,
+        **payload,
+    )
@@ -1,22 +1,78 @@
 import random
+from datetime import datetime
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import func, lambda_stmt, select
 from sqlalchemy.orm import Session
-from sqlalchemy.sql import func
+from sqlalchemy.sql import StatementLambdaElement
+from starlette.concurrency import run_in_threadpool
 
-from app.auth import get_current_user
-from app.database import get_db
+from app.auth import get_current_user_async, get_current_user_for_read
+from app.compression import PrecompressedCache, PrecompressedResponse, precompress
+from app.config import SEO_CACHE_SIZE
+from app.database import DatabaseRunner, get_db_runner, get_read_db_runner
 from app.dependencies.plan import check_plan_limit
+from app.hot_queries import hot_query
+from app.http_cache import cache_headers, has_validators, is_not_modified, make_etag, not_modified
 from app.models import Exercise, ExerciseAttempt, User
 from app.schemas import ExerciseCreate, ExerciseResponse
+from app.serializers import EXERCISE_COLUMNS, ExerciseRow, exercise_list_serializer, exercise_rows, json_response
 
 router = APIRouter(prefix="/exercises", tags=["Exercises"])
 
+# Public and identical for every visitor: each page is serialized and
+# compressed once per worker, then served from here while its ETag holds.
+seo_page_cache = PrecompressedCache(SEO_CACHE_SIZE)
+
+
+def _with_exercise_filters(stmt: StatementLambdaElement, filters: dict) -> StatementLambdaElement:
+    # One lambda per optional filter: each combination of present filters is a
+    # distinct, cached statement shape, and filter values travel as bound
+    # parameters, so repeat requests skip building and compiling the SQL.
+    subject = filters.get("subject")
+    difficulty = filters.get("difficulty")
+    source = filters.get("source")
+    theme = filters.get("theme")
+    level = filters.get("level")
+    exam_year = filters.get("exam_year")
+    if subject:
+        stmt += lambda s: s.where(Exercise.subject == subject)
+    if difficulty:
+        stmt += lambda s: s.where(Exercise.difficulty == difficulty)
+    if source:
+        stmt += lambda s: s.where(Exercise.source == source)
+    if theme:
+        stmt += lambda s: s.where(Exercise.theme == theme)
+    if level:
+        stmt += lambda s: s.where(Exercise.level == level)
+    if exam_year:
+        stmt += lambda s: s.where(Exercise.exam_year == exam_year)
+    return stmt
+
+
+def _without_answered(stmt: StatementLambdaElement, user_id: UUID) -> StatementLambdaElement:
+    return stmt + (
+        lambda s: s.where(
+            ~Exercise.id.in_(select(ExerciseAttempt.exercise_id).where(ExerciseAttempt.user_id == user_id))
+        )
+    )
+
+
+def _latest_exercises(db: Session, limit: int, filters: dict) -> list[ExerciseRow]:
+    stmt = _with_exercise_filters(lambda_stmt(lambda: select(*EXERCISE_COLUMNS)), filters)
+    stmt += lambda s: s.order_by(Exercise.created_at.desc()).limit(limit)
+    return exercise_rows(db.execute(stmt).all())
+
+
+@hot_query("latest_exercises")
+async def warm_latest_exercises(runner: DatabaseRunner, user_id: UUID) -> None:
+    exercise_list_serializer.dump_json(await runner.run(_latest_exercises, 5, {}))
+
 
 @router.get("", response_model=List[ExerciseResponse])
-def list_exercises(
+async def list_exercises(
     subject: Optional[str] = Query(None, description="Filter by subject"),
     difficulty: Optional[str] = Query(None, description="Filter by difficulty"),
     source: Optional[str] = Query(None, description="Filter by source"),
@@ -24,31 +80,35 @@ def list_exercises(
     level: Optional[str] = Query(None, description="Filter by level"),
     exam_year: Optional[int] = Query(None, description="Filter by exam year"),
     limit: int = Query(50, ge=1, le=100, description="Result limit"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: DatabaseRunner = Depends(get_read_db_runner),
+    current_user: User = Depends(get_current_user_for_read),
 ):
     """List exercises with optional filters."""
-    query = db.query(Exercise)
+    filters = {
+        "subject": subject,
+        "difficulty": difficulty,
+        "source": source,
+        "theme": theme,
+        "level": level,
+        "exam_year": exam_year,
+    }
+    return json_response(exercise_list_serializer, await db.run(_latest_exercises, limit, filters))
 
-    if subject:
-        query = query.filter(Exercise.subject == subject)
-    if difficulty:
-        query = query.filter(Exercise.difficulty == difficulty)
-    if source:
-        query = query.filter(Exercise.source == source)
-    if theme:
-        query = query.filter(Exercise.theme == theme)
-    if level:
-        query = query.filter(Exercise.level == level)
-    if exam_year:
-        query = query.filter(Exercise.exam_year == exam_year)
 
-    exercises = query.order_by(Exercise.created_at.desc()).limit(limit).all()
-    return exercises
+def _page_version(db: Session, limit: int, filters: dict) -> list[tuple]:
+    # Same filters and order as _latest_exercises, but only the id and version
+    # of each row: enough to tell whether the page changed.
+    stmt = _with_exercise_filters(
+        lambda_stmt(lambda: select(Exercise.id, func.coalesce(Exercise.updated_at, Exercise.created_at))),
+        filters,
+    )
+    stmt += lambda s: s.order_by(Exercise.created_at.desc()).limit(limit)
+    return [tuple(row) for row in db.execute(stmt).all()]
 
 
 @router.get("/seo", response_model=List[ExerciseResponse])
-def list_seo_exercises(
+async def list_seo_exercises(
+    request: Request,
     source: Optional[str] = Query(None, description="Question source"),
     theme: Optional[str] = Query(None, description="Question theme"),
     level: Optional[str] = Query(None, description="Question level"),
@@ -56,65 +116,50 @@ def list_seo_exercises(
     subject: Optional[str] = Query(None, description="Base subject"),
     difficulty: Optional[str] = Query(None, description="Base difficulty"),
     limit: int = Query(5, ge=3, le=20, description="Number of items"),
-    db: Session = Depends(get_db),
+    db: DatabaseRunner = Depends(get_read_db_runner),
 ):
     """Public endpoint used by SEO landing pages."""
-    query = db.query(Exercise)
-
-    if source:
-        query = query.filter(Exercise.source == source)
-    if theme:
-        query = query.filter(Exercise.theme == theme)
-    if level:
-        query = query.filter(Exercise.level == level)
-    if exam_year:
-        query = query.filter(Exercise.exam_year == exam_year)
-    if subject:
-        query = query.filter(Exercise.subject == subject)
-    if difficulty:
-        query = query.filter(Exercise.difficulty == difficulty)
-
-    exercises = query.order_by(Exercise.created_at.desc()).limit(limit).all()
-    return exercises
-
-
-@router.get("/random", response_model=ExerciseResponse)
-def get_random_exercise(
-    subject: str = Query(..., description="Exercise subject"),
-    difficulty: str = Query(..., description="Exercise difficulty"),
-    source: Optional[str] = Query(None, description="Exercise source"),
-    theme: Optional[str] = Query(None, description="Exercise theme"),
-    level: Optional[str] = Query(None, description="Exercise level"),
-    exam_year: Optional[int] = Query(None, description="Exercise exam year"),
-    exclude_answered: bool = Query(
-        True,
-        description="Exclude exercises already answered by current user",
-    ),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(check_plan_limit(increment_use=True)),
-):
-    """Get one random exercise by filters."""
-    base_query = db.query(Exercise).filter(
-        Exercise.subject == subject,
-        Exercise.difficulty == difficulty,
+    filters = {
+        "source": source,
+        "theme": theme,
+        "level": level,
+        "exam_year": exam_year,
+        "subject": subject,
+        "difficulty": difficulty,
+    }
+    etag = make_etag("exercises/seo", await db.run(_page_version, limit, filters))
+    if is_not_modified(request, etag):
+        return not_modified(etag, private=False)
+    body = seo_page_cache.get(etag)
+    if body is None:
+        rows = await db.run(_latest_exercises, limit, filters)
+        # Best-level brotli/gzip is too slow for the event loop.
+        body = await run_in_threadpool(precompress, exercise_list_serializer.dump_json(rows))
+        seo_page_cache.put(etag, body)
+    return PrecompressedResponse(
+        body,
+        request.headers.get("accept-encoding", ""),
+        headers=cache_headers(etag, private=False),
     )
 
-    if source:
-        base_query = base_query.filter(Exercise.source == source)
-    if theme:
-        base_query = base_query.filter(Exercise.theme == theme)
-    if level:
-        base_query = base_query.filter(Exercise.level == level)
-    if exam_year:
-        base_query = base_query.filter(Exercise.exam_year == exam_year)
+
+def _pick_random_exercise(
+    db: Session,
+    user_id: UUID,
+    subject: str,
+    difficulty: str,
+    exclude_answered: bool,
+    filters: dict,
+) -> Exercise:
+    filters = {"subject": subject, "difficulty": difficulty, **filters}
+    count_stmt = _with_exercise_filters(lambda_stmt(lambda: select(func.count(Exercise.id))), filters)
+    pick_stmt = _with_exercise_filters(lambda_stmt(lambda: select(Exercise)), filters)
 
     if exclude_answered:
-        answered_exercises = db.query(ExerciseAttempt.exercise_id).filter(
-            ExerciseAttempt.user_id == current_user.id
-        )
-        base_query = base_query.filter(~Exercise.id.in_(answered_exercises))
+        count_stmt = _without_answered(count_stmt, user_id)
+        pick_stmt = _without_answered(pick_stmt, user_id)
 
-    total = base_query.with_entities(func.count(Exercise.id)).scalar() or 0
+    total = db.scalar(count_stmt) or 0
     if total == 0:
         detail = (
             f"No new exercise found for {subject} ({difficulty})."
@@ -127,7 +172,8 @@ def get_random_exercise(
         )
 
     random_offset = random.randint(0, total - 1)
-    exercise = base_query.order_by(Exercise.id).offset(random_offset).limit(1).first()
+    pick_stmt += lambda s: s.order_by(Exercise.id).offset(random_offset).limit(1)
+    exercise = db.scalars(pick_stmt).first()
     if not exercise:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -136,14 +182,35 @@ def get_random_exercise(
     return exercise
 
 
-@router.get("/{exercise_id}", response_model=ExerciseResponse)
-def get_exercise(
-    exercise_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+@router.get("/random", response_model=ExerciseResponse)
+async def get_random_exercise(
+    subject: str = Query(..., description="Exercise subject"),
+    difficulty: str = Query(..., description="Exercise difficulty"),
+    source: Optional[str] = Query(None, description="Exercise source"),
+    theme: Optional[str] = Query(None, description="Exercise theme"),
+    level: Optional[str] = Query(None, description="Exercise level"),
+    exam_year: Optional[int] = Query(None, description="Exercise exam year"),
+    exclude_answered: bool = Query(
+        True,
+        description="Exclude exercises already answered by current user",
+    ),
+    db: DatabaseRunner = Depends(get_db_runner),
+    current_user: User = Depends(check_plan_limit(increment_use=True)),
 ):
-    """Get exercise by id."""
-    exercise = db.query(Exercise).filter(Exercise.id == exercise_id).first()
+    """Get one random exercise by filters."""
+    filters = {"source": source, "theme": theme, "level": level, "exam_year": exam_year}
+    return await db.run(
+        _pick_random_exercise,
+        current_user.id,
+        subject,
+        difficulty,
+        exclude_answered,
+        filters,
+    )
+
+
+def _get_exercise(db: Session, exercise_id: UUID) -> Exercise:
+    exercise = db.get(Exercise, exercise_id)
     if not exercise:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -152,13 +219,36 @@ def get_exercise(
     return exercise
 
 
-@router.post("", response_model=ExerciseResponse, status_code=status.HTTP_201_CREATED)
-def create_exercise(
-    exercise_data: ExerciseCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+def _exercise_version(db: Session, exercise_id: UUID) -> Optional[datetime]:
+    return db.scalar(
+        lambda_stmt(
+            lambda: select(func.coalesce(Exercise.updated_at, Exercise.created_at)).where(Exercise.id == exercise_id)
+        )
+    )
+
+
+@router.get("/{exercise_id}", response_model=ExerciseResponse)
+async def get_exercise(
+    exercise_id: UUID,
+    request: Request,
+    response: Response,
+    db: DatabaseRunner = Depends(get_read_db_runner),
+    current_user: User = Depends(get_current_user_for_read),
 ):
-    """Create exercise."""
+    """Get exercise by id."""
+    if has_validators(request):
+        version = await db.run(_exercise_version, exercise_id)
+        etag = make_etag("exercise", exercise_id, version)
+        if version is not None and is_not_modified(request, etag):
+            return not_modified(etag)
+
+    exercise = await db.run(_get_exercise, exercise_id)
+    version = exercise.updated_at or exercise.created_at
+    response.headers.update(cache_headers(make_etag("exercise", exercise.id, version)))
+    return exercise
+
+
+def _create_exercise(db: Session, exercise_data: ExerciseCreate) -> Exercise:
     new_exercise = Exercise(
         question=exercise_data.question,
         options=exercise_data.options,
@@ -175,3 +265,13 @@ def create_exercise(
     db.commit()
     db.refresh(new_exercise)
     return new_exercise
+
+
+@router.post("", response_model=ExerciseResponse, status_code=status.HTTP_201_CREATED)
+async def create_exercise(
+    exercise_data: ExerciseCreate,
+    db: DatabaseRunner = Depends(get_db_runner),
+    current_user: User = Depends(get_current_user_async),
+):
+    """Create exercise."""
+    return await db.run(_create_exercise, exercise_data)
@@ -1,27 +1,48 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.models import User, Profile
 from app.schemas import ProfileResponse, ProfileUpdate, UserPlanResponse
 from app.auth import get_current_user
-from app.services.plan_service import ensure_user_plan_profile
+from app.http_cache import cache_headers, has_validators, is_not_modified, make_etag, not_modified
+from app.services.plan_service import get_plan_profile
 
 router = APIRouter(prefix="/profiles", tags=["Perfis"])
 
 
+def _get_profile(db: Session, user_id) -> Optional[Profile]:
+    return db.query(Profile).filter(Profile.user_id == user_id).first()
+
+
 @router.get("/me", response_model=ProfileResponse)
 def get_my_profile(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """Obter perfil do usuário autenticado."""
-    profile = db.query(Profile).filter(Profile.user_id == current_user.id).first()
+    if has_validators(request):
+        # Only the version column; the profile itself is loaded on a miss.
+        version = db.scalar(
+            select(func.coalesce(Profile.updated_at, Profile.created_at)).where(Profile.user_id == current_user.id)
+        )
+        etag = make_etag("profile", current_user.id, version)
+        if version is not None and is_not_modified(request, etag):
+            return not_modified(etag)
+
+    profile = _get_profile(db, current_user.id)
     if not profile:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Perfil não encontrado.",
         )
+    version = profile.updated_at or profile.created_at
+    response.headers.update(cache_headers(make_etag("profile", current_user.id, version)))
     return profile
 
 
@@ -48,14 +69,16 @@ def update_my_profile(
 
 @router.get("/plan", response_model=UserPlanResponse)
 def get_my_plan(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
 ):
     """Obter status do plano e consumo do usuário autenticado."""
-    had_plan_profile = current_user.plan_profile is not None
-    plan_profile = ensure_user_plan_profile(current_user)
-    if (not had_plan_profile) or db.is_modified(plan_profile):
-        db.add(current_user)
-        db.commit()
-        db.refresh(plan_profile)
+    # The plan row comes with the current user, so the check costs no query;
+    # every write to it (ORM or Core UPDATE) bumps updated_at.
+    plan_profile = get_plan_profile(current_user)
+    etag = make_etag("plan", plan_profile.id, plan_profile.updated_at)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    response.headers.update(cache_headers(etag))
     return plan_profile
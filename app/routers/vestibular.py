@@ -2,14 +2,15 @@ import logging
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import case, exists, func
+from sqlalchemy import case, exists, func, lambda_stmt, select
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import Session
 
-from app.auth import get_current_user
+from app.auth import get_current_user_async, get_current_user_for_read
 from app.config import HOTMART_CHECKOUT_URL
-from app.database import get_db
+from app.database import DatabaseRunner, get_db_runner, get_read_db_runner
 from app.exceptions import FreeLimitReachedError
+from app.hot_queries import hot_query
 from app.models import User, UserVestibularProgress, VestibularExercise
 from app.schemas import (
     VestibularAnswerApiResponse,
@@ -20,41 +21,39 @@ from app.schemas import (
     VestibularStatsApiResponse,
     VestibularStatsResponse,
 )
-from app.services.plan_service import ensure_user_plan_profile
+from app.serializers import VESTIBULAR_EXERCISE_COLUMNS, vestibular_exercise_rows
+from app.services.plan_service import get_plan_profile, is_premium_profile
 
 router = APIRouter(prefix="/vestibular", tags=["Vestibulares"])
 logger = logging.getLogger(__name__)
 
 
-def _ensure_premium_access(db: Session, current_user: User) -> None:
-    had_plan_profile = current_user.plan_profile is not None
-    plan_profile = ensure_user_plan_profile(current_user)
-    is_premium = plan_profile.plan == "premium" or plan_profile.is_premium
-
-    if not had_plan_profile:
-        db.add(current_user)
-        db.commit()
-
-    if not is_premium:
+def _ensure_premium_access(current_user: User) -> None:
+    if not is_premium_profile(get_plan_profile(current_user)):
         raise FreeLimitReachedError(checkout_url=HOTMART_CHECKOUT_URL)
 
 
 def _get_user_vestibular_stats(db: Session, user_id) -> tuple[int, int, int]:
-    total, correct = (
-        db.query(
-            func.count(UserVestibularProgress.id),
-            func.coalesce(
-                func.sum(case((UserVestibularProgress.correct.is_(True), 1), else_=0)),
-                0,
-            ),
+    total, correct = db.execute(
+        lambda_stmt(
+            lambda: select(
+                func.count(UserVestibularProgress.id),
+                func.coalesce(
+                    func.sum(case((UserVestibularProgress.correct.is_(True), 1), else_=0)),
+                    0,
+                ),
+            ).where(UserVestibularProgress.user_id == user_id)
         )
-        .filter(UserVestibularProgress.user_id == user_id)
-        .one()
-    )
+    ).one()
     accuracy = round((correct / total * 100)) if total > 0 else 0
     return total, correct, accuracy
 
 
+@hot_query("vestibular_stats")
+async def warm_vestibular_stats(runner: DatabaseRunner, user_id) -> None:
+    await runner.run(_get_user_vestibular_stats, user_id)
+
+
 def _normalize_options(options: Any) -> list[str]:
     if isinstance(options, list):
         return [str(item).strip() for item in options if str(item).strip()]
@@ -64,36 +63,31 @@ def _normalize_options(options: Any) -> list[str]:
     return []
 
 
-@router.get("/exercises", response_model=VestibularExercisesApiResponse)
-def get_vestibular_exercises(
-    limit: int = Query(10, ge=1, le=50, description="Limite de resultados"),
-    offset: int = Query(0, ge=0, description="Offset para paginacao"),
-    difficulty: str = Query("medium", description="Dificuldade: medium|hard"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-):
-    _ensure_premium_access(db, current_user)
-
-    if difficulty not in {"medium", "hard"}:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Dificuldade invalida. Use 'medium' ou 'hard'.",
-        )
-
+def _load_exercise_page(
+    db: Session,
+    user_id,
+    difficulty: str,
+    limit: int,
+    offset: int,
+) -> VestibularExercisesApiResponse:
     try:
-        rows = (
-            db.query(VestibularExercise)
-            .filter(VestibularExercise.difficulty == difficulty)
-            .filter(
-                ~exists().where(
-                    UserVestibularProgress.user_id == current_user.id,
-                    UserVestibularProgress.exercise_id == VestibularExercise.id,
+        page_size = limit + 1
+        rows = vestibular_exercise_rows(
+            db.execute(
+                lambda_stmt(
+                    lambda: select(*VESTIBULAR_EXERCISE_COLUMNS)
+                    .where(
+                        VestibularExercise.difficulty == difficulty,
+                        ~exists().where(
+                            UserVestibularProgress.user_id == user_id,
+                            UserVestibularProgress.exercise_id == VestibularExercise.id,
+                        ),
+                    )
+                    .order_by(VestibularExercise.created_at.desc(), VestibularExercise.id.desc())
+                    .offset(offset)
+                    .limit(page_size)
                 )
-            )
-            .order_by(VestibularExercise.created_at.desc(), VestibularExercise.id.desc())
-            .offset(offset)
-            .limit(limit + 1)
-            .all()
+            ).all()
         )
 
         if not rows:
@@ -135,27 +129,33 @@ def get_vestibular_exercises(
         )
 
 
-@router.post("/answer", response_model=VestibularAnswerApiResponse)
-def submit_vestibular_answer(
-    payload: VestibularAnswerRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+@router.get("/exercises", response_model=VestibularExercisesApiResponse)
+async def get_vestibular_exercises(
+    limit: int = Query(10, ge=1, le=50, description="Limite de resultados"),
+    offset: int = Query(0, ge=0, description="Offset para paginacao"),
+    difficulty: str = Query("medium", description="Dificuldade: medium|hard"),
+    db: DatabaseRunner = Depends(get_db_runner),
+    current_user: User = Depends(get_current_user_async),
 ):
-    _ensure_premium_access(db, current_user)
+    _ensure_premium_access(current_user)
 
-    normalized_answer = payload.answer.strip()
-    if not normalized_answer:
+    if difficulty not in {"medium", "hard"}:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Resposta invalida. Informe uma alternativa.",
+            detail="Dificuldade invalida. Use 'medium' ou 'hard'.",
         )
 
+    return await db.run(_load_exercise_page, current_user.id, difficulty, limit, offset)
+
+
+def _submit_answer(
+    db: Session,
+    user_id,
+    payload: VestibularAnswerRequest,
+    normalized_answer: str,
+) -> VestibularAnswerApiResponse:
     try:
-        exercise = (
-            db.query(VestibularExercise)
-            .filter(VestibularExercise.id == payload.exercise_id)
-            .first()
-        )
+        exercise = db.get(VestibularExercise, payload.exercise_id)
         if not exercise:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -169,13 +169,16 @@ def submit_vestibular_answer(
                 detail="Resposta invalida para este exercicio.",
             )
 
-        already_answered = (
-            db.query(UserVestibularProgress.id)
-            .filter(
-                UserVestibularProgress.user_id == current_user.id,
-                UserVestibularProgress.exercise_id == payload.exercise_id,
+        exercise_id = exercise.id
+        already_answered = db.scalar(
+            lambda_stmt(
+                lambda: select(UserVestibularProgress.id)
+                .where(
+                    UserVestibularProgress.user_id == user_id,
+                    UserVestibularProgress.exercise_id == exercise_id,
+                )
+                .limit(1)
             )
-            .first()
         )
         if already_answered:
             raise HTTPException(
@@ -187,14 +190,14 @@ def submit_vestibular_answer(
         is_correct = normalized_answer.casefold() == normalized_correct.casefold()
 
         progress = UserVestibularProgress(
-            user_id=current_user.id,
+            user_id=user_id,
             exercise_id=exercise.id,
             correct=is_correct,
         )
         db.add(progress)
         db.commit()
 
-        _, _, accuracy = _get_user_vestibular_stats(db, current_user.id)
+        _, _, accuracy = _get_user_vestibular_stats(db, user_id)
 
         return VestibularAnswerApiResponse(
             success=True,
@@ -229,14 +232,32 @@ def submit_vestibular_answer(
         )
 
 
+@router.post("/answer", response_model=VestibularAnswerApiResponse)
+async def submit_vestibular_answer(
+    payload: VestibularAnswerRequest,
+    db: DatabaseRunner = Depends(get_db_runner),
+    current_user: User = Depends(get_current_user_async),
+):
+    _ensure_premium_access(current_user)
+
+    normalized_answer = payload.answer.strip()
+    if not normalized_answer:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Resposta invalida. Informe uma alternativa.",
+        )
+
+    return await db.run(_submit_answer, current_user.id, payload, normalized_answer)
+
+
 @router.get("/stats", response_model=VestibularStatsApiResponse)
-def get_vestibular_stats(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+async def get_vestibular_stats(
+    db: DatabaseRunner = Depends(get_read_db_runner),
+    current_user: User = Depends(get_current_user_for_read),
 ):
-    _ensure_premium_access(db, current_user)
+    _ensure_premium_access(current_user)
     try:
-        total, correct, accuracy = _get_user_vestibular_stats(db, current_user.id)
+        total, correct, accuracy = await db.run(_get_user_vestibular_stats, current_user.id)
         return VestibularStatsApiResponse(
             success=True,
             message="Estatisticas vestibulares carregadas com sucesso.",
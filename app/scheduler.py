@@ -0,0 +1,23 @@
+import asyncio
+import logging
+import random
+from typing import Callable
+
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+
+async def run_periodically(name: str, interval_seconds: float, job: Callable[[], object]) -> None:
+    """Run a blocking job in the threadpool every ``interval_seconds`` until cancelled.
+
+    The first run is delayed by a random fraction of the interval so several
+    workers started together do not hit the database at the same moment.
+    """
+    await asyncio.sleep(random.uniform(0.1, 1.0) * interval_seconds)
+    while True:
+        try:
+            await run_in_threadpool(job)
+        except Exception:
+            logger.exception("periodic_job_failed job=%s", name)
+        await asyncio.sleep(interval_seconds)
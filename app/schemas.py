@@ -1,5 +1,5 @@
 import json
-from typing import Any, Optional, List
+from typing import Any, Dict, Optional, List
 from uuid import UUID
 from datetime import datetime
 
@@ -70,7 +70,8 @@ class EmailVerificationChallengeResponse(BaseModel):
 
 
 class GoogleAuthRequest(BaseModel):
-    access_token: str
+    access_token: Optional[str] = None
+    id_token: Optional[str] = None
 
 
 class GoogleAuthResponse(BaseModel):
@@ -300,3 +301,20 @@ class VestibularStatsApiResponse(BaseModel):
     success: bool
     message: str
     data: VestibularStatsResponse
+
+
+# ========================
+# Dashboard Schemas
+# ========================
+
+class DashboardResponse(BaseModel):
+    user: UserResponse
+    plan: UserPlanResponse
+    profile: Optional[ProfileResponse] = None
+    stats: Optional[StatsResponse] = None
+    attempts: Optional[List[AttemptResponse]] = None
+    # Only for premium users.
+    vestibular_stats: Optional[VestibularStatsResponse] = None
+    # Sections that failed to load; the others are still returned.
+    errors: Dict[str, str] = {}
+    timings_ms: Dict[str, float] = {}
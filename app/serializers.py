@@ -0,0 +1,106 @@
+"""JSON serializers for the list endpoints.
+
+These routes select plain columns with Core and dump the rows straight to
+JSON bytes through precompiled ``TypeAdapter``s: no ORM objects are built and
+the ``response_model`` re-validation is skipped. The row types mirror the
+response schemas in ``app.schemas``, which still document the routes.
+
+Rows are slotted dataclasses filled positionally from the Core row: no
+per-instance ``__dict__``, no identity map or instance state, and roughly a
+quarter of the memory of the equivalent dict.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Optional, Sequence
+from uuid import UUID
+
+from fastapi import Response
+from pydantic import TypeAdapter
+from typing_extensions import TypedDict
+
+from app.models import Exercise, ExerciseAttempt, VestibularExercise
+
+
+@dataclass(slots=True)
+class ExerciseRow:
+    id: UUID
+    question: str
+    options: Optional[list[str]]
+    correct_answer: str
+    explanation: Optional[str]
+    difficulty: str
+    subject: str
+    source: Optional[str]
+    theme: Optional[str]
+    level: Optional[str]
+    exam_year: Optional[int]
+    created_at: datetime
+
+
+@dataclass(slots=True)
+class AttemptRow:
+    id: UUID
+    user_id: UUID
+    exercise_id: UUID
+    user_answer: str
+    is_correct: bool
+    time_spent_seconds: Optional[int]
+    created_at: datetime
+    exercise: Optional[ExerciseRow] = None
+
+
+@dataclass(slots=True)
+class VestibularExerciseRow:
+    # Validated by ``VestibularExerciseResponse`` (from attributes), whose
+    # validator normalises the stored ``options`` list/map.
+    id: UUID
+    question: str
+    options: Any
+    difficulty: str
+    created_at: datetime
+
+
+class StatsRow(TypedDict):
+    total: int
+    correct: int
+    accuracy: int
+
+
+class ProgressRow(TypedDict):
+    attempts: list[AttemptRow]
+    stats: StatsRow
+
+
+EXERCISE_FIELDS = tuple(ExerciseRow.__annotations__)
+ATTEMPT_FIELDS = tuple(name for name in AttemptRow.__annotations__ if name != "exercise")
+EXERCISE_COLUMNS = tuple(getattr(Exercise, name) for name in EXERCISE_FIELDS)
+ATTEMPT_COLUMNS = tuple(getattr(ExerciseAttempt, name) for name in ATTEMPT_FIELDS)
+VESTIBULAR_EXERCISE_COLUMNS = tuple(
+    getattr(VestibularExercise, name) for name in VestibularExerciseRow.__annotations__
+)
+
+exercise_list_serializer = TypeAdapter(list[ExerciseRow])
+attempt_list_serializer = TypeAdapter(list[AttemptRow])
+progress_serializer = TypeAdapter(ProgressRow)
+
+
+def exercise_rows(rows: Sequence[Sequence[Any]]) -> list[ExerciseRow]:
+    return [ExerciseRow(*row) for row in rows]
+
+
+def attempt_rows(rows: Sequence[Sequence[Any]]) -> list[AttemptRow]:
+    """Rows of ``ATTEMPT_COLUMNS`` followed by the (outer joined) ``EXERCISE_COLUMNS``."""
+    split = len(ATTEMPT_FIELDS)
+    attempts = []
+    for row in rows:
+        exercise = ExerciseRow(*row[split:]) if row[split] is not None else None
+        attempts.append(AttemptRow(*row[:split], exercise))
+    return attempts
+
+
+def vestibular_exercise_rows(rows: Sequence[Sequence[Any]]) -> list[VestibularExerciseRow]:
+    return [VestibularExerciseRow(*row) for row in rows]
+
+
+def json_response(serializer: TypeAdapter, content: Any) -> Response:
+    return Response(serializer.dump_json(content), media_type="application/json")
@@ -0,0 +1,132 @@
+"""Production entrypoint: gunicorn managing uvicorn workers.
+
+    python -m app.server                 # one worker per CPU, PORT or 8000
+    python -m app.server --workers 4
+
+The app is imported once in the master and the workers are forked from it,
+so code and data loaded at import are shared copy-on-write between them.
+
+Signals sent to the master:
+
+* ``HUP`` replaces the workers gracefully (in-flight requests finish) but
+  reuses the code already loaded in the master.
+* ``USR2`` starts a new master with the new code next to the old one; send
+  ``TERM`` to the old master once the new workers answer ``/ready``.
+* ``TERM`` shuts down gracefully, waiting up to
+  ``SERVER_GRACEFUL_TIMEOUT_SECONDS`` for in-flight requests.
+"""
+import argparse
+import gc
+import logging
+import os
+
+from gunicorn.app.base import BaseApplication
+
+from app.config import (
+    METRICS_ENABLED,
+    PROMETHEUS_MULTIPROC_DIR,
+    SERVER_GRACEFUL_TIMEOUT_SECONDS,
+    SERVER_HOST,
+    SERVER_KEEPALIVE_SECONDS,
+    SERVER_MAX_REQUESTS,
+    SERVER_PORT,
+    WEB_CONCURRENCY,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def default_worker_count() -> int:
+    # Respects CPU affinity / container cpusets where the platform exposes it.
+    if hasattr(os, "sched_getaffinity"):
+        return max(len(os.sched_getaffinity(0)), 1)
+    return os.cpu_count() or 1
+
+
+def _freeze_preloaded_heap(server) -> None:
+    # Objects created while importing the app are moved to the permanent
+    # generation: the workers' collections never touch them, so the pages
+    # holding them stay shared instead of being copied on the first GC.
+    gc.freeze()
+    logger.info("server_heap_frozen objects=%s", gc.get_freeze_count())
+
+
+def _after_fork(server, worker) -> None:
+    from app.database import dispose_engines_after_fork
+
+    gc.enable()
+    dispose_engines_after_fork()
+
+
+def _on_worker_exit(server, worker) -> None:
+    from app.metrics import mark_worker_dead
+
+    mark_worker_dead(worker.pid)
+
+
+def server_options(workers: int | None = None, bind: str | None = None) -> dict:
+    return {
+        "bind": bind or f"{SERVER_HOST}:{SERVER_PORT}",
+        "workers": workers or WEB_CONCURRENCY or default_worker_count(),
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "preload_app": True,
+        "graceful_timeout": SERVER_GRACEFUL_TIMEOUT_SECONDS,
+        "timeout": SERVER_GRACEFUL_TIMEOUT_SECONDS + 30,
+        "keepalive": SERVER_KEEPALIVE_SECONDS,
+        "max_requests": SERVER_MAX_REQUESTS,
+        "max_requests_jitter": SERVER_MAX_REQUESTS // 10,
+        "when_ready": _freeze_preloaded_heap,
+        "post_fork": _after_fork,
+        "child_exit": _on_worker_exit,
+        "accesslog": None,
+    }
+
+
+class ProvaLabServer(BaseApplication):
+    def __init__(self, options: dict):
+        self.options = options
+        super().__init__()
+
+    def load_config(self) -> None:
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        # Garbage collection stays off in the master until the fork, so the
+        # objects frozen in when_ready are not shuffled around before that.
+        gc.disable()
+        from app.config import AUTO_CREATE_TABLES
+        from app.database import engine
+        from app.logging_config import start_logging, stop_logging
+        from app.main import _create_tables, app
+
+        if AUTO_CREATE_TABLES:
+            # Once here rather than concurrently in every worker's lifespan,
+            # where the CREATE TABLE statements race each other; the flag
+            # tells the workers' lifespan it is already done.
+            start_logging()
+            try:
+                _create_tables()
+            finally:
+                stop_logging()
+            engine.dispose()
+            app.state.schema_created = True
+        return app
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.server", description="Run the API with gunicorn")
+    parser.add_argument("--workers", type=int, help="Defaults to WEB_CONCURRENCY or the CPU count.")
+    parser.add_argument("--bind", help="host:port, defaults to HOST:PORT.")
+    args = parser.parse_args(argv)
+
+    options = server_options(workers=args.workers, bind=args.bind)
+    if options["workers"] > 1 and METRICS_ENABLED and not PROMETHEUS_MULTIPROC_DIR:
+        logger.warning(
+            "Several workers without PROMETHEUS_MULTIPROC_DIR: each /metrics scrape only sees one worker."
+        )
+    ProvaLabServer(options).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,9 @@
 import hashlib
 import hmac
-import json
 import logging
 import random
 import secrets
-import urllib.error
 import urllib.parse
-import urllib.request
 from datetime import datetime, timedelta, timezone
 from uuid import UUID
 
@@ -27,8 +24,15 @@ from app.config import (
     VERIFICATION_RESEND_COOLDOWN_SECONDS,
     VERIFICATION_RESEND_MAX_PER_HOUR,
 )
+from app.exceptions import DependencyUnavailableError
+from app.http_client import OutboundHTTPError, http_client
 from app.models import EmailVerificationCode, PasswordResetToken, Profile, User
 from app.services.email_service import send_password_reset_email, send_verification_email
+from app.services.google_identity import (
+    GoogleClientNotConfiguredError,
+    GoogleIdTokenError,
+    verify_google_id_token,
+)
 from app.services.plan_service import ensure_user_plan_profile
 
 logger = logging.getLogger(__name__)
@@ -53,10 +57,8 @@ def _is_expired(expires_at: datetime) -> bool:
 
 
 def _fetch_json(url: str, headers: dict[str, str] | None = None) -> dict:
-    request = urllib.request.Request(url, headers=headers or {})
-    with urllib.request.urlopen(request, timeout=8) as response:
-        payload = response.read().decode("utf-8")
-        return json.loads(payload)
+    payload, _ = http_client.get_json(url, headers=headers, timeout=8, dependency="google")
+    return payload
 
 
 def _hash_secret(raw_value: str) -> str:
@@ -242,6 +244,19 @@ def _create_email_verification_code(
     return verification, raw_code
 
 
+def _send_verification_email_in_background(
+    recipient_email: str,
+    recipient_name: str | None,
+    code: str,
+    magic_link: str,
+) -> None:
+    # There is no response left to carry a 503, so a shed email is only logged.
+    try:
+        send_verification_email(recipient_email, recipient_name, code, magic_link)
+    except DependencyUnavailableError as exc:
+        logger.warning("Verification email dropped: dependency=%s unavailable", exc.dependency)
+
+
 def issue_email_verification_challenge(
     user: User,
     db: Session,
@@ -259,7 +274,7 @@ def issue_email_verification_challenge(
     if send_email:
         if background_tasks is not None:
             background_tasks.add_task(
-                send_verification_email,
+                _send_verification_email_in_background,
                 user.email,
                 user.full_name,
                 raw_code,
@@ -298,7 +313,7 @@ def _validate_google_access_token(access_token: str) -> dict:
     )
     try:
         token_info = _fetch_json(tokeninfo_url)
-    except (urllib.error.HTTPError, urllib.error.URLError, TimeoutError, ValueError):
+    except (OutboundHTTPError, ValueError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token do Google inválido ou expirado.",
@@ -328,7 +343,7 @@ def _validate_google_access_token(access_token: str) -> dict:
             userinfo_url,
             headers={"Authorization": f"Bearer {access_token}"},
         )
-    except (urllib.error.HTTPError, urllib.error.URLError, TimeoutError, ValueError):
+    except (OutboundHTTPError, ValueError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Não foi possível consultar os dados da conta Google.",
@@ -348,8 +363,51 @@ def _validate_google_access_token(access_token: str) -> dict:
     return user_info
 
 
-def start_google_auth(access_token: str, db: Session, request_ip: str | None = None) -> dict:
-    google_user = _validate_google_access_token(access_token)
+def _validate_google_id_token(id_token: str) -> dict:
+    try:
+        claims = verify_google_id_token(id_token)
+    except GoogleClientNotConfiguredError:
+        logger.error("google_id_token_unverifiable reason=client_id_not_configured")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Login com Google indisponível no momento.",
+        )
+    except GoogleIdTokenError as exc:
+        logger.info("google_id_token_rejected reason=%s", str(exc))
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token do Google inválido ou expirado.",
+        )
+
+    if not claims.get("email"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Conta do Google sem e-mail disponível.",
+        )
+    if claims.get("email_verified") is not True:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="O e-mail da conta do Google não está verificado.",
+        )
+
+    return claims
+
+
+def start_google_auth(
+    access_token: str | None,
+    db: Session,
+    request_ip: str | None = None,
+    id_token: str | None = None,
+) -> dict:
+    if id_token:
+        google_user = _validate_google_id_token(id_token)
+    elif access_token:
+        google_user = _validate_google_access_token(access_token)
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Informe o token do Google.",
+        )
 
     email = _normalize_email(google_user["email"])
     google_id = google_user.get("sub")
@@ -480,7 +538,11 @@ def request_password_reset(email: str, db: Session, request_ip: str | None = Non
     db.commit()
 
     reset_link = f"{FRONTEND_URL.rstrip('/')}/reset-password?token={raw_token}"
-    sent = send_password_reset_email(user.email, user.full_name, reset_link)
+    try:
+        sent = send_password_reset_email(user.email, user.full_name, reset_link)
+    except DependencyUnavailableError:
+        # Keep the generic answer so the endpoint never reveals whether the e-mail exists.
+        sent = False
     if not sent:
         logger.error("Password reset email failed for user_id=%s", str(user.id))
         return GENERIC_FORGOT_PASSWORD_MESSAGE
@@ -1,13 +1,12 @@
-import json
 import logging
-import urllib.error
-import urllib.request
 from email.utils import formataddr, parseaddr
 
 from app.config import (
     RESEND_API_KEY,
     RESEND_FROM_EMAIL,
 )
+from app.exceptions import DependencyUnavailableError
+from app.http_client import http_client
 
 logger = logging.getLogger(__name__)
 
@@ -64,29 +63,25 @@ def _send_email(recipient_email: str, subject: str, text_body: str) -> bool:
         "text": text_body,
     }
 
-    request = urllib.request.Request(
-        "https://api.resend.com/emails",
-        data=json.dumps(payload).encode("utf-8"),
-        headers={
-            "Authorization": f"Bearer {RESEND_API_KEY}",
-            "Content-Type": "application/json",
-            "User-Agent": "ProvaLabMailer/1.0 (+https://provalab.com.br)",
-        },
-        method="POST",
-    )
-
     try:
-        with urllib.request.urlopen(request, timeout=20) as response:
-            status = getattr(response, "status", 200)
-            if status >= 400:
-                logger.error("Resend API returned error status: %s", status)
-                return False
+        response = http_client.request(
+            "POST",
+            "https://api.resend.com/emails",
+            json=payload,
+            headers={
+                "Authorization": f"Bearer {RESEND_API_KEY}",
+                "User-Agent": "ProvaLabMailer/1.0 (+https://provalab.com.br)",
+            },
+            timeout=20,
+            dependency="resend",
+        )
+        if response.status_code >= 400:
+            logger.error("Resend API HTTP error %s: %s", response.status_code, response.text)
+            return False
         logger.info("Email sent via Resend API to %s", recipient_email)
         return True
-    except urllib.error.HTTPError as exc:
-        error_body = exc.read().decode("utf-8", errors="ignore")
-        logger.error("Resend API HTTP error %s: %s", exc.code, error_body)
-        return False
+    except DependencyUnavailableError:
+        raise
     except Exception as exc:
         logger.exception("Failed sending email via Resend API: %s", str(exc))
         return False
@@ -0,0 +1,172 @@
+import logging
+import re
+import threading
+import time
+from typing import Callable
+
+from app.config import (
+    GOOGLE_CLIENT_ID,
+    GOOGLE_JWKS_DEFAULT_TTL_SECONDS,
+    GOOGLE_JWKS_URL,
+)
+from app.exceptions import DependencyUnavailableError
+from app.http_client import http_client
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+_MAX_AGE_PATTERN = re.compile(r"max-age=(\d+)")
+
+
+class GoogleIdTokenError(Exception):
+    pass
+
+
+class GoogleClientNotConfiguredError(Exception):
+    """GOOGLE_CLIENT_ID is unset: without an audience any Google ID token would pass."""
+
+
+def _parse_max_age(cache_control: str | None) -> int | None:
+    if not cache_control:
+        return None
+    match = _MAX_AGE_PATTERN.search(cache_control)
+    if match is None:
+        return None
+    return int(match.group(1))
+
+
+def _fetch_jwks(url: str) -> tuple[dict, int | None]:
+    payload, headers = http_client.get_json(url, timeout=8, dependency="google")
+    return payload, _parse_max_age(headers.get("Cache-Control"))
+
+
+class JwksCache:
+    """Keeps Google's signing keys in memory and refreshes them ahead of expiry.
+
+    Lookups never block on the network while cached keys are still fresh; once
+    the refresh-ahead window is reached a background thread fetches the new set.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        fetcher: Callable[[str], tuple[dict, int | None]] = _fetch_jwks,
+        default_ttl_seconds: int = 3600,
+        refresh_ahead_seconds: int = 300,
+        min_refresh_interval_seconds: int = 30,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.url = url
+        self._fetcher = fetcher
+        self._default_ttl_seconds = default_ttl_seconds
+        self._refresh_ahead_seconds = refresh_ahead_seconds
+        self._min_refresh_interval_seconds = min_refresh_interval_seconds
+        self._clock = clock
+        self._keys: dict[str, dict] = {}
+        self._expires_at = 0.0
+        self._last_refresh_at: float | None = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def load(self, jwks: dict, ttl_seconds: int | None = None) -> None:
+        keys = {
+            key["kid"]: key
+            for key in jwks.get("keys", [])
+            if isinstance(key, dict) and key.get("kid")
+        }
+        ttl = ttl_seconds if ttl_seconds is not None else self._default_ttl_seconds
+        with self._lock:
+            self._keys = keys
+            self._expires_at = self._clock() + ttl
+            self._last_refresh_at = self._clock()
+
+    def refresh(self) -> None:
+        jwks, max_age = self._fetcher(self.url)
+        self.load(jwks, ttl_seconds=max_age)
+        logger.info("google_jwks_refreshed keys=%s ttl_seconds=%s", len(self._keys), max_age)
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def _run() -> None:
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("google_jwks_background_refresh_failed")
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=_run, name="google-jwks-refresh", daemon=True).start()
+
+    def _can_force_refresh(self) -> bool:
+        if self._last_refresh_at is None:
+            return True
+        return self._clock() - self._last_refresh_at >= self._min_refresh_interval_seconds
+
+    def get_key(self, kid: str) -> dict | None:
+        now = self._clock()
+        if not self._keys or now >= self._expires_at:
+            # Nothing usable in memory yet (cold start) or the set is past its TTL.
+            self.refresh()
+        elif now >= self._expires_at - self._refresh_ahead_seconds:
+            self._refresh_in_background()
+
+        key = self._keys.get(kid)
+        if key is None and self._can_force_refresh():
+            # Google rotated its keys before our cached copy expired.
+            self.refresh()
+            key = self._keys.get(kid)
+        return key
+
+
+google_jwks_cache = JwksCache(
+    GOOGLE_JWKS_URL,
+    default_ttl_seconds=GOOGLE_JWKS_DEFAULT_TTL_SECONDS,
+)
+
+
+def verify_google_id_token(id_token: str, cache: JwksCache | None = None) -> dict:
+    from jose import JWTError, jwt
+
+    if not GOOGLE_CLIENT_ID:
+        raise GoogleClientNotConfiguredError()
+
+    cache = cache or google_jwks_cache
+    try:
+        header = jwt.get_unverified_header(id_token)
+    except JWTError as exc:
+        raise GoogleIdTokenError("malformed_token") from exc
+
+    kid = header.get("kid")
+    if not kid:
+        raise GoogleIdTokenError("missing_kid")
+
+    try:
+        key = cache.get_key(kid)
+    except DependencyUnavailableError:
+        raise
+    except Exception as exc:
+        logger.exception("google_jwks_unavailable")
+        raise GoogleIdTokenError("jwks_unavailable") from exc
+    if key is None:
+        raise GoogleIdTokenError("unknown_kid")
+
+    try:
+        claims = jwt.decode(
+            id_token,
+            key,
+            algorithms=[key.get("alg", "RS256")],
+            audience=GOOGLE_CLIENT_ID,
+            issuer=GOOGLE_ISSUERS,
+            options={"verify_at_hash": False},
+        )
+    except JWTError as exc:
+        raise GoogleIdTokenError(str(exc)) from exc
+
+    email_verified = claims.get("email_verified")
+    claims["email_verified"] = email_verified is True or str(email_verified).lower() == "true"
+    return claims
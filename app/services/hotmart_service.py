@@ -0,0 +1,320 @@
+import hashlib
+import json
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import and_, exists, func, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, aliased
+
+from app.config import (
+    HOTMART_INBOX_BATCH_SIZE,
+    HOTMART_INBOX_LEASE_SECONDS,
+    HOTMART_INBOX_MAX_ATTEMPTS,
+    HOTMART_INBOX_RETRY_BASE_SECONDS,
+)
+from app.database import SessionLocal
+from app.metrics import HOTMART_INBOX_EVENTS_TOTAL, HOTMART_INBOX_PROCESSING_LAG_SECONDS
+from app.models import HotmartWebhookEvent, User
+from app.services.plan_service import ensure_user_plan_profile
+
+logger = logging.getLogger(__name__)
+
+APPROVED_EVENTS = {"PURCHASE_APPROVED"}
+CANCELED_EVENTS = {"PURCHASE_CANCELED", "SUBSCRIPTION_CANCELED"}
+APPROVED_STATUSES = {"APPROVED", "ACTIVE"}
+CANCELED_STATUSES = {"CANCELED", "CANCELLED", "REFUNDED", "CHARGEBACK"}
+
+PREMIUM_PLAN_VALUES = {
+    "plan": "premium",
+    "is_premium": True,
+    "subscription_status": "active",
+    "payment_status": "approved",
+}
+CANCELED_PLAN_VALUES = {
+    "plan": "free",
+    "is_premium": False,
+    "subscription_status": "canceled",
+    "payment_status": "canceled",
+}
+
+INBOX_PENDING = "pending"
+INBOX_PROCESSING = "processing"
+INBOX_PROCESSED = "processed"
+INBOX_IGNORED = "ignored"
+INBOX_DEAD = "dead"
+
+
+def _extract_value(payload: dict[str, Any], *paths: tuple[str, ...]) -> str | None:
+    for path in paths:
+        current: Any = payload
+        for key in path:
+            if not isinstance(current, dict) or key not in current:
+                current = None
+                break
+            current = current[key]
+        if isinstance(current, str) and current.strip():
+            return current.strip()
+    return None
+
+
+def extract_event_fields(payload: dict[str, Any]) -> dict[str, str | None]:
+    event_name = (
+        payload.get("event")
+        or payload.get("event_name")
+        or payload.get("type")
+        or ""
+    )
+    buyer_email = _extract_value(
+        payload,
+        ("data", "buyer", "email"),
+        ("buyer", "email"),
+        ("data", "subscriber", "email"),
+        ("subscriber", "email"),
+        ("data", "purchase", "buyer", "email"),
+        ("purchase", "buyer", "email"),
+        ("email",),
+    )
+    purchase_id = _extract_value(
+        payload,
+        ("data", "purchase", "transaction"),
+        ("purchase", "transaction"),
+        ("data", "purchase", "id"),
+        ("purchase", "id"),
+        ("data", "id"),
+        ("id",),
+    )
+    purchase_status = _extract_value(
+        payload,
+        ("data", "purchase", "status"),
+        ("purchase", "status"),
+        ("data", "subscription", "status"),
+        ("subscription", "status"),
+        ("status",),
+    )
+    return {
+        "event_name": str(event_name).strip().upper(),
+        "buyer_email": buyer_email.lower() if buyer_email else None,
+        "purchase_id": purchase_id,
+        "purchase_status": (purchase_status or "").upper(),
+    }
+
+
+def build_idempotency_key(payload: dict[str, Any], fields: dict[str, str | None]) -> str:
+    event_id = payload.get("id")
+    if isinstance(event_id, (str, int)) and str(event_id).strip():
+        return f"event:{str(event_id).strip()}"
+    if fields["purchase_id"]:
+        return f"purchase:{fields['purchase_id']}:{fields['event_name']}:{fields['purchase_status']}"
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return f"sha256:{hashlib.sha256(canonical.encode('utf-8')).hexdigest()}"
+
+
+def store_webhook_event(db: Session, payload: dict[str, Any]) -> tuple[HotmartWebhookEvent | None, bool]:
+    fields = extract_event_fields(payload)
+    event = HotmartWebhookEvent(
+        idempotency_key=build_idempotency_key(payload, fields),
+        event_name=fields["event_name"],
+        buyer_email=fields["buyer_email"],
+        purchase_id=fields["purchase_id"],
+        purchase_status=fields["purchase_status"],
+        payload=payload,
+        status=INBOX_PENDING,
+    )
+    db.add(event)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        HOTMART_INBOX_EVENTS_TOTAL.labels(outcome="duplicate").inc()
+        return None, True
+    HOTMART_INBOX_EVENTS_TOTAL.labels(outcome="received").inc()
+    return event, False
+
+
+def _apply_plan_change(db: Session, event: HotmartWebhookEvent) -> tuple[str, str]:
+    should_activate = (
+        event.event_name in APPROVED_EVENTS or event.purchase_status in APPROVED_STATUSES
+    )
+    should_cancel = (
+        event.event_name in CANCELED_EVENTS or event.purchase_status in CANCELED_STATUSES
+    )
+    if not should_activate and not should_cancel:
+        return INBOX_IGNORED, "unsupported_event_and_status"
+    if not event.buyer_email:
+        return INBOX_IGNORED, "email_not_found"
+
+    user = db.query(User).filter(func.lower(User.email) == event.buyer_email).first()
+    if user is None:
+        return INBOX_IGNORED, "user_not_found"
+
+    profile = ensure_user_plan_profile(user)
+    if should_activate:
+        for field, value in PREMIUM_PLAN_VALUES.items():
+            setattr(profile, field, value)
+        if event.purchase_id:
+            profile.hotmart_purchase_id = event.purchase_id
+    else:
+        for field, value in CANCELED_PLAN_VALUES.items():
+            setattr(profile, field, value)
+        profile.uses_count = profile.free_uses
+        profile.hotmart_purchase_id = None
+    db.add(user)
+    return INBOX_PROCESSED, f"user_id={user.id} is_premium={profile.is_premium}"
+
+
+def _release_expired_leases(db: Session, now: datetime) -> None:
+    # A worker that died mid-event leaves it in "processing"; hand it back once its lease lapses.
+    db.execute(
+        update(HotmartWebhookEvent)
+        .where(
+            HotmartWebhookEvent.status == INBOX_PROCESSING,
+            HotmartWebhookEvent.next_attempt_at < now,
+        )
+        .values(status=INBOX_PENDING)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def _next_due_events(db: Session, now: datetime, limit: int) -> list[HotmartWebhookEvent]:
+    earlier = aliased(HotmartWebhookEvent)
+    # Only the oldest unfinished event of each buyer is eligible, so plan changes
+    # are applied in the order Hotmart sent them even across retries.
+    has_earlier_unfinished = exists().where(
+        earlier.buyer_email == HotmartWebhookEvent.buyer_email,
+        earlier.status.in_([INBOX_PENDING, INBOX_PROCESSING]),
+        or_(
+            earlier.received_at < HotmartWebhookEvent.received_at,
+            and_(
+                earlier.received_at == HotmartWebhookEvent.received_at,
+                earlier.id < HotmartWebhookEvent.id,
+            ),
+        ),
+    )
+    return list(
+        db.execute(
+            select(HotmartWebhookEvent)
+            .where(
+                HotmartWebhookEvent.status == INBOX_PENDING,
+                HotmartWebhookEvent.next_attempt_at <= now,
+                ~has_earlier_unfinished,
+            )
+            .order_by(HotmartWebhookEvent.received_at, HotmartWebhookEvent.id)
+            .limit(limit)
+        ).scalars()
+    )
+
+
+def _claim(db: Session, event: HotmartWebhookEvent, now: datetime) -> bool:
+    result = db.execute(
+        update(HotmartWebhookEvent)
+        .where(
+            HotmartWebhookEvent.id == event.id,
+            HotmartWebhookEvent.status == INBOX_PENDING,
+        )
+        .values(
+            status=INBOX_PROCESSING,
+            attempts=HotmartWebhookEvent.attempts + 1,
+            next_attempt_at=now + timedelta(seconds=HOTMART_INBOX_LEASE_SECONDS),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    if result.rowcount != 1:
+        return False
+    db.refresh(event)
+    return True
+
+
+def _lag_seconds(now: datetime, received_at: datetime) -> float:
+    # received_at is TIMESTAMP WITH TIME ZONE on Postgres and comes back
+    # aware; ``now`` is naive UTC like the rest of the inbox timestamps.
+    if received_at.tzinfo is not None:
+        received_at = received_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return max((now - received_at).total_seconds(), 0)
+
+
+def _process_event(db: Session, event: HotmartWebhookEvent) -> str:
+    try:
+        status, detail = _apply_plan_change(db, event)
+        now = datetime.utcnow()
+        event.status = status
+        event.detail = detail
+        event.processed_at = now
+        db.commit()
+    except Exception as exc:
+        db.rollback()
+        now = datetime.utcnow()
+        if event.attempts >= HOTMART_INBOX_MAX_ATTEMPTS:
+            event.status = INBOX_DEAD
+        else:
+            event.status = INBOX_PENDING
+            backoff = HOTMART_INBOX_RETRY_BASE_SECONDS * (2 ** (event.attempts - 1))
+            event.next_attempt_at = now + timedelta(seconds=backoff)
+        event.detail = f"{type(exc).__name__}: {exc}"[:1000]
+        db.commit()
+        logger.exception(
+            "hotmart_inbox_event_failed id=%s event=%s attempts=%s status=%s",
+            str(event.id),
+            event.event_name,
+            event.attempts,
+            event.status,
+        )
+        HOTMART_INBOX_EVENTS_TOTAL.labels(outcome="dead" if event.status == INBOX_DEAD else "retry").inc()
+        return event.status
+
+    HOTMART_INBOX_EVENTS_TOTAL.labels(outcome=status).inc()
+    HOTMART_INBOX_PROCESSING_LAG_SECONDS.observe(_lag_seconds(now, event.received_at))
+    logger.info(
+        "hotmart_inbox_event_%s id=%s event=%s email=%s detail=%s",
+        status,
+        str(event.id),
+        event.event_name,
+        event.buyer_email or "unknown",
+        detail,
+    )
+    return status
+
+
+def process_hotmart_inbox(db: Session, max_events: int = HOTMART_INBOX_BATCH_SIZE) -> dict[str, int]:
+    counts = {INBOX_PROCESSED: 0, INBOX_IGNORED: 0, INBOX_PENDING: 0, INBOX_DEAD: 0}
+    now = datetime.utcnow()
+    _release_expired_leases(db, now)
+
+    handled = 0
+    while handled < max_events:
+        events = _next_due_events(db, now, max_events - handled)
+        if not events:
+            break
+        progressed = False
+        for event in events:
+            if not _claim(db, event, now):
+                continue
+            progressed = True
+            handled += 1
+            counts[_process_event(db, event)] += 1
+        if not progressed:
+            break
+    return counts
+
+
+def drain_hotmart_inbox() -> dict[str, int]:
+    start = time.perf_counter()
+    db = SessionLocal()
+    try:
+        counts = process_hotmart_inbox(db)
+    finally:
+        db.close()
+    if any(counts.values()):
+        logger.info(
+            "hotmart_inbox_drained processed=%s ignored=%s retrying=%s dead=%s duration_ms=%.2f",
+            counts[INBOX_PROCESSED],
+            counts[INBOX_IGNORED],
+            counts[INBOX_PENDING],
+            counts[INBOX_DEAD],
+            (time.perf_counter() - start) * 1000,
+        )
+    return counts
@@ -0,0 +1,102 @@
+import logging
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, or_, select
+from sqlalchemy.orm import Session
+
+from app.config import (
+    AUTH_ARTIFACT_RETENTION_HOURS,
+    AUTH_SWEEPER_BATCH_SIZE,
+    AUTH_SWEEPER_MAX_BATCHES,
+)
+from app.database import SessionLocal
+from app.metrics import AUTH_SWEEPER_ROWS_PURGED_TOTAL, AUTH_SWEEPER_RUN_DURATION_SECONDS
+from app.models import EmailVerificationCode, PasswordResetToken, RefreshSession
+
+logger = logging.getLogger(__name__)
+
+
+def _purge_in_batches(db: Session, model, condition, batch_size: int, max_batches: int) -> int:
+    purged = 0
+    for _ in range(max_batches):
+        # Each batch is its own short transaction; SKIP LOCKED leaves rows that a
+        # live request is touching for the next run instead of waiting on them.
+        batch_ids = (
+            select(model.id)
+            .where(condition)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        result = db.execute(
+            delete(model).where(model.id.in_(batch_ids)).execution_options(synchronize_session=False)
+        )
+        db.commit()
+        purged += result.rowcount or 0
+        if (result.rowcount or 0) < batch_size:
+            break
+    return purged
+
+
+def sweep_expired_auth_artifacts(
+    db: Session,
+    now: datetime | None = None,
+    batch_size: int = AUTH_SWEEPER_BATCH_SIZE,
+    max_batches: int = AUTH_SWEEPER_MAX_BATCHES,
+) -> dict[str, int]:
+    now = now or datetime.utcnow()
+    # Rows stay around for the retention window because the resend/reset rate
+    # limits count rows created in the last hour.
+    cutoff = now - timedelta(hours=AUTH_ARTIFACT_RETENTION_HOURS)
+
+    purged = {
+        "refresh_sessions": _purge_in_batches(
+            db,
+            RefreshSession,
+            or_(RefreshSession.expires_at < now, RefreshSession.revoked_at < cutoff),
+            batch_size,
+            max_batches,
+        ),
+        "email_verification_codes": _purge_in_batches(
+            db,
+            EmailVerificationCode,
+            EmailVerificationCode.expires_at < cutoff,
+            batch_size,
+            max_batches,
+        ),
+        "password_reset_tokens": _purge_in_batches(
+            db,
+            PasswordResetToken,
+            PasswordResetToken.expires_at < cutoff,
+            batch_size,
+            max_batches,
+        ),
+    }
+    for table, count in purged.items():
+        AUTH_SWEEPER_ROWS_PURGED_TOTAL.labels(table=table).inc(count)
+    return purged
+
+
+def run_auth_sweeper() -> dict[str, int]:
+    start = time.perf_counter()
+    db = SessionLocal()
+    try:
+        purged = sweep_expired_auth_artifacts(db)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    elapsed = time.perf_counter() - start
+    AUTH_SWEEPER_RUN_DURATION_SECONDS.observe(elapsed)
+    logger.info(
+        "auth_sweeper_run refresh_sessions=%s email_verification_codes=%s "
+        "password_reset_tokens=%s duration_ms=%.2f",
+        purged["refresh_sessions"],
+        purged["email_verification_codes"],
+        purged["password_reset_tokens"],
+        elapsed * 1000,
+    )
+    return purged
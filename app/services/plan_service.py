@@ -1,5 +1,22 @@
+import logging
+from datetime import datetime
+
+from sqlalchemy import and_, insert, literal, or_, select, update
+from sqlalchemy.orm import Session
+
 from app.models import User, UserProfile
 
+logger = logging.getLogger(__name__)
+
+DEFAULT_PLAN_VALUES = {
+    "plan": "free",
+    "is_premium": False,
+    "subscription_status": "inactive",
+    "payment_status": "pending",
+    "free_uses": 5,
+    "uses_count": 0,
+}
+
 
 def ensure_user_plan_profile(user: User) -> UserProfile:
     if user.plan_profile:
@@ -15,15 +32,110 @@ def ensure_user_plan_profile(user: User) -> UserProfile:
             user.plan_profile.payment_status = "pending"
         return user.plan_profile
 
-    plan_profile = UserProfile(
+    plan_profile = UserProfile(id=user.id, email=user.email, **DEFAULT_PLAN_VALUES)
+    user.plan_profile = plan_profile
+    return plan_profile
+
+
+def get_plan_profile(user: User) -> UserProfile:
+    """Return the user's plan for read paths without touching the session.
+
+    Profiles are provisioned at signup and by ``backfill_plan_profiles``; a
+    user still missing one is shown the default free plan through a transient
+    object that is never added to the session.
+    """
+    if user.plan_profile is not None:
+        return user.plan_profile
+    created_at = user.created_at or datetime.utcnow()
+    return UserProfile(
         id=user.id,
         email=user.email,
-        plan="free",
-        is_premium=False,
-        subscription_status="inactive",
-        payment_status="pending",
-        free_uses=5,
-        uses_count=0,
+        created_at=created_at,
+        updated_at=created_at,
+        **DEFAULT_PLAN_VALUES,
     )
-    user.plan_profile = plan_profile
-    return plan_profile
+
+
+def is_premium_profile(plan_profile: UserProfile) -> bool:
+    return plan_profile.plan == "premium" or bool(plan_profile.is_premium)
+
+
+def consume_free_use(db: Session, user_id) -> int | None:
+    """Spend one free use in a single conditional UPDATE.
+
+    The quota check and the increment happen in the same statement, so
+    concurrent requests can never push ``uses_count`` past ``free_uses``.
+    Returns the new ``uses_count``, or ``None`` when the quota is exhausted.
+    The caller owns the transaction.
+    """
+    statement = (
+        update(UserProfile)
+        .where(
+            UserProfile.id == user_id,
+            UserProfile.uses_count < UserProfile.free_uses,
+        )
+        .values(uses_count=UserProfile.uses_count + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if db.get_bind().dialect.update_returning:
+        return db.execute(statement.returning(UserProfile.uses_count)).scalar_one_or_none()
+
+    # SQLite before 3.35 has no RETURNING; the guarded UPDATE is still atomic.
+    if db.execute(statement).rowcount != 1:
+        return None
+    return db.query(UserProfile.uses_count).filter(UserProfile.id == user_id).scalar()
+
+
+def backfill_plan_profiles(db: Session, batch_size: int = 1000) -> dict[str, int]:
+    """Provision missing plan profiles and repair inconsistent ones, set-based."""
+    created = 0
+    while True:
+        missing = (
+            select(
+                User.id,
+                User.email,
+                *(literal(value).label(field) for field, value in DEFAULT_PLAN_VALUES.items()),
+            )
+            .outerjoin(UserProfile, UserProfile.id == User.id)
+            .where(UserProfile.id.is_(None))
+            .limit(batch_size)
+        )
+        result = db.execute(
+            insert(UserProfile).from_select(["id", "email", *DEFAULT_PLAN_VALUES], missing)
+        )
+        db.commit()
+        created += result.rowcount or 0
+        if (result.rowcount or 0) < batch_size:
+            break
+
+    email_source = select(User.email).where(User.id == UserProfile.id).scalar_subquery()
+    repaired = 0
+    for condition, values in (
+        (UserProfile.email != email_source, {"email": email_source}),
+        (
+            or_(
+                and_(UserProfile.plan == "premium", UserProfile.is_premium.is_(False)),
+                and_(UserProfile.plan != "premium", UserProfile.is_premium.is_(True)),
+            ),
+            {"plan": "premium", "is_premium": True},
+        ),
+        (
+            or_(UserProfile.subscription_status.is_(None), UserProfile.subscription_status == ""),
+            {"subscription_status": "inactive"},
+        ),
+        (
+            or_(UserProfile.payment_status.is_(None), UserProfile.payment_status == ""),
+            {"payment_status": "pending"},
+        ),
+    ):
+        result = db.execute(
+            update(UserProfile)
+            .where(condition)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        repaired += result.rowcount or 0
+    db.commit()
+
+    logger.info("plan_profiles_backfill created=%s repaired=%s", created, repaired)
+    return {"created": created, "repaired": repaired}
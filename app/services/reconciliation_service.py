@@ -0,0 +1,320 @@
+import csv
+import json
+import logging
+import time
+import unicodedata
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.config import HOTMART_RECONCILE_BATCH_SIZE
+from app.database import SessionLocal
+from app.models import User, UserProfile
+from app.services.hotmart_service import (
+    APPROVED_STATUSES,
+    CANCELED_PLAN_VALUES,
+    CANCELED_STATUSES,
+    PREMIUM_PLAN_VALUES,
+    extract_event_fields,
+)
+
+logger = logging.getLogger(__name__)
+
+# Column names seen in Hotmart sales exports (PT-BR and EN), compared after
+# lower-casing and stripping accents.
+EMAIL_COLUMNS = ("email", "buyer_email", "email do comprador", "e-mail do comprador", "e-mail")
+TRANSACTION_COLUMNS = ("transaction", "purchase_id", "transacao", "codigo da transacao", "codigo")
+STATUS_COLUMNS = ("status", "purchase_status", "status da transacao", "status da compra")
+DATE_COLUMNS = (
+    "date",
+    "order_date",
+    "approved_date",
+    "data",
+    "data da transacao",
+    "data de aprovacao",
+    "data da compra",
+)
+EXPORT_STATUS_ALIASES = {
+    "APROVADO": "APPROVED",
+    "APROVADA": "APPROVED",
+    "COMPLETO": "APPROVED",
+    "COMPLETE": "APPROVED",
+    "COMPLETED": "APPROVED",
+    "ATIVO": "ACTIVE",
+    "CANCELADO": "CANCELED",
+    "CANCELADA": "CANCELED",
+    "REEMBOLSADO": "REFUNDED",
+    "REEMBOLSADA": "REFUNDED",
+    "DEVOLVIDO": "REFUNDED",
+}
+DATE_FORMATS = ("%d/%m/%Y %H:%M:%S", "%d/%m/%Y %H:%M", "%d/%m/%Y", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d")
+
+
+@dataclass
+class SaleRecord:
+    email: str
+    status: str
+    transaction: str | None = None
+    occurred_at: datetime | None = None
+
+    @property
+    def activates(self) -> bool:
+        return self.status in APPROVED_STATUSES
+
+
+@dataclass
+class ReconciliationReport:
+    dry_run: bool
+    rows_read: int = 0
+    rows_skipped: int = 0
+    buyers: int = 0
+    activated: list[str] = field(default_factory=list)
+    canceled: list[str] = field(default_factory=list)
+    unchanged: int = 0
+    not_found: list[str] = field(default_factory=list)
+    duration_ms: float = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "dry_run": self.dry_run,
+            "rows_read": self.rows_read,
+            "rows_skipped": self.rows_skipped,
+            "buyers": self.buyers,
+            "activated": len(self.activated),
+            "canceled": len(self.canceled),
+            "unchanged": self.unchanged,
+            "not_found": len(self.not_found),
+            "duration_ms": round(self.duration_ms, 2),
+            "diff": {
+                "activated": self.activated,
+                "canceled": self.canceled,
+                "not_found": self.not_found,
+            },
+        }
+
+
+def _normalize_header(name: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", name)
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).strip().lower()
+
+
+def _first_value(row: dict[str, Any], columns: tuple[str, ...]) -> Any:
+    for column in columns:
+        value = row.get(column)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _parse_date(value: Any) -> datetime | None:
+    if value in (None, ""):
+        return None
+    if isinstance(value, (int, float)):
+        # Hotmart's API reports timestamps in epoch milliseconds.
+        return datetime.utcfromtimestamp(value / 1000 if value > 10**11 else value)
+    text = str(value).strip()
+    try:
+        parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+        return parsed.replace(tzinfo=None)
+    except ValueError:
+        pass
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, date_format)
+        except ValueError:
+            continue
+    return None
+
+
+def _normalize_status(value: Any) -> str:
+    status = str(value or "").strip().upper()
+    return EXPORT_STATUS_ALIASES.get(status, status)
+
+
+def sale_from_row(row: dict[str, Any]) -> SaleRecord | None:
+    flat = {_normalize_header(str(key)): value for key, value in row.items() if key is not None}
+    email = _first_value(flat, EMAIL_COLUMNS)
+    status = _first_value(flat, STATUS_COLUMNS)
+    transaction = _first_value(flat, TRANSACTION_COLUMNS)
+    if not isinstance(email, str) or not isinstance(status, str):
+        # Webhook-shaped objects (e.g. an export of past webhook payloads).
+        fields = extract_event_fields(row)
+        email = email if isinstance(email, str) else fields["buyer_email"]
+        status = status if isinstance(status, str) else fields["purchase_status"]
+        transaction = transaction or fields["purchase_id"]
+
+    if not isinstance(email, str) or not email.strip():
+        return None
+    normalized_status = _normalize_status(status)
+    if normalized_status not in APPROVED_STATUSES and normalized_status not in CANCELED_STATUSES:
+        return None
+    return SaleRecord(
+        email=email.strip().lower(),
+        status=normalized_status,
+        transaction=str(transaction).strip() if transaction not in (None, "") else None,
+        occurred_at=_parse_date(_first_value(flat, DATE_COLUMNS)),
+    )
+
+
+def iter_export_rows(path: Path) -> Iterator[dict[str, Any]]:
+    """Stream rows from a Hotmart sales export.
+
+    CSV (comma or semicolon separated) and JSON Lines are read row by row; a
+    plain ``.json`` file may hold an array of sales or ``{"items": [...]}``.
+    """
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        with path.open(newline="", encoding="utf-8-sig") as handle:
+            sample = handle.read(4096)
+            handle.seek(0)
+            delimiter = ";" if sample.count(";") > sample.count(",") else ","
+            yield from csv.DictReader(handle, delimiter=delimiter)
+    elif suffix in {".jsonl", ".ndjson"}:
+        with path.open(encoding="utf-8") as handle:
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+    elif suffix == ".json":
+        with path.open(encoding="utf-8") as handle:
+            document = json.load(handle)
+        items = document.get("items", []) if isinstance(document, dict) else document
+        yield from items
+    else:
+        raise ValueError(f"Unsupported export format: {path.suffix or path.name}")
+
+
+def _latest_sale_per_buyer(rows: Iterable[dict[str, Any]], report: ReconciliationReport) -> dict[str, SaleRecord]:
+    latest: dict[str, SaleRecord] = {}
+    for row in rows:
+        report.rows_read += 1
+        sale = sale_from_row(row) if isinstance(row, dict) else None
+        if sale is None:
+            report.rows_skipped += 1
+            continue
+        current = latest.get(sale.email)
+        # Without dates the export order decides, so later rows win.
+        if (
+            current is None
+            or sale.occurred_at is None
+            or current.occurred_at is None
+            or sale.occurred_at >= current.occurred_at
+        ):
+            latest[sale.email] = sale
+    return latest
+
+
+def _reconcile_batch(
+    db: Session,
+    sales: list[SaleRecord],
+    report: ReconciliationReport,
+) -> None:
+    by_email = {sale.email: sale for sale in sales}
+    rows = db.execute(
+        select(
+            User.id,
+            func.lower(User.email).label("email"),
+            UserProfile.id.label("profile_id"),
+            UserProfile.is_premium,
+            UserProfile.subscription_status,
+            UserProfile.hotmart_purchase_id,
+        )
+        .outerjoin(UserProfile, UserProfile.id == User.id)
+        .where(func.lower(User.email).in_(list(by_email)))
+    ).all()
+
+    found: set[str] = set()
+    new_profiles: list[dict[str, Any]] = []
+    activations: list[dict[str, Any]] = []
+    cancellations: list[Any] = []
+    for row in rows:
+        sale = by_email[row.email]
+        found.add(row.email)
+        if sale.activates:
+            purchase_id = sale.transaction or row.hotmart_purchase_id
+            if row.profile_id is None:
+                new_profiles.append(
+                    {"id": row.id, "email": row.email, "hotmart_purchase_id": purchase_id, **PREMIUM_PLAN_VALUES}
+                )
+            elif (
+                row.is_premium
+                and row.subscription_status == "active"
+                and row.hotmart_purchase_id == purchase_id
+            ):
+                report.unchanged += 1
+                continue
+            else:
+                activations.append({"id": row.id, "hotmart_purchase_id": purchase_id, **PREMIUM_PLAN_VALUES})
+            report.activated.append(row.email)
+        else:
+            if row.profile_id is None or (not row.is_premium and row.subscription_status == "canceled"):
+                report.unchanged += 1
+                continue
+            cancellations.append(row.id)
+            report.canceled.append(row.email)
+
+    report.not_found.extend(sorted(set(by_email) - found))
+    if report.dry_run:
+        return
+
+    if new_profiles:
+        db.execute(insert(UserProfile), new_profiles)
+    if activations:
+        # Bulk UPDATE by primary key: one executemany, no ORM objects loaded.
+        db.execute(update(UserProfile), activations)
+    if cancellations:
+        db.execute(
+            update(UserProfile)
+            .where(UserProfile.id.in_(cancellations))
+            .values(
+                uses_count=UserProfile.free_uses,
+                hotmart_purchase_id=None,
+                **CANCELED_PLAN_VALUES,
+            )
+            .execution_options(synchronize_session=False)
+        )
+    db.commit()
+
+
+def reconcile_hotmart_sales(
+    db: Session,
+    rows: Iterable[dict[str, Any]],
+    *,
+    dry_run: bool = False,
+    batch_size: int = HOTMART_RECONCILE_BATCH_SIZE,
+) -> ReconciliationReport:
+    """Bring ``users_profile`` in line with the latest sale of each buyer in an export."""
+    start = time.perf_counter()
+    report = ReconciliationReport(dry_run=dry_run)
+    latest = _latest_sale_per_buyer(rows, report)
+    report.buyers = len(latest)
+
+    sales = list(latest.values())
+    for offset in range(0, len(sales), batch_size):
+        _reconcile_batch(db, sales[offset:offset + batch_size], report)
+
+    report.duration_ms = (time.perf_counter() - start) * 1000
+    logger.info(
+        "hotmart_reconciliation dry_run=%s rows=%s buyers=%s activated=%s canceled=%s unchanged=%s "
+        "not_found=%s duration_ms=%.2f",
+        dry_run,
+        report.rows_read,
+        report.buyers,
+        len(report.activated),
+        len(report.canceled),
+        report.unchanged,
+        len(report.not_found),
+        report.duration_ms,
+    )
+    return report
+
+
+def reconcile_hotmart_export(path: Path, *, dry_run: bool = False) -> ReconciliationReport:
+    db = SessionLocal()
+    try:
+        return reconcile_hotmart_sales(db, iter_export_rows(path), dry_run=dry_run)
+    finally:
+        db.close()
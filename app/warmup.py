@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+from fastapi import FastAPI
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.pool import QueuePool
+from starlette.concurrency import run_in_threadpool
+
+from app import database
+from app.auth import preload_password_hashing
+from app.config import GOOGLE_CLIENT_ID, WARMUP_POOL_CONNECTIONS
+from app.database import DatabaseRunner
+from app.hot_queries import registered_hot_queries
+from app.services.google_identity import google_jwks_cache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WarmupState:
+    ready: bool = False
+    duration_ms: float = 0.0
+    steps: dict[str, str] = field(default_factory=dict)
+
+
+warmup_state = WarmupState()
+
+
+def _connections_to_open(pool) -> int:
+    if isinstance(pool, QueuePool):
+        return min(WARMUP_POOL_CONNECTIONS, pool.size())
+    # NullPool and the SQLite pools keep nothing warm; one connection still
+    # resolves DNS, loads the driver and checks the database answers.
+    return 1
+
+
+def _open_sync_connections(target: Engine) -> None:
+    connections = []
+    try:
+        for _ in range(_connections_to_open(target.pool)):
+            connection = target.connect()
+            connection.execute(text("SELECT 1"))
+            connections.append(connection)
+    finally:
+        # Held together so the pool really opens that many, then returned to it.
+        for connection in connections:
+            connection.close()
+
+
+async def _open_async_connections(target: AsyncEngine) -> None:
+    connections = []
+    try:
+        for _ in range(_connections_to_open(target.pool)):
+            connection = await target.connect()
+            await connection.execute(text("SELECT 1"))
+            connections.append(connection)
+    finally:
+        for connection in connections:
+            await connection.close()
+
+
+async def _open_pool_connections() -> None:
+    if database.async_engine is not None:
+        await _open_async_connections(database.async_engine)
+    else:
+        await run_in_threadpool(_open_sync_connections, database.engine)
+    for replica in database.replica_set.engines:
+        if isinstance(replica, AsyncEngine):
+            await _open_async_connections(replica)
+        else:
+            await run_in_threadpool(_open_sync_connections, replica)
+
+
+async def _compile_hot_statements() -> None:
+    # Runs every registered hot query once through the same runner the routes
+    # use, so their lambda statements are analysed and compiled into the
+    # engine cache. A random user id matches nothing.
+    hot_queries = registered_hot_queries()
+    if not hot_queries:
+        raise RuntimeError("No hot queries registered; import the routers before warming up.")
+    user_id = uuid.uuid4()
+    if database.AsyncSessionLocal is not None:
+        session = database.AsyncSessionLocal()
+        runner = DatabaseRunner(async_session=session)
+    else:
+        session = database.SessionLocal()
+        runner = DatabaseRunner(session=session)
+    try:
+        for hook in hot_queries.values():
+            await hook(runner, user_id)
+    finally:
+        if isinstance(session, AsyncSession):
+            await session.close()
+        else:
+            await run_in_threadpool(session.close)
+
+
+def _prime_google_jwks() -> None:
+    if GOOGLE_CLIENT_ID:
+        google_jwks_cache.refresh()
+
+
+async def run_warmup(app: FastAPI) -> None:
+    """Prepare the worker for traffic, then flip ``warmup_state.ready``.
+
+    Every step is best effort: a failure is logged and recorded, and the
+    worker still becomes ready, since the request path can do the same work
+    on demand.
+    """
+    steps: list[tuple[str, Callable[[], Awaitable[object]]]] = [
+        ("pool", _open_pool_connections),
+        ("statements", _compile_hot_statements),
+        ("password_hashing", lambda: run_in_threadpool(preload_password_hashing)),
+        ("openapi", lambda: run_in_threadpool(app.openapi)),
+        ("google_jwks", lambda: run_in_threadpool(_prime_google_jwks)),
+    ]
+    start = time.perf_counter()
+    for name, step in steps:
+        step_start = time.perf_counter()
+        try:
+            await step()
+        except Exception as exc:
+            warmup_state.steps[name] = f"error: {type(exc).__name__}"
+            logger.warning("warmup_step_failed step=%s error=%r", name, exc)
+            continue
+        warmup_state.steps[name] = "ok"
+        logger.info("warmup_step step=%s duration_ms=%.2f", name, (time.perf_counter() - step_start) * 1000)
+
+    warmup_state.duration_ms = (time.perf_counter() - start) * 1000
+    warmup_state.ready = True
+    logger.info("warmup_done duration_ms=%.2f", warmup_state.duration_ms)
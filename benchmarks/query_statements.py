@@ -0,0 +1,141 @@
+"""Per-call Python overhead of the hot queries: legacy ``Query`` chains vs cached ``lambda_stmt``.
+
+Runs each hot-path query many times against an in-memory SQLite database,
+where the database work is negligible, so the difference is the time spent
+building statements, computing cache keys and compiling. The legacy variants
+are verbatim copies of the ``db.query(...)`` code the routers used before.
+
+    python benchmarks/query_statements.py --iterations 5000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import case, create_engine, func  # noqa: E402
+from sqlalchemy.orm import Session, joinedload  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.auth import _load_current_user  # noqa: E402
+from app.models import Base, Exercise, ExerciseAttempt, User, UserProfile  # noqa: E402
+from app.routers.attempts import _get_user_stats  # noqa: E402
+from app.routers.exercises import _latest_exercises, _pick_random_exercise  # noqa: E402
+
+FILTERS = {"subject": "algebra", "difficulty": "easy", "source": "ENEM", "theme": None, "level": None, "exam_year": None}
+
+
+def _legacy_filtered(db: Session, **filters):
+    query = db.query(Exercise)
+    for field, value in filters.items():
+        if value:
+            query = query.filter(getattr(Exercise, field) == value)
+    return query
+
+
+def legacy_latest(db: Session, user_id) -> None:
+    _legacy_filtered(db, **FILTERS).order_by(Exercise.created_at.desc()).limit(50).all()
+
+
+def legacy_random(db: Session, user_id) -> None:
+    base_query = _legacy_filtered(db, **FILTERS)
+    answered = db.query(ExerciseAttempt.exercise_id).filter(ExerciseAttempt.user_id == user_id)
+    base_query = base_query.filter(~Exercise.id.in_(answered))
+    total = base_query.with_entities(func.count(Exercise.id)).scalar() or 0
+    base_query.order_by(Exercise.id).offset(random.randint(0, max(total - 1, 0))).limit(1).first()
+
+
+def legacy_stats(db: Session, user_id) -> None:
+    db.query(
+        func.count(ExerciseAttempt.id),
+        func.coalesce(func.sum(case((ExerciseAttempt.is_correct.is_(True), 1), else_=0)), 0),
+    ).filter(ExerciseAttempt.user_id == user_id).one()
+
+
+def legacy_current_user(db: Session, user_id) -> None:
+    db.query(User).options(joinedload(User.plan_profile)).filter(User.id == user_id).first()
+
+
+def cached_latest(db: Session, user_id) -> None:
+    _latest_exercises(db, 50, FILTERS)
+
+
+def cached_random(db: Session, user_id) -> None:
+    filters = {key: value for key, value in FILTERS.items() if key not in {"subject", "difficulty"}}
+    _pick_random_exercise(db, user_id, "algebra", "easy", True, filters)
+
+
+def cached_stats(db: Session, user_id) -> None:
+    _get_user_stats(db, user_id)
+
+
+def cached_current_user(db: Session, user_id) -> None:
+    _load_current_user(db, user_id)
+
+
+CASES = [
+    ("list_exercises", legacy_latest, cached_latest),
+    ("random_exercise", legacy_random, cached_random),
+    ("attempt_stats", legacy_stats, cached_stats),
+    ("current_user", legacy_current_user, cached_current_user),
+]
+
+
+def _seed(session: Session) -> uuid.UUID:
+    user = User(email="bench@example.com", email_verified=True)
+    session.add(user)
+    session.flush()
+    session.add(UserProfile(id=user.id, email=user.email, plan="premium", is_premium=True))
+    for index in range(40):
+        exercise = Exercise(
+            subject="algebra",
+            difficulty="easy",
+            source="ENEM",
+            question=f"Questão {index}",
+            correct_answer="1",
+            explanation="Benchmark.",
+        )
+        session.add(exercise)
+        session.flush()
+        if index % 2:
+            session.add(ExerciseAttempt(user_id=user.id, exercise_id=exercise.id, user_answer="1", is_correct=True))
+    session.commit()
+    return user.id
+
+
+def _time_per_call(fn, session: Session, user_id, iterations: int) -> float:
+    for _ in range(min(200, iterations)):
+        fn(session, user_id)
+    session.expunge_all()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn(session, user_id)
+        session.expunge_all()
+    return (time.perf_counter() - started) / iterations * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=3000)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        user_id = _seed(session)
+        print(f"{'query':<18}{'legacy us/call':>16}{'cached us/call':>16}{'saved':>9}")
+        for name, legacy, cached in CASES:
+            legacy_us = _time_per_call(legacy, session, user_id, args.iterations)
+            cached_us = _time_per_call(cached, session, user_id, args.iterations)
+            print(f"{name:<18}{legacy_us:>16.1f}{cached_us:>16.1f}{1 - cached_us / legacy_us:>9.0%}")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Memory and GC cost of the read-only listings: ORM entities vs dict rows vs slotted row DTOs.
+
+Each case loads one page the way a request does (a fresh session, the rows
+kept alive until the response is rendered) and reports, per loaded row:
+
+* ``peak B``: tracemalloc peak while loading, session and all;
+* ``kept B``: what is still allocated while the rows are held;
+* ``gc objs``: new objects tracked by the cyclic GC;
+* ``gen0/1k``: generation-0 collections triggered per 1000 page loads.
+
+"orm" is the previous implementation (``select(Model)`` through the
+session's identity map), "dict" the column-to-dict rows and "dto" the
+``__slots__`` dataclasses in ``app.serializers``.
+
+    python benchmarks/row_memory.py --iterations 500
+"""
+import argparse
+import gc
+import tracemalloc
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.pool import StaticPool
+
+from serialization import _seed
+
+from app.models import Base, Exercise, ExerciseAttempt, VestibularExercise
+from app.routers.attempts import _recent_attempts
+from app.routers.exercises import _latest_exercises
+from app.serializers import (
+    ATTEMPT_FIELDS,
+    EXERCISE_COLUMNS,
+    EXERCISE_FIELDS,
+    VESTIBULAR_EXERCISE_COLUMNS,
+    vestibular_exercise_rows,
+)
+
+
+def _seed_vestibular(session: Session) -> None:
+    now = datetime.utcnow()
+    session.add_all(
+        VestibularExercise(
+            question=f"Questão vestibular {index}",
+            options={"A": "um", "B": "dois", "C": "três", "D": "quatro"},
+            correct_answer="dois",
+            explanation="Explicação.",
+            difficulty="medium",
+            created_at=now - timedelta(minutes=index),
+        )
+        for index in range(50)
+    )
+    session.commit()
+
+
+def _measure(engine, load, iterations: int) -> tuple[int, float, float, float, float]:
+    def page():
+        with Session(engine) as session:
+            return load(session)
+
+    page()
+    gc.collect()
+    tracked_before = len(gc.get_objects())
+    tracemalloc.start()
+    rows = page()
+    kept, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    tracked = len(gc.get_objects()) - tracked_before
+    count = len(rows)
+    del rows
+
+    gc.collect()
+    collections_before = gc.get_stats()[0]["collections"]
+    for _ in range(iterations):
+        page()
+    gen0 = gc.get_stats()[0]["collections"] - collections_before
+    return count, peak / count, kept / count, tracked / count, gen0 * 1000 / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        user_id = _seed(session)
+        _seed_vestibular(session)
+
+    def dict_attempts(session):
+        split = len(ATTEMPT_FIELDS)
+        rows = session.execute(
+            select(*(getattr(ExerciseAttempt, name) for name in ATTEMPT_FIELDS), *EXERCISE_COLUMNS)
+            .outerjoin(Exercise, Exercise.id == ExerciseAttempt.exercise_id)
+            .where(ExerciseAttempt.user_id == user_id)
+            .order_by(ExerciseAttempt.created_at.desc())
+            .limit(100)
+        ).all()
+        return [
+            {**dict(zip(ATTEMPT_FIELDS, row[:split])), "exercise": dict(zip(EXERCISE_FIELDS, row[split:]))}
+            for row in rows
+        ]
+
+    cases = {
+        "exercises": {
+            "orm": lambda s: list(s.scalars(select(Exercise).order_by(Exercise.created_at.desc()).limit(100))),
+            "dict": lambda s: [
+                dict(zip(EXERCISE_FIELDS, row))
+                for row in s.execute(select(*EXERCISE_COLUMNS).order_by(Exercise.created_at.desc()).limit(100))
+            ],
+            "dto": lambda s: _latest_exercises(s, 100, {}),
+        },
+        "attempts": {
+            "orm": lambda s: list(
+                s.scalars(
+                    select(ExerciseAttempt)
+                    .options(joinedload(ExerciseAttempt.exercise))
+                    .where(ExerciseAttempt.user_id == user_id)
+                    .order_by(ExerciseAttempt.created_at.desc())
+                    .limit(100)
+                )
+            ),
+            "dict": dict_attempts,
+            "dto": lambda s: _recent_attempts(s, user_id, 100),
+        },
+        "vestibular": {
+            "orm": lambda s: list(
+                s.scalars(select(VestibularExercise).order_by(VestibularExercise.created_at.desc()).limit(50))
+            ),
+            "dto": lambda s: vestibular_exercise_rows(
+                s.execute(
+                    select(*VESTIBULAR_EXERCISE_COLUMNS).order_by(VestibularExercise.created_at.desc()).limit(50)
+                ).all()
+            ),
+        },
+    }
+
+    print(f"{'listing':<12}{'rows':>6}{'mode':>6}{'peak B':>10}{'kept B':>10}{'gc objs':>9}{'gen0/1k':>9}")
+    for listing, modes in cases.items():
+        for mode, load in modes.items():
+            count, peak, kept, tracked, gen0 = _measure(engine, load, args.iterations)
+            print(f"{listing:<12}{count:>6}{mode:>6}{peak:>10.0f}{kept:>10.0f}{tracked:>9.1f}{gen0:>9.0f}")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
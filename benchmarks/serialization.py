@@ -0,0 +1,163 @@
+"""Per-item cost of the list endpoints: ORM + ``response_model`` vs Core rows + precompiled serializers.
+
+The legacy path loads ORM objects (with ``joinedload`` for attempts), lets
+FastAPI validate them through the ``response_model`` with ``from_attributes``
+and renders the result with the stdlib ``json``, exactly as the routes did.
+The fast path selects plain columns and dumps the rows with the
+``TypeAdapter``s in ``app.serializers``. Runs on in-memory SQLite, so the
+numbers are dominated by Python-side work.
+
+    python benchmarks/serialization.py --iterations 200
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+from sqlalchemy import create_engine, select  # noqa: E402
+from sqlalchemy.orm import Session, joinedload  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.models import Base, Exercise, ExerciseAttempt, User  # noqa: E402
+from app.routers.attempts import _recent_attempts  # noqa: E402
+from app.routers.exercises import _latest_exercises  # noqa: E402
+from app.schemas import AttemptResponse, ExerciseResponse  # noqa: E402
+from app.serializers import attempt_list_serializer, exercise_list_serializer  # noqa: E402
+
+EXERCISE_FIELD = create_response_field(name="response", type_=List[ExerciseResponse])
+ATTEMPT_FIELD = create_response_field(name="response", type_=List[AttemptResponse])
+
+
+def _render_legacy(field, content) -> bytes:
+    # The synchronous core of fastapi.routing.serialize_response.
+    value, errors = field.validate(content, {}, loc=("response",))
+    assert not errors
+    serialized = field.serialize(
+        value,
+        mode="json",
+        include=None,
+        exclude=None,
+        by_alias=True,
+        exclude_unset=False,
+        exclude_defaults=False,
+        exclude_none=False,
+    )
+    return JSONResponse(serialized).body
+
+
+def _seed(session: Session):
+    user = User(email="bench@example.com", email_verified=True)
+    session.add(user)
+    session.flush()
+    now = datetime.utcnow()
+    for index in range(200):
+        exercise = Exercise(
+            subject="algebra",
+            difficulty="easy",
+            source="ENEM",
+            question=f"Questão {index}: quanto é {index} + {index}?",
+            options=[str(index), str(index * 2), str(index * 3), str(index * 4)],
+            correct_answer=str(index * 2),
+            explanation="Some os dois números.",
+            exam_year=2020,
+            created_at=now - timedelta(minutes=index),
+        )
+        session.add(exercise)
+        session.flush()
+        session.add(
+            ExerciseAttempt(
+                user_id=user.id,
+                exercise_id=exercise.id,
+                user_answer=str(index * 2),
+                is_correct=True,
+                time_spent_seconds=30,
+                created_at=now - timedelta(seconds=index),
+            )
+        )
+    session.commit()
+    return user.id
+
+
+def _per_item_us(fn, items: int, iterations: int) -> float:
+    for _ in range(min(20, iterations)):
+        fn()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations / items * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=100)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        user_id = _seed(session)
+
+        def legacy_exercises_query():
+            session.expunge_all()
+            return list(session.scalars(select(Exercise).order_by(Exercise.created_at.desc()).limit(100)))
+
+        def legacy_attempts_query():
+            session.expunge_all()
+            return list(
+                session.scalars(
+                    select(ExerciseAttempt)
+                    .options(joinedload(ExerciseAttempt.exercise))
+                    .where(ExerciseAttempt.user_id == user_id)
+                    .order_by(ExerciseAttempt.created_at.desc())
+                    .limit(200)
+                )
+            )
+
+        exercise_objects, attempt_objects = legacy_exercises_query(), legacy_attempts_query()
+        exercise_rows = _latest_exercises(session, 100, {})
+        attempt_rows = _recent_attempts(session, user_id, 200)
+        cases = [
+            (
+                "exercises serialize",
+                100,
+                lambda: _render_legacy(EXERCISE_FIELD, exercise_objects),
+                lambda: exercise_list_serializer.dump_json(exercise_rows),
+            ),
+            (
+                "attempts serialize",
+                200,
+                lambda: _render_legacy(ATTEMPT_FIELD, attempt_objects),
+                lambda: attempt_list_serializer.dump_json(attempt_rows),
+            ),
+            (
+                "exercises query+ser",
+                100,
+                lambda: _render_legacy(EXERCISE_FIELD, legacy_exercises_query()),
+                lambda: exercise_list_serializer.dump_json(_latest_exercises(session, 100, {})),
+            ),
+            (
+                "attempts query+ser",
+                200,
+                lambda: _render_legacy(ATTEMPT_FIELD, legacy_attempts_query()),
+                lambda: attempt_list_serializer.dump_json(_recent_attempts(session, user_id, 200)),
+            ),
+        ]
+        print(f"{'case':<22}{'legacy us/item':>16}{'fast us/item':>14}{'speedup':>9}")
+        for name, items, legacy, fast in cases:
+            legacy_us = _per_item_us(legacy, items, args.iterations)
+            fast_us = _per_item_us(fast, items, args.iterations)
+            print(f"{name:<22}{legacy_us:>16.2f}{fast_us:>14.2f}{legacy_us / fast_us:>8.1f}x")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -152,6 +152,25 @@ CREATE TABLE IF NOT EXISTS public.users_profile (
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- ============================================
+-- Caixa de Entrada dos Webhooks da Hotmart
+-- ============================================
+CREATE TABLE IF NOT EXISTS public.hotmart_webhook_inbox (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    idempotency_key VARCHAR(255) NOT NULL UNIQUE,
+    event_name VARCHAR(100) NOT NULL DEFAULT '',
+    buyer_email VARCHAR(255),
+    purchase_id TEXT,
+    purchase_status VARCHAR(50),
+    payload JSONB NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    detail TEXT,
+    received_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    next_attempt_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    processed_at TIMESTAMP WITH TIME ZONE
+);
+
 -- ============================================
 -- Migração para Bases Existentes (idempotente)
 -- ============================================
@@ -181,6 +200,7 @@ ALTER TABLE public.exercises ADD COLUMN IF NOT EXISTS source VARCHAR(50);
 ALTER TABLE public.exercises ADD COLUMN IF NOT EXISTS theme VARCHAR(50);
 ALTER TABLE public.exercises ADD COLUMN IF NOT EXISTS level VARCHAR(50);
 ALTER TABLE public.exercises ADD COLUMN IF NOT EXISTS exam_year INTEGER;
+ALTER TABLE public.exercises ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP;
 DO $$
 BEGIN
     IF EXISTS (
@@ -201,10 +221,22 @@ EXCEPTION
     WHEN duplicate_object THEN NULL;
 END $$;
 
+-- Backfill: todo usuário tem exatamente um users_profile (criado no cadastro)
+INSERT INTO public.users_profile (id, email, plan, is_premium, subscription_status, payment_status, free_uses, uses_count)
+SELECT u.id, u.email, 'free', FALSE, 'inactive', 'pending', 5, 0
+FROM public.users u
+LEFT JOIN public.users_profile up ON up.id = u.id
+WHERE up.id IS NULL
+ON CONFLICT (id) DO NOTHING;
+UPDATE public.users_profile up SET email = u.email FROM public.users u WHERE u.id = up.id AND up.email <> u.email;
+UPDATE public.users_profile SET plan = 'premium', is_premium = TRUE
+WHERE (plan = 'premium' AND is_premium = FALSE) OR (plan <> 'premium' AND is_premium = TRUE);
+
 -- ============================================
 -- Índices para Performance
 -- ============================================
 CREATE INDEX IF NOT EXISTS idx_users_email ON public.users(email);
+CREATE INDEX IF NOT EXISTS idx_users_email_lower ON public.users(lower(email));
 CREATE INDEX IF NOT EXISTS idx_profiles_user_id ON public.profiles(user_id);
 CREATE INDEX IF NOT EXISTS idx_exercises_subject ON public.exercises(subject);
 CREATE INDEX IF NOT EXISTS idx_exercises_difficulty ON public.exercises(difficulty);
@@ -218,6 +250,7 @@ CREATE INDEX IF NOT EXISTS idx_exercises_source_theme_level_year ON public.exerc
 CREATE INDEX IF NOT EXISTS idx_attempts_user_id ON public.exercise_attempts(user_id);
 CREATE INDEX IF NOT EXISTS idx_attempts_exercise_id ON public.exercise_attempts(exercise_id);
 CREATE INDEX IF NOT EXISTS idx_attempts_user_created_at ON public.exercise_attempts(user_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_attempts_user_exercise ON public.exercise_attempts(user_id, exercise_id);
 CREATE INDEX IF NOT EXISTS idx_user_vestibular_progress_user_id ON public.user_vestibular_progress(user_id);
 CREATE INDEX IF NOT EXISTS idx_user_vestibular_progress_exercise_id ON public.user_vestibular_progress(exercise_id);
 CREATE INDEX IF NOT EXISTS idx_users_google_id ON public.users(google_id);
@@ -236,6 +269,13 @@ CREATE INDEX IF NOT EXISTS idx_password_reset_request_ip ON public.password_rese
 CREATE INDEX IF NOT EXISTS idx_refresh_sessions_user_id ON public.refresh_sessions(user_id);
 CREATE INDEX IF NOT EXISTS idx_refresh_sessions_token_hash ON public.refresh_sessions(token_hash);
 CREATE INDEX IF NOT EXISTS idx_refresh_sessions_expires_at ON public.refresh_sessions(expires_at);
+CREATE INDEX IF NOT EXISTS idx_refresh_sessions_revoked_at ON public.refresh_sessions(revoked_at);
+CREATE INDEX IF NOT EXISTS idx_verification_codes_user_created_at ON public.email_verification_codes(user_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_verification_codes_request_ip_created_at ON public.email_verification_codes(request_ip, created_at);
+CREATE INDEX IF NOT EXISTS idx_password_reset_user_created_at ON public.password_reset_tokens(user_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_password_reset_request_ip_created_at ON public.password_reset_tokens(request_ip, created_at);
+CREATE INDEX IF NOT EXISTS idx_hotmart_inbox_status_next_attempt ON public.hotmart_webhook_inbox(status, next_attempt_at);
+CREATE INDEX IF NOT EXISTS idx_hotmart_inbox_buyer_received ON public.hotmart_webhook_inbox(buyer_email, received_at);
 
 -- ============================================
 -- RLS Vestibulares
@@ -0,0 +1,85 @@
+"""hot path indexes
+
+Indexes behind the exclude_answered anti-join, the verification-code rate
+limits, refresh-session revocation and case-insensitive email lookups.
+
+On PostgreSQL they are built with CREATE INDEX CONCURRENTLY outside a
+transaction, so writes to these tables are not blocked while they build.
+IF NOT EXISTS makes the revision safe on databases where create_all already
+added some of them. A concurrent build that failed leaves an INVALID index
+behind; it is dropped and rebuilt on the next run.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 08:25:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('idx_attempts_user_exercise', 'exercise_attempts', ['user_id', 'exercise_id']),
+    ('idx_verification_codes_user_created_at', 'email_verification_codes', ['user_id', 'created_at']),
+    ('idx_verification_codes_request_ip_created_at', 'email_verification_codes', ['request_ip', 'created_at']),
+    ('idx_refresh_sessions_user_id', 'refresh_sessions', ['user_id']),
+    ('idx_users_email_lower', 'users', [sa.text('lower(email)')]),
+]
+
+
+def _is_postgresql() -> bool:
+    return op.get_context().dialect.name == 'postgresql'
+
+
+def _drop_invalid_index(name: str) -> None:
+    if op.get_context().as_sql:
+        # Offline (--sql) scripts cannot inspect the catalog.
+        return
+    invalid = op.get_bind().execute(
+        sa.text(
+            "SELECT 1 FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid "
+            "WHERE c.relname = :name AND NOT i.indisvalid"
+        ),
+        {'name': name},
+    ).first()
+    if invalid:
+        op.drop_index(name, postgresql_concurrently=True, if_exists=True)
+
+
+def upgrade() -> None:
+    if not _is_postgresql():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, if_not_exists=True)
+        return
+
+    # CONCURRENTLY cannot run inside a transaction block.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            _drop_invalid_index(name)
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    if not _is_postgresql():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True)
+        return
+
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,41 @@
+"""exercise updated_at
+
+Version column behind the ETag of ``GET /exercises/{exercise_id}`` and
+``/exercises/seo``. Existing rows keep NULL; the ETag falls back to
+``created_at`` for them, so no backfill (and no table rewrite) is needed.
+
+Databases built from ``database.sql`` or ``AUTO_CREATE_TABLES`` already have
+the column when they are stamped at 0001, so the upgrade skips it there.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 08:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_context().dialect.name == 'postgresql':
+        # Also works in offline (--sql) scripts, which cannot inspect the table.
+        op.execute('ALTER TABLE exercises ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITHOUT TIME ZONE')
+        return
+
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('exercises')}
+    if 'updated_at' not in columns:
+        op.add_column('exercises', sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('exercises') as batch_op:
+        batch_op.drop_column('updated_at')
@@ -0,0 +1,123 @@
+"""hotmart webhook inbox and auth sweep indexes
+
+The durable inbox behind ``POST /hotmart/webhook`` and the indexes the auth
+artifact sweeper and the hourly rate limits probe.
+
+Databases built from ``database.sql`` or ``AUTO_CREATE_TABLES`` may already
+have the table and some of the indexes when they are stamped at 0001, so the
+table is only created when missing and every index uses IF NOT EXISTS. On
+PostgreSQL the indexes on the existing auth tables are built with CREATE
+INDEX CONCURRENTLY outside a transaction, as in 0002; an INVALID index left
+by a failed concurrent build is dropped and rebuilt on the next run.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 09:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INBOX_INDEXES = [
+    ('idx_hotmart_inbox_status_next_attempt', 'hotmart_webhook_inbox', ['status', 'next_attempt_at']),
+    ('idx_hotmart_inbox_buyer_received', 'hotmart_webhook_inbox', ['buyer_email', 'received_at']),
+]
+
+SWEEP_INDEXES = [
+    ('idx_verification_codes_expires_at', 'email_verification_codes', ['expires_at']),
+    ('idx_password_reset_user_created_at', 'password_reset_tokens', ['user_id', 'created_at']),
+    ('idx_password_reset_request_ip_created_at', 'password_reset_tokens', ['request_ip', 'created_at']),
+    ('idx_password_reset_expires_at', 'password_reset_tokens', ['expires_at']),
+    ('idx_refresh_sessions_expires_at', 'refresh_sessions', ['expires_at']),
+    ('idx_refresh_sessions_revoked_at', 'refresh_sessions', ['revoked_at']),
+]
+
+
+def _is_postgresql() -> bool:
+    return op.get_context().dialect.name == 'postgresql'
+
+
+def _has_inbox_table() -> bool:
+    if op.get_context().as_sql:
+        # Offline (--sql) scripts cannot inspect the catalog.
+        return False
+    return sa.inspect(op.get_bind()).has_table('hotmart_webhook_inbox')
+
+
+def _drop_invalid_index(name: str) -> None:
+    if op.get_context().as_sql:
+        return
+    invalid = op.get_bind().execute(
+        sa.text(
+            "SELECT 1 FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid "
+            "WHERE c.relname = :name AND NOT i.indisvalid"
+        ),
+        {'name': name},
+    ).first()
+    if invalid:
+        op.drop_index(name, postgresql_concurrently=True, if_exists=True)
+
+
+def upgrade() -> None:
+    if not _has_inbox_table():
+        op.create_table('hotmart_webhook_inbox',
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.Column('idempotency_key', sa.String(length=255), nullable=False),
+        sa.Column('event_name', sa.String(length=100), nullable=False),
+        sa.Column('buyer_email', sa.String(length=255), nullable=True),
+        sa.Column('purchase_id', sa.Text(), nullable=True),
+        sa.Column('purchase_status', sa.String(length=50), nullable=True),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('detail', sa.Text(), nullable=True),
+        sa.Column('received_at', sa.DateTime(), nullable=False),
+        sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+        sa.Column('processed_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('idempotency_key')
+        )
+    # The inbox is new and empty here, so a plain build does not block writers.
+    for name, table, columns in INBOX_INDEXES:
+        op.create_index(name, table, columns, unique=False, if_not_exists=True)
+
+    if not _is_postgresql():
+        for name, table, columns in SWEEP_INDEXES:
+            op.create_index(name, table, columns, unique=False, if_not_exists=True)
+        return
+
+    # CONCURRENTLY cannot run inside a transaction block.
+    with op.get_context().autocommit_block():
+        for name, table, columns in SWEEP_INDEXES:
+            _drop_invalid_index(name)
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    if not _is_postgresql():
+        for name, table, _ in reversed(SWEEP_INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True)
+    else:
+        with op.get_context().autocommit_block():
+            for name, table, _ in reversed(SWEEP_INDEXES):
+                op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
+
+    for name, table, _ in reversed(INBOX_INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
+    op.drop_table('hotmart_webhook_inbox')
@@ -1,18 +1,23 @@
 import os
-from collections.abc import Generator
+from collections.abc import Callable, Generator
+from contextlib import AbstractContextManager, contextmanager
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.pool import StaticPool
 
 os.environ["DATABASE_URL"] = "sqlite://"
 os.environ["AUTO_CREATE_TABLES"] = "false"
+os.environ["AUTH_SWEEPER_ENABLED"] = "false"
+os.environ["HOTMART_INBOX_WORKER_ENABLED"] = "false"
+os.environ["WARMUP_ENABLED"] = "false"
 
-from app.database import get_db  # noqa: E402
+from app.auth import create_access_token, hash_password  # noqa: E402
+from app.database import SessionLocal, get_db  # noqa: E402
 from app.main import app  # noqa: E402
-from app.models import Base  # noqa: E402
+from app.models import Base, Exercise, Profile, User, UserProfile  # noqa: E402
 from app.services import auth_service  # noqa: E402
 
 engine = create_engine(
@@ -21,6 +26,8 @@ engine = create_engine(
     poolclass=StaticPool,
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Background jobs open their own sessions; point them at the test database too.
+SessionLocal.configure(bind=engine)
 
 
 @pytest.fixture(autouse=True)
@@ -57,3 +64,81 @@ def client(db_session: Session) -> Generator[TestClient, None, None]:
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def auth_headers() -> Callable[..., dict[str, str]]:
+    """Request headers with a bearer token for ``user``, plus any ``extra`` headers."""
+
+    def _auth_headers(user: User, **extra: str) -> dict[str, str]:
+        token = create_access_token({"sub": str(user.id)})
+        return {"Authorization": f"Bearer {token}", **extra}
+
+    return _auth_headers
+
+
+@pytest.fixture
+def user(db_session: Session) -> User:
+    """Verified premium user (password ``secret123``) with its profile rows."""
+    user = User(
+        email="user@example.com",
+        full_name="Test User",
+        password_hash=hash_password("secret123"),
+        email_verified=True,
+    )
+    db_session.add(user)
+    db_session.flush()
+    db_session.add(Profile(user_id=user.id, full_name=user.full_name))
+    db_session.add(
+        UserProfile(
+            id=user.id,
+            email=user.email,
+            plan="premium",
+            is_premium=True,
+            subscription_status="active",
+            payment_status="paid",
+            free_uses=5,
+            uses_count=0,
+        )
+    )
+    db_session.commit()
+    return user
+
+
+@pytest.fixture
+def exercise(db_session: Session) -> Exercise:
+    exercise = Exercise(
+        question="Quanto e 2 + 2?",
+        options=["3", "4", "5", "6"],
+        correct_answer="4",
+        explanation="Soma basica.",
+        difficulty="easy",
+        subject="arithmetic",
+        source="ENEM",
+    )
+    db_session.add(exercise)
+    db_session.commit()
+    return exercise
+
+
+@pytest.fixture
+def assert_max_queries() -> Callable[[int], AbstractContextManager[list[str]]]:
+    """Fail when the block issues more than ``budget`` SQL statements on the test engine."""
+
+    @contextmanager
+    def _assert_max_queries(budget: int) -> Generator[list[str], None, None]:
+        statements: list[str] = []
+
+        def _record(conn, cursor, statement, parameters, context, executemany) -> None:
+            statements.append(" ".join(statement.split()))
+
+        event.listen(engine, "after_cursor_execute", _record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "after_cursor_execute", _record)
+        assert len(statements) <= budget, (
+            f"{len(statements)} SQL statements, budget is {budget}:\n" + "\n".join(statements)
+        )
+
+    return _assert_max_queries
@@ -0,0 +1,67 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import DatabaseRunner, get_db_runner
+from app.main import app
+from app.models import Base, Exercise, ExerciseAttempt, User, UserProfile
+
+
+@pytest.fixture
+def async_db(tmp_path):
+    path = tmp_path / "async.db"
+    sync_engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=sync_engine)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async_session_factory = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    async def _override_get_db_runner():
+        async with async_session_factory() as session:
+            yield DatabaseRunner(async_session=session)
+
+    app.dependency_overrides[get_db_runner] = _override_get_db_runner
+    yield sessionmaker(bind=sync_engine)
+    app.dependency_overrides.pop(get_db_runner, None)
+    sync_engine.dispose()
+
+
+def test_hot_routes_run_on_the_async_engine(client, async_db, auth_headers):
+    with async_db() as session:
+        user = User(email="async@example.com", email_verified=True)
+        session.add(user)
+        session.flush()
+        session.add(UserProfile(id=user.id, email=user.email, plan="free", free_uses=1, uses_count=0))
+        exercise = Exercise(
+            subject="algebra",
+            difficulty="easy",
+            question="x + 1 = 2?",
+            correct_answer="1",
+            explanation="x = 1.",
+        )
+        session.add(exercise)
+        session.commit()
+        user_id, exercise_id = user.id, exercise.id
+        headers = auth_headers(user)
+
+    random_response = client.get("/exercises/random?subject=algebra&difficulty=easy", headers=headers)
+    assert random_response.status_code == 200
+    assert random_response.json()["id"] == str(exercise_id)
+
+    attempt_response = client.post(
+        "/attempts",
+        json={"exercise_id": str(exercise_id), "user_answer": "1", "is_correct": True, "time_spent_seconds": 3},
+        headers=headers,
+    )
+    assert attempt_response.status_code == 200
+    assert attempt_response.json()["exercise"]["question"] == "x + 1 = 2?"
+
+    progress = client.get("/attempts/progress", headers=headers).json()
+    assert progress["stats"] == {"total": 1, "correct": 1, "accuracy": 100}
+
+    limited = client.get("/exercises/random?subject=algebra&difficulty=easy&exclude_answered=false", headers=headers)
+    assert limited.status_code == 403
+
+    with async_db() as session:
+        assert session.get(UserProfile, user_id).uses_count == 1
+        assert session.query(ExerciseAttempt).count() == 1
@@ -0,0 +1,91 @@
+import gzip
+
+import pytest
+
+from app.compression import PrecompressedCache, choose_encoding, precompress
+from app.models import Exercise
+from app.routers.exercises import seo_page_cache
+
+
+@pytest.fixture
+def exercises(db_session) -> list[Exercise]:
+    exercises = [
+        Exercise(
+            question=f"Questão {index}: resolva $x^2 - {index}x = 0$ no conjunto dos reais.",
+            options=[f"$x = {index}$", "$x = 0$", "Ambas", "Nenhuma"],
+            correct_answer="Ambas",
+            explanation="Fatorando, $x(x - k) = 0$, então as duas raízes valem.",
+            difficulty="easy",
+            subject="algebra",
+            source="ENEM",
+        )
+        for index in range(20)
+    ]
+    db_session.add_all(exercises)
+    db_session.commit()
+    return exercises
+
+
+@pytest.mark.parametrize(
+    ("accept_encoding", "expected"),
+    [
+        ("", None),
+        ("gzip, deflate", "gzip"),
+        ("gzip;q=0, identity", None),
+        ("*", "gzip"),
+        ("deflate", None),
+    ],
+)
+def test_choose_encoding(accept_encoding, expected, monkeypatch):
+    monkeypatch.setattr("app.compression.SUPPORTED_ENCODINGS", ("gzip",))
+    assert choose_encoding(accept_encoding) == expected
+
+
+def test_large_responses_are_compressed_and_small_ones_left_alone(client, user, exercises, auth_headers):
+    listed = client.get("/exercises", headers=auth_headers(user, **{"Accept-Encoding": "gzip"}))
+    assert listed.headers["content-encoding"] == "gzip"
+    assert listed.headers["vary"] == "Accept-Encoding"
+    assert int(listed.headers["content-length"]) < len(listed.content)
+    assert len(listed.json()) == 20
+
+    identity = client.get("/exercises", headers=auth_headers(user, **{"Accept-Encoding": "identity"}))
+    assert "content-encoding" not in identity.headers
+    assert identity.json() == listed.json()
+
+    single = client.get(f"/exercises/{exercises[0].id}", headers=auth_headers(user, **{"Accept-Encoding": "gzip"}))
+    assert "content-encoding" not in single.headers
+    assert single.headers["etag"].startswith('"')
+
+
+def test_seo_pages_are_served_precompressed_from_the_cache(client, exercises, assert_max_queries):
+    seo_page_cache.clear()
+    path = "/exercises/seo?source=ENEM&limit=20"
+    first = client.get(path, headers={"Accept-Encoding": "gzip"})
+    assert first.headers["content-encoding"] == "gzip"
+    assert first.headers["etag"].startswith('W/"')
+    assert len(seo_page_cache) == 1
+
+    with assert_max_queries(1):
+        again = client.get(path, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in again.headers
+    assert again.json() == first.json()
+    assert client.get(path, headers={"If-None-Match": first.headers["etag"]}).status_code == 304
+
+
+def test_precompressed_cache_keeps_the_most_recent_entries():
+    cache = PrecompressedCache(max_entries=2)
+    body = precompress(b'{"texto": "' + b"a" * 2000 + b'"}')
+    assert gzip.decompress(body.variants["gzip"]) == body.identity
+    for key in ("a", "b", "c"):
+        cache.put(key, body)
+    assert cache.get("a") is None
+    assert cache.get("c") is body
+
+
+def test_preflight_carries_max_age(client):
+    response = client.options(
+        "/exercises",
+        headers={"Origin": "http://localhost:5173", "Access-Control-Request-Method": "GET"},
+    )
+    assert response.status_code == 200
+    assert response.headers["access-control-max-age"] == "7200"
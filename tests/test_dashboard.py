@@ -0,0 +1,124 @@
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.database import SessionLocal, get_db
+from app.main import app
+from app.models import Base, ExerciseAttempt, Profile, User
+from app.routers import dashboard
+
+
+def _seed(session) -> User:
+    user = User(email="dashboard@example.com", full_name="Dash", email_verified=True)
+    session.add(user)
+    session.flush()
+    session.add(Profile(user_id=user.id, full_name=user.full_name))
+    session.commit()
+    return user
+
+
+@pytest.fixture
+def attempt(db_session, user, exercise) -> ExerciseAttempt:
+    attempt = ExerciseAttempt(user_id=user.id, exercise_id=exercise.id, user_answer="4", is_correct=True)
+    db_session.add(attempt)
+    db_session.commit()
+    return attempt
+
+
+def test_dashboard_matches_the_single_section_endpoints(client, user, attempt, auth_headers):
+    headers = auth_headers(user)
+
+    response = client.get("/dashboard?attempts_limit=5", headers=headers)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["user"] == client.get("/auth/me", headers=headers).json()
+    assert body["plan"] == client.get("/profiles/plan", headers=headers).json()
+    assert body["profile"] == client.get("/profiles/me", headers=headers).json()
+    assert body["stats"] == client.get("/attempts/stats", headers=headers).json()
+    assert body["attempts"] == client.get("/attempts?limit=5", headers=headers).json()
+    assert body["vestibular_stats"] == {"exercicios_feitos": 0, "respostas_corretas": 0, "taxa_acerto": 0}
+    assert body["errors"] == {}
+    assert set(body["timings_ms"]) == {"profile", "stats", "attempts", "vestibular_stats"}
+
+
+def test_failed_section_leaves_the_others(client, user, attempt, auth_headers, monkeypatch):
+
+    def _broken_stats(db, user_id):
+        raise OperationalError("SELECT", {}, Exception("connection lost"))
+
+    monkeypatch.setattr(dashboard, "_get_user_stats", _broken_stats)
+    response = client.get("/dashboard", headers=auth_headers(user))
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["stats"] is None
+    assert body["errors"] == {"stats": dashboard.SECTION_UNAVAILABLE}
+    assert body["profile"]["full_name"] == user.full_name
+    assert len(body["attempts"]) == 1
+
+
+@pytest.fixture
+def file_engine(tmp_path):
+    # A file database gets a real connection pool, unlike the StaticPool used elsewhere.
+    file_engine = create_engine(f"sqlite:///{tmp_path / 'dashboard.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=file_engine)
+    previous_bind = SessionLocal.kw["bind"]
+    SessionLocal.configure(bind=file_engine)
+    yield file_engine
+    SessionLocal.configure(bind=previous_bind)
+    file_engine.dispose()
+
+
+def test_sections_run_concurrently_on_separate_connections(file_engine, auth_headers, monkeypatch):
+    FileSession = sessionmaker(autoflush=False, bind=file_engine)
+    with FileSession() as session:
+        headers = auth_headers(_seed(session))
+
+    lock = threading.Lock()
+    checked_out = {"now": 0, "max": 0}
+
+    @event.listens_for(file_engine, "checkout")
+    def _checkout(*args):
+        with lock:
+            checked_out["now"] += 1
+            checked_out["max"] = max(checked_out["max"], checked_out["now"])
+
+    @event.listens_for(file_engine, "checkin")
+    def _checkin(*args):
+        with lock:
+            checked_out["now"] -= 1
+
+    # Both sections hold their connection until the other one has its own:
+    # run one after the other, they would time out on the barrier.
+    barrier = threading.Barrier(2, timeout=5)
+
+    def _meeting(load):
+        def _load(db, *args):
+            result = load(db, *args)
+            barrier.wait()
+            return result
+
+        return _load
+
+    monkeypatch.setattr(dashboard, "_get_profile", _meeting(dashboard._get_profile))
+    monkeypatch.setattr(dashboard, "_get_user_stats", _meeting(dashboard._get_user_stats))
+
+    def _file_db():
+        with FileSession() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = _file_db
+    try:
+        with TestClient(app) as client:
+            response = client.get("/dashboard", headers=headers)
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.json()["errors"] == {}
+    assert checked_out["max"] >= 2
@@ -0,0 +1,135 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+
+from app.models import User, UserProfile
+from app.routers import auth as auth_router
+from app.services import google_identity
+from app.services.google_identity import JwksCache
+
+CLIENT_ID = "test-client.apps.googleusercontent.com"
+
+
+def _generate_key_pair(kid: str) -> tuple[str, dict]:
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode("utf-8")
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    ).decode("utf-8")
+    public_jwk = jwk.construct(public_pem, "RS256").to_dict()
+    public_jwk.update({"kid": kid, "alg": "RS256", "use": "sig"})
+    return private_pem, public_jwk
+
+
+def _sign_id_token(private_pem: str, kid: str, **overrides) -> str:
+    now = datetime.now(timezone.utc)
+    claims = {
+        "iss": "https://accounts.google.com",
+        "aud": CLIENT_ID,
+        "sub": "google-user-123",
+        "email": "google-user@example.com",
+        "email_verified": True,
+        "name": "Google User",
+        "iat": int(now.timestamp()),
+        "exp": int((now + timedelta(minutes=30)).timestamp()),
+    }
+    claims.update(overrides)
+    return jwt.encode(claims, private_pem, algorithm="RS256", headers={"kid": kid})
+
+
+@pytest.fixture
+def local_jwks(monkeypatch: pytest.MonkeyPatch):
+    private_pem, public_jwk = _generate_key_pair("local-key-1")
+    cache = JwksCache("https://jwks.invalid/certs", fetcher=lambda url: ({"keys": [public_jwk]}, 3600))
+    cache.load({"keys": [public_jwk]})
+    monkeypatch.setattr(google_identity, "google_jwks_cache", cache)
+    monkeypatch.setattr(google_identity, "GOOGLE_CLIENT_ID", CLIENT_ID)
+    monkeypatch.setattr(auth_router, "send_verification_email", lambda *args, **kwargs: True)
+    return private_pem
+
+
+def test_google_id_token_login_creates_user_without_network(client, db_session, local_jwks):
+    id_token = _sign_id_token(local_jwks, "local-key-1")
+
+    response = client.post("/auth/google", json={"id_token": id_token})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["verification_required"] is True
+    assert body["email"] == "google-user@example.com"
+
+    user = db_session.query(User).filter(User.email == "google-user@example.com").first()
+    assert user is not None
+    assert user.google_id == "google-user-123"
+    assert db_session.get(UserProfile, user.id) is not None
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {"aud": "another-client.apps.googleusercontent.com"},
+        {"exp": int((datetime.now(timezone.utc) - timedelta(minutes=5)).timestamp())},
+        {"iss": "https://evil.example.com"},
+    ],
+)
+def test_google_id_token_rejects_invalid_claims(client, local_jwks, overrides):
+    id_token = _sign_id_token(local_jwks, "local-key-1", **overrides)
+
+    response = client.post("/auth/google", json={"id_token": id_token})
+
+    assert response.status_code == 401
+
+
+def test_google_id_token_rejects_unverified_email(client, local_jwks):
+    id_token = _sign_id_token(local_jwks, "local-key-1", email_verified=False)
+
+    response = client.post("/auth/google", json={"id_token": id_token})
+
+    assert response.status_code == 400
+
+
+def test_jwks_cache_refreshes_on_unknown_kid_and_honours_max_age():
+    _, old_jwk = _generate_key_pair("old-key")
+    _, new_jwk = _generate_key_pair("new-key")
+    fetches: list[str] = []
+    now = [1000.0]
+
+    def _fetcher(url: str) -> tuple[dict, int | None]:
+        fetches.append(url)
+        return {"keys": [old_jwk, new_jwk]}, 120
+
+    cache = JwksCache(
+        "https://jwks.invalid/certs",
+        fetcher=_fetcher,
+        min_refresh_interval_seconds=0,
+        refresh_ahead_seconds=0,
+        clock=lambda: now[0],
+    )
+    cache.load({"keys": [old_jwk]})
+
+    assert cache.get_key("old-key") == old_jwk
+    assert fetches == []
+
+    assert cache.get_key("new-key") == new_jwk
+    assert len(fetches) == 1
+
+    now[0] += 121
+    cache.get_key("old-key")
+    assert len(fetches) == 2
+
+
+def test_google_id_token_is_refused_without_a_configured_client_id(client, local_jwks, monkeypatch):
+    monkeypatch.setattr(google_identity, "GOOGLE_CLIENT_ID", "")
+    id_token = _sign_id_token(local_jwks, "local-key-1", aud="any-other-client.apps.googleusercontent.com")
+
+    response = client.post("/auth/google", json={"id_token": id_token})
+
+    assert response.status_code == 503
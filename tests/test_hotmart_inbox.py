@@ -0,0 +1,136 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models import HotmartWebhookEvent, User
+from app.routers import hotmart as hotmart_router
+from app.services import hotmart_service
+from app.services.hotmart_service import process_hotmart_inbox, store_webhook_event
+
+
+@pytest.fixture(autouse=True)
+def _webhook_token(monkeypatch):
+    monkeypatch.setattr(hotmart_router, "HOTMART_WEBHOOK_TOKEN", "hottok-test")
+
+
+def _payload(event_id: str, event: str, email: str, transaction: str = "HP123") -> dict:
+    return {
+        "id": event_id,
+        "event": event,
+        "data": {
+            "buyer": {"email": email},
+            "purchase": {"transaction": transaction, "status": ""},
+        },
+    }
+
+
+def test_webhook_is_stored_and_applied_by_the_inbox_worker(client, db_session):
+    user = User(email="Buyer@Example.com", email_verified=True)
+    db_session.add(user)
+    db_session.commit()
+
+    response = client.post(
+        "/api/hotmart/webhook",
+        json=_payload("evt-1", "PURCHASE_APPROVED", "buyer@example.com"),
+        headers={"X-Hotmart-Hottok": "hottok-test"},
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "accepted", "event": "PURCHASE_APPROVED", "duplicate": False}
+    event = db_session.query(HotmartWebhookEvent).one()
+    db_session.refresh(event)
+    db_session.refresh(user)
+    assert event.status == "processed"
+    assert event.attempts == 1
+    assert user.plan_profile.is_premium is True
+    assert user.plan_profile.hotmart_purchase_id == "HP123"
+
+
+def test_redelivered_webhook_is_deduplicated(client, db_session):
+    payload = _payload("evt-dup", "PURCHASE_APPROVED", "nobody@example.com")
+    headers = {"X-Hotmart-Hottok": "hottok-test"}
+
+    first = client.post("/api/hotmart/webhook", json=payload, headers=headers)
+    second = client.post("/api/hotmart/webhook", json=payload, headers=headers)
+
+    assert first.json()["duplicate"] is False
+    assert second.status_code == 200
+    assert second.json()["duplicate"] is True
+    event = db_session.query(HotmartWebhookEvent).one()
+    assert event.status == "ignored"
+    assert event.detail == "user_not_found"
+
+
+def test_webhook_rejects_invalid_token(client):
+    response = client.post(
+        "/api/hotmart/webhook",
+        json=_payload("evt-x", "PURCHASE_APPROVED", "a@example.com"),
+        headers={"X-Hotmart-Hottok": "wrong"},
+    )
+    assert response.status_code == 401
+
+
+def test_events_for_one_buyer_are_applied_in_order(db_session):
+    user = User(email="ordered@example.com", email_verified=True)
+    db_session.add(user)
+    db_session.commit()
+    approved, _ = store_webhook_event(db_session, _payload("evt-a", "PURCHASE_APPROVED", "ordered@example.com"))
+    canceled, _ = store_webhook_event(db_session, _payload("evt-c", "PURCHASE_CANCELED", "ordered@example.com"))
+    canceled.received_at = approved.received_at + timedelta(seconds=1)
+    db_session.commit()
+
+    counts = process_hotmart_inbox(db_session)
+
+    assert counts["processed"] == 2
+    db_session.refresh(user)
+    assert user.plan_profile.is_premium is False
+    assert user.plan_profile.subscription_status == "canceled"
+
+
+def test_failed_event_is_retried_with_backoff_and_then_dead_lettered(db_session, monkeypatch):
+    user = User(email="flaky@example.com", email_verified=True)
+    db_session.add(user)
+    db_session.commit()
+    event, _ = store_webhook_event(db_session, _payload("evt-f", "PURCHASE_APPROVED", "flaky@example.com"))
+    later, _ = store_webhook_event(db_session, _payload("evt-g", "PURCHASE_CANCELED", "flaky@example.com"))
+    later.received_at = event.received_at + timedelta(seconds=1)
+    db_session.commit()
+
+    def _boom(db, inbox_event):
+        raise RuntimeError("database hiccup")
+
+    monkeypatch.setattr(hotmart_service, "_apply_plan_change", _boom)
+    monkeypatch.setattr(hotmart_service, "HOTMART_INBOX_MAX_ATTEMPTS", 2)
+
+    counts = process_hotmart_inbox(db_session)
+
+    assert counts == {"processed": 0, "ignored": 0, "pending": 1, "dead": 0}
+    db_session.refresh(event)
+    db_session.refresh(later)
+    assert event.status == "pending"
+    assert event.next_attempt_at > datetime.utcnow()
+    # The buyer's later event stays queued behind the failing one.
+    assert later.status == "pending"
+    assert later.attempts == 0
+
+    event.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+    db_session.commit()
+    counts = process_hotmart_inbox(db_session, max_events=1)
+
+    assert counts["dead"] == 1
+    db_session.refresh(event)
+    assert event.status == "dead"
+    assert event.attempts == 2
+    assert "database hiccup" in event.detail
+
+
+def test_processing_lag_handles_an_aware_received_at(db_session):
+    # Postgres returns TIMESTAMP WITH TIME ZONE columns as aware datetimes.
+    db_session.add(User(email="aware@example.com", email_verified=True))
+    db_session.commit()
+    event, _ = store_webhook_event(db_session, _payload("evt-tz", "PURCHASE_APPROVED", "aware@example.com"))
+    db_session.expire_on_commit = False
+    event.received_at = datetime.now(timezone.utc) - timedelta(seconds=30)
+
+    assert hotmart_service._process_event(db_session, event) == "processed"
+    assert 29 <= hotmart_service._lag_seconds(datetime.utcnow(), event.received_at) < 60
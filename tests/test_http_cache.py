@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta
+
+from app.models import Exercise, ExerciseAttempt, UserProfile
+
+
+def _revalidate(client, path: str, headers: dict[str, str]) -> tuple[str, int]:
+    first = client.get(path, headers=headers)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    second = client.get(path, headers={**headers, "If-None-Match": etag})
+    return etag, second.status_code
+
+
+def test_exercise_not_modified_skips_loading_the_row(
+    client, db_session, user, exercise, assert_max_queries, auth_headers
+):
+    path = f"/exercises/{exercise.id}"
+    etag, status_code = _revalidate(client, path, auth_headers(user))
+    assert status_code == 304
+
+    with assert_max_queries(2) as statements:
+        response = client.get(path, headers=auth_headers(user, **{"If-None-Match": f'W/{etag}, "other"'}))
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert "question" not in statements[-1]
+
+    exercise.question = "Quanto e 3 + 3?"
+    db_session.commit()
+    changed = client.get(path, headers=auth_headers(user, **{"If-None-Match": etag}))
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert changed.json()["question"] == "Quanto e 3 + 3?"
+
+
+def test_seo_page_etag_changes_when_the_page_does(client, db_session, user, exercise, auth_headers):
+    path = "/exercises/seo?source=ENEM"
+    etag, status_code = _revalidate(client, path, auth_headers(user))
+    assert status_code == 304
+    assert client.get(path).headers["cache-control"] == "public, no-cache"
+
+    db_session.add(
+        Exercise(
+            question="Quanto e 1 + 1?",
+            correct_answer="2",
+            difficulty="easy",
+            subject="arithmetic",
+            source="ENEM",
+            created_at=datetime.utcnow() + timedelta(seconds=1),
+        )
+    )
+    db_session.commit()
+    response = client.get(path, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+
+
+def test_profile_and_plan_revalidate_until_updated(client, user, auth_headers):
+    for path in ("/profiles/me", "/profiles/plan"):
+        _, status_code = _revalidate(client, path, auth_headers(user))
+        assert status_code == 304
+
+    profile_etag = client.get("/profiles/me", headers=auth_headers(user)).headers["etag"]
+    client.put("/profiles/me", json={"full_name": "Novo Nome"}, headers=auth_headers(user))
+    assert client.get("/profiles/me", headers=auth_headers(user, **{"If-None-Match": profile_etag})).status_code == 200
+
+
+
+def test_update_within_the_same_second_changes_the_etag(client, db_session, user, auth_headers):
+    plan = client.get("/profiles/plan", headers=auth_headers(user))
+    # No second-precision date to revalidate against; only the ETag.
+    assert "last-modified" not in plan.headers
+    since = "Fri, 01 Jan 2100 00:00:00 GMT"
+    assert client.get("/profiles/plan", headers=auth_headers(user, **{"If-Modified-Since": since})).status_code == 200
+
+    plan_profile = db_session.get(UserProfile, user.id)
+    plan_profile.updated_at = plan_profile.updated_at + timedelta(microseconds=1)
+    db_session.commit()
+    response = client.get("/profiles/plan", headers=auth_headers(user, **{"If-None-Match": plan.headers["etag"]}))
+    assert response.status_code == 200
+
+
+def test_stats_etag_follows_the_counters(client, db_session, user, exercise, auth_headers):
+    etag, status_code = _revalidate(client, "/attempts/stats", auth_headers(user))
+    assert status_code == 304
+
+    db_session.add(ExerciseAttempt(user_id=user.id, exercise_id=exercise.id, user_answer="4", is_correct=True))
+    db_session.commit()
+    response = client.get("/attempts/stats", headers=auth_headers(user, **{"If-None-Match": etag}))
+    assert response.status_code == 200
+    assert response.json() == {"total": 1, "correct": 1, "accuracy": 100}
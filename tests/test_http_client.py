@@ -0,0 +1,225 @@
+import asyncio
+import json
+import threading
+from collections.abc import Generator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+from prometheus_client import REGISTRY
+
+from app import resilience
+from app.http_client import OutboundHTTPError, OutboundHttpClient
+from app.resilience import Bulkhead, CircuitBreaker, DependencyGuard
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):  # noqa: A002
+        pass
+
+    def _reply(self, status: int, body: dict) -> None:
+        self.server.client_ports.add(self.client_address[1])
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        self.server.hits[self.path] = self.server.hits.get(self.path, 0) + 1
+        if self.path == "/flaky" and self.server.hits[self.path] == 1:
+            self._reply(503, {"error": "warming up"})
+            return
+        if self.path == "/broken":
+            self._reply(503, {"error": "down"})
+            return
+        self._reply(200, {"path": self.path})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", "0"))
+        self.rfile.read(length)
+        self.server.hits[self.path] = self.server.hits.get(self.path, 0) + 1
+        self._reply(503, {"error": "down"})
+
+
+@pytest.fixture
+def stub_server() -> Generator[ThreadingHTTPServer, None, None]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server.hits = {}
+    server.client_ports = set()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _client(**overrides) -> OutboundHttpClient:
+    options = {
+        "timeout_seconds": 2,
+        "connect_timeout_seconds": 1,
+        "max_connections": 10,
+        "max_keepalive_connections": 5,
+        "keepalive_expiry_seconds": 30,
+        "max_connections_per_host": 2,
+        "retries": 2,
+        "retry_backoff_seconds": 0,
+    }
+    options.update(overrides)
+    return OutboundHttpClient(**options)
+
+
+def _base_url(server: ThreadingHTTPServer) -> str:
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_sync_requests_reuse_a_single_keepalive_connection(stub_server):
+    client = _client()
+    try:
+        for _ in range(5):
+            payload, _ = client.get_json(f"{_base_url(stub_server)}/ping")
+            assert payload == {"path": "/ping"}
+    finally:
+        client.close()
+
+    assert len(stub_server.client_ports) == 1
+
+
+def test_idempotent_requests_are_retried_and_latency_is_recorded(stub_server):
+    labels = {"host": "127.0.0.1", "method": "GET", "status": "200"}
+    before = REGISTRY.get_sample_value("outbound_http_request_duration_seconds_count", labels) or 0
+    client = _client()
+    try:
+        payload, _ = client.get_json(f"{_base_url(stub_server)}/flaky")
+    finally:
+        client.close()
+
+    assert payload == {"path": "/flaky"}
+    assert stub_server.hits["/flaky"] == 2
+    after = REGISTRY.get_sample_value("outbound_http_request_duration_seconds_count", labels)
+    assert after == before + 1
+
+
+def test_post_is_not_retried_after_server_error(stub_server):
+    client = _client()
+    try:
+        response = client.request("POST", f"{_base_url(stub_server)}/emails", json={"to": ["a@b.c"]})
+    finally:
+        client.close()
+
+    assert response.status_code == 503
+    assert stub_server.hits["/emails"] == 1
+
+
+def test_get_json_raises_after_exhausting_retries(stub_server):
+    client = _client(retries=1)
+    try:
+        with pytest.raises(OutboundHTTPError) as exc_info:
+            client.get_json(f"{_base_url(stub_server)}/broken")
+    finally:
+        client.close()
+
+    assert exc_info.value.status_code == 503
+    assert stub_server.hits["/broken"] == 2
+
+
+def test_async_retries_are_counted_and_logged(stub_server, caplog):
+    labels = {"host": "127.0.0.1", "method": "GET"}
+    before = REGISTRY.get_sample_value("outbound_http_retries_total", labels) or 0
+    client = _client()
+
+    async def _run() -> int:
+        try:
+            response = await client.arequest("GET", f"{_base_url(stub_server)}/flaky")
+            return response.status_code
+        finally:
+            await client.aclose()
+
+    with caplog.at_level("WARNING", logger="app.http_client"):
+        assert asyncio.run(_run()) == 200
+
+    assert REGISTRY.get_sample_value("outbound_http_retries_total", labels) == before + 1
+    assert [record.getMessage() for record in caplog.records] == [
+        "outbound_http_retry method=GET host=127.0.0.1 attempt=1 reason=503"
+    ]
+
+
+def test_async_requests_share_the_pool(stub_server):
+    client = _client()
+
+    async def _run() -> list[int]:
+        try:
+            responses = await asyncio.gather(
+                *(client.arequest("GET", f"{_base_url(stub_server)}/async") for _ in range(6))
+            )
+            return [response.status_code for response in responses]
+        finally:
+            await client.aclose()
+
+    statuses = asyncio.run(_run())
+
+    assert statuses == [200] * 6
+    # Per-host limit of 2 caps how many sockets the burst can open.
+    assert len(stub_server.client_ports) <= 2
+
+
+def _half_open_guard(monkeypatch, name: str) -> DependencyGuard:
+    now = [0.0]
+    breaker = CircuitBreaker(
+        name,
+        window_size=4,
+        min_calls=4,
+        failure_rate=0.5,
+        slow_call_seconds=1.0,
+        slow_call_rate=1.0,
+        open_seconds=30,
+        clock=lambda: now[0],
+    )
+    breaker._open()
+    now[0] = 31
+    guard = DependencyGuard(name, breaker, Bulkhead(name, max_concurrent=2, max_queue=0, queue_timeout_seconds=0.05))
+    monkeypatch.setitem(resilience._guards, name, guard)
+    return guard
+
+
+def test_half_open_trial_is_released_after_a_non_http_error(monkeypatch):
+    guard = _half_open_guard(monkeypatch, "test-invalid-url")
+    client = _client()
+
+    def _broken_send(*args, **kwargs):
+        raise httpx.InvalidURL("no host")
+
+    monkeypatch.setattr(client, "_send", _broken_send)
+    with pytest.raises(httpx.InvalidURL):
+        client.request("GET", "http://example.invalid/", dependency="test-invalid-url")
+
+    # The failed trial re-opens the breaker instead of holding it half-open.
+    assert guard.breaker.state == "open"
+    assert guard.breaker._trial_in_flight is False
+    client.close()
+
+
+def test_cancelled_half_open_trial_frees_the_slot(monkeypatch, stub_server):
+    guard = _half_open_guard(monkeypatch, "test-cancelled")
+    client = _client()
+
+    async def _slow_send(*args, **kwargs):
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(client, "_asend", _slow_send)
+
+    async def _cancel_trial():
+        task = asyncio.create_task(client.arequest("GET", _base_url(stub_server), dependency="test-cancelled"))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(_cancel_trial())
+
+    assert guard.breaker.state == "half_open"
+    guard.breaker.before_call()
+    client.close()
@@ -0,0 +1,81 @@
+import json
+import logging
+
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app import logging_config
+from app.logging_config import JsonFormatter, RouteSamplingFilter, parse_sample_rates
+from app.main import app
+
+
+def _record(level: int, route: str | None = None) -> logging.LogRecord:
+    record = logging.makeLogRecord({"name": "app.test", "levelno": level, "levelname": logging.getLevelName(level)})
+    if route is not None:
+        record.route = route
+    return record
+
+
+def test_middleware_stack_is_pure_asgi():
+    assert all(middleware.cls is not BaseHTTPMiddleware for middleware in app.user_middleware)
+
+
+def test_auth_audit_logs_structured_fields(client, caplog):
+    with caplog.at_level(logging.INFO, logger="app.middleware"):
+        response = client.post("/auth/login", json={"email": "nobody@example.com", "password": "wrong-password"})
+        client.get("/health")
+
+    audit = [record for record in caplog.records if getattr(record, "event", None) == "auth_audit"]
+    assert len(audit) == 1
+    payload = json.loads(JsonFormatter().format(audit[0]))
+    assert payload["route"] == "/auth/login"
+    assert payload["status"] == response.status_code
+    assert payload["method"] == "POST"
+    assert payload["message"].startswith("auth_audit method=POST path=/auth/login")
+
+
+def test_sampling_drops_busy_route_info_but_keeps_warnings():
+    rates = parse_sample_rates("/auth/refresh=0.25, /health=0")
+    assert rates == {"/auth/refresh": 0.25, "/health": 0.0}
+    draws = iter([0.1, 0.9])
+    sampling = RouteSamplingFilter(rates)
+    sampling._random = lambda: next(draws)
+
+    kept = _record(logging.INFO, "/auth/refresh")
+    assert sampling.filter(kept) is True
+    assert kept.sample_rate == 0.25
+    assert sampling.filter(_record(logging.INFO, "/auth/refresh")) is False
+    assert sampling.filter(_record(logging.WARNING, "/health")) is True
+    assert sampling.filter(_record(logging.INFO, "/exercises")) is True
+    assert sampling.filter(_record(logging.INFO)) is True
+
+
+def test_queue_listener_writes_json_off_the_calling_thread(capsys, monkeypatch):
+    monkeypatch.setattr(logging_config, "LOG_FORMAT", "json")
+    logging_config.start_logging()
+    try:
+        logging.getLogger("app.test").warning("queued_event user=%s", "u1", extra={"user": "u1"})
+    finally:
+        logging_config.stop_logging()
+
+    line = capsys.readouterr().err.strip().splitlines()[-1]
+    payload = json.loads(line)
+    assert payload["message"] == "queued_event user=u1"
+    assert payload["user"] == "u1"
+    assert payload["level"] == "WARNING"
+
+
+def test_queued_exception_keeps_message_and_traceback_apart(capsys, monkeypatch):
+    monkeypatch.setattr(logging_config, "LOG_FORMAT", "json")
+    logging_config.start_logging()
+    try:
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logging.getLogger("app.test").exception("failed_event id=%s", 1)
+    finally:
+        logging_config.stop_logging()
+
+    payload = json.loads(capsys.readouterr().err.strip().splitlines()[-1])
+    assert payload["message"] == "failed_event id=1"
+    assert payload["exc_info"].startswith("Traceback")
+    assert "ValueError: boom" in payload["exc_info"]
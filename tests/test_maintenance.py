@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+
+from app.models import EmailVerificationCode, PasswordResetToken, RefreshSession, User
+from app.services.maintenance_service import sweep_expired_auth_artifacts
+
+
+def test_sweeper_purges_expired_and_revoked_rows_in_batches(db_session):
+    now = datetime.utcnow()
+    user = User(email="sweeper@example.com", email_verified=True)
+    db_session.add(user)
+    db_session.flush()
+
+    live_session = RefreshSession(user_id=user.id, token_hash="live", expires_at=now + timedelta(days=3))
+    recently_revoked = RefreshSession(
+        user_id=user.id,
+        token_hash="recently-revoked",
+        expires_at=now + timedelta(days=3),
+        revoked_at=now - timedelta(minutes=5),
+    )
+    db_session.add_all([live_session, recently_revoked])
+    for index in range(5):
+        db_session.add(
+            RefreshSession(user_id=user.id, token_hash=f"expired-{index}", expires_at=now - timedelta(hours=1))
+        )
+    db_session.add(
+        RefreshSession(
+            user_id=user.id,
+            token_hash="old-revoked",
+            expires_at=now + timedelta(days=1),
+            revoked_at=now - timedelta(days=2),
+        )
+    )
+
+    # Still inside the rate-limit window, so it must survive even though it expired.
+    recent_code = EmailVerificationCode(
+        user_id=user.id,
+        code_hash="recent",
+        expires_at=now - timedelta(minutes=30),
+        created_at=now - timedelta(minutes=40),
+    )
+    db_session.add(recent_code)
+    db_session.add(
+        EmailVerificationCode(
+            user_id=user.id,
+            code_hash="old",
+            expires_at=now - timedelta(days=2),
+            created_at=now - timedelta(days=2, minutes=10),
+        )
+    )
+    db_session.add(
+        PasswordResetToken(user_id=user.id, token_hash="old-reset", expires_at=now - timedelta(days=3))
+    )
+    db_session.commit()
+
+    purged = sweep_expired_auth_artifacts(db_session, now=now, batch_size=2, max_batches=10)
+
+    assert purged == {
+        "refresh_sessions": 6,
+        "email_verification_codes": 1,
+        "password_reset_tokens": 1,
+    }
+    remaining_sessions = {row.token_hash for row in db_session.query(RefreshSession).all()}
+    assert remaining_sessions == {"live", "recently-revoked"}
+    assert [row.code_hash for row in db_session.query(EmailVerificationCode).all()] == ["recent"]
+    assert db_session.query(PasswordResetToken).count() == 0
+
+
+def test_sweeper_stops_after_max_batches(db_session):
+    now = datetime.utcnow()
+    user = User(email="sweeper-bounded@example.com", email_verified=True)
+    db_session.add(user)
+    db_session.flush()
+    for index in range(7):
+        db_session.add(
+            RefreshSession(user_id=user.id, token_hash=f"expired-{index}", expires_at=now - timedelta(hours=1))
+        )
+    db_session.commit()
+
+    purged = sweep_expired_auth_artifacts(db_session, now=now, batch_size=2, max_batches=2)
+
+    assert purged["refresh_sessions"] == 4
+    assert db_session.query(RefreshSession).count() == 3
@@ -0,0 +1,49 @@
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+
+from app.database import TimedQueuePool, instrument_pool
+
+
+def test_metrics_endpoint_exposes_route_latency_and_threadpool(client):
+    assert client.get("/health").status_code == 200
+    assert client.get("/exercises/not-a-uuid").status_code in {401, 422}
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'http_request_duration_seconds_count{method="GET",route="/health",status="200"}' in body
+    assert 'route="/exercises/{exercise_id}"' in body
+    assert "not-a-uuid" not in body
+    assert "threadpool_max_threads" in body
+
+
+def test_pool_gauges_follow_checkouts(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=TimedQueuePool,
+        pool_size=1,
+        max_overflow=1,
+        pool_logging_name="metrics_test",
+    )
+    instrument_pool(engine, "metrics_test")
+
+    def sample(name: str) -> float:
+        return REGISTRY.get_sample_value(name, {"pool": "metrics_test"}) or 0.0
+
+    first = engine.connect()
+    second = engine.connect()
+    first.execute(text("select 1"))
+    assert sample("db_pool_checked_out_connections") == 2
+    assert sample("db_pool_overflow_connections") == 1
+    assert sample("db_pool_checkout_wait_seconds_count") == 2
+
+    first.close()
+    second.close()
+    assert sample("db_pool_checked_out_connections") == 0
+    assert sample("db_pool_checkouts_total") == 2
+    # The overflow connection is closed on checkin; the pooled one stays open.
+    assert sample("db_pool_open_connections") == 1
+    engine.dispose()
+    assert sample("db_pool_open_connections") == 0
@@ -0,0 +1,101 @@
+from pathlib import Path
+
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import Column, create_engine, inspect
+
+from app import cli
+from app.models import Base
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _alembic_config(database_url: str) -> Config:
+    config = Config(str(ROOT / "alembic.ini"), attributes={"configure_logger": False})
+    config.set_main_option("script_location", str(ROOT / "migrations"))
+    config.set_main_option("sqlalchemy.url", database_url)
+    return config
+
+
+def test_migrations_match_models(tmp_path):
+    database_url = f"sqlite:///{tmp_path / 'migrated.db'}"
+    command.upgrade(_alembic_config(database_url), "head")
+
+    engine = create_engine(database_url)
+    with engine.connect() as connection:
+        diff = compare_metadata(MigrationContext.configure(connection), Base.metadata)
+        # SQLite cannot reflect expression indexes, so compare_metadata skips them.
+        indexes = set(connection.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'index'").scalars())
+    engine.dispose()
+
+    assert diff == []
+    expression_indexes = {
+        index.name
+        for table in Base.metadata.tables.values()
+        for index in table.indexes
+        if not all(isinstance(expression, Column) for expression in index.expressions)
+    }
+    assert expression_indexes == {"idx_users_email_lower"}
+    assert expression_indexes <= indexes
+
+
+def test_hot_path_indexes_downgrade_cleanly(tmp_path):
+    database_url = f"sqlite:///{tmp_path / 'downgraded.db'}"
+    config = _alembic_config(database_url)
+    command.upgrade(config, "head")
+    command.downgrade(config, "0001")
+
+    engine = create_engine(database_url)
+    attempt_indexes = {index["name"] for index in inspect(engine).get_indexes("exercise_attempts")}
+    engine.dispose()
+    assert "idx_attempts_user_exercise" not in attempt_indexes
+    assert "idx_attempts_user_created_at" in attempt_indexes
+
+    command.upgrade(config, "head")
+
+
+def test_cli_migrate_creates_the_schema(tmp_path):
+    database_url = f"sqlite:///{tmp_path / 'cli.db'}"
+
+    assert cli.main(["migrate", "--database-url", database_url]) == 0
+
+    engine = create_engine(database_url)
+    tables = set(inspect(engine).get_table_names())
+    engine.dispose()
+    assert set(Base.metadata.tables) | {"alembic_version"} == tables
+
+
+def test_stamped_create_all_database_upgrades_to_head(tmp_path):
+    database_url = f"sqlite:///{tmp_path / 'stamped.db'}"
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+
+    config = _alembic_config(database_url)
+    command.stamp(config, "0001")
+    command.upgrade(config, "head")
+
+    with engine.connect() as connection:
+        diff = compare_metadata(MigrationContext.configure(connection), Base.metadata)
+    engine.dispose()
+    assert diff == []
+
+
+def test_pre_migration_database_upgrades_to_head(tmp_path):
+    database_url = f"sqlite:///{tmp_path / 'pre_migration.db'}"
+    config = _alembic_config(database_url)
+    command.upgrade(config, "0001")
+
+    engine = create_engine(database_url)
+    inspector = inspect(engine)
+    # 0001 is the schema that predates the webhook inbox and the auth sweeper.
+    assert "hotmart_webhook_inbox" not in inspector.get_table_names()
+    session_indexes = {index["name"] for index in inspector.get_indexes("refresh_sessions")}
+    assert "idx_refresh_sessions_revoked_at" not in session_indexes
+
+    command.upgrade(config, "head")
+    with engine.connect() as connection:
+        diff = compare_metadata(MigrationContext.configure(connection), Base.metadata)
+    engine.dispose()
+    assert diff == []
@@ -0,0 +1,45 @@
+from app.models import User, UserProfile
+from app.services.plan_service import backfill_plan_profiles
+
+
+def test_plan_read_paths_do_not_provision_profiles(client, db_session, auth_headers):
+    user = User(email="legacy@example.com", email_verified=True)
+    db_session.add(user)
+    db_session.commit()
+
+    plan_response = client.get("/profiles/plan", headers=auth_headers(user))
+    vestibular_response = client.get("/vestibular/exercises", headers=auth_headers(user))
+
+    assert plan_response.status_code == 200
+    assert plan_response.json()["plan"] == "free"
+    assert plan_response.json()["uses_count"] == 0
+    assert vestibular_response.status_code == 403
+    assert db_session.query(UserProfile).count() == 0
+
+
+def test_backfill_creates_missing_profiles_and_repairs_inconsistent_ones(db_session):
+    missing = User(email="missing@example.com", email_verified=True)
+    drifted = User(email="drifted@example.com", email_verified=True)
+    db_session.add_all([missing, drifted])
+    db_session.flush()
+    db_session.add(
+        UserProfile(
+            id=drifted.id,
+            email="old@example.com",
+            plan="premium",
+            is_premium=False,
+            subscription_status="active",
+            payment_status="approved",
+        )
+    )
+    db_session.commit()
+
+    result = backfill_plan_profiles(db_session, batch_size=1)
+
+    assert result == {"created": 1, "repaired": 2}
+    db_session.expire_all()
+    created = db_session.get(UserProfile, missing.id)
+    assert (created.email, created.plan, created.free_uses, created.uses_count) == ("missing@example.com", "free", 5, 0)
+    repaired = db_session.get(UserProfile, drifted.id)
+    assert (repaired.email, repaired.is_premium) == ("drifted@example.com", True)
+    assert backfill_plan_profiles(db_session) == {"created": 0, "repaired": 0}
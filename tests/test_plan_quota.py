@@ -0,0 +1,97 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.database import get_db
+from app.main import app
+from app.models import Base, Exercise, User, UserProfile
+
+
+@pytest.fixture
+def file_db(tmp_path):
+    # A real file gives every request its own connection. Statements run in
+    # autocommit mode so reads from concurrent requests interleave freely,
+    # which is what exposes read-then-write races.
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'quota.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+    )
+
+    @event.listens_for(engine, "connect")
+    def _autocommit(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def _override_get_db():
+        session = session_factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db] = _override_get_db
+    yield session_factory
+    app.dependency_overrides.pop(get_db, None)
+    engine.dispose()
+
+
+def _seed(session_factory, *, is_premium: bool = False) -> User:
+    with session_factory() as session:
+        user = User(email="quota@example.com", email_verified=True)
+        session.add(user)
+        session.flush()
+        session.add(
+            UserProfile(
+                id=user.id,
+                email=user.email,
+                plan="premium" if is_premium else "free",
+                is_premium=is_premium,
+                free_uses=5,
+                uses_count=0,
+            )
+        )
+        session.add(
+            Exercise(subject="arithmetic", difficulty="easy", question="1+1?", correct_answer="2", explanation="Soma.")
+        )
+        session.commit()
+        session.refresh(user)
+        session.expunge(user)
+        return user
+
+
+def test_parallel_requests_never_exceed_free_uses(client, file_db, auth_headers):
+    user = _seed(file_db)
+    headers = auth_headers(user)
+
+    def _fetch(_):
+        return client.get(
+            "/exercises/random?subject=arithmetic&difficulty=easy&exclude_answered=false",
+            headers=headers,
+        ).status_code
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        statuses = list(pool.map(_fetch, range(20)))
+
+    assert statuses.count(200) == 5
+    assert statuses.count(403) == 15
+    with file_db() as session:
+        assert session.get(UserProfile, user.id).uses_count == 5
+
+
+def test_premium_users_skip_the_quota_write(client, file_db, auth_headers):
+    user = _seed(file_db, is_premium=True)
+    headers = auth_headers(user)
+
+    for _ in range(7):
+        response = client.get(
+            "/exercises/random?subject=arithmetic&difficulty=easy&exclude_answered=false",
+            headers=headers,
+        )
+        assert response.status_code == 200
+
+    with file_db() as session:
+        assert session.get(UserProfile, user.id).uses_count == 0
@@ -0,0 +1,89 @@
+import uuid
+
+from app.models import UserProfile, VestibularExercise
+
+# Statements per request on the hot paths. Raise a budget only together with
+# the change that needs the extra query, and say why in the commit.
+BUDGETS = {
+    "random_exercise": 3,
+    # Plus the conditional UPDATE ... RETURNING that spends one free use.
+    "random_exercise_free": 4,
+    "create_attempt": 2,
+    "attempt_stats": 2,
+    "vestibular_answer": 5,
+    "login": 2,
+    "refresh": 4,
+}
+
+
+def test_random_exercise_budget(client, user, exercise, assert_max_queries, auth_headers):
+    headers = auth_headers(user)
+    with assert_max_queries(BUDGETS["random_exercise"]):
+        response = client.get("/exercises/random?subject=arithmetic&difficulty=easy", headers=headers)
+    assert response.status_code == 200
+
+
+def test_random_exercise_free_user_budget(client, db_session, user, exercise, assert_max_queries, auth_headers):
+    plan_profile = db_session.get(UserProfile, user.id)
+    plan_profile.plan = "free"
+    plan_profile.is_premium = False
+    plan_profile.subscription_status = "inactive"
+    plan_profile.payment_status = "pending"
+    db_session.commit()
+    headers = auth_headers(user)
+
+    with assert_max_queries(BUDGETS["random_exercise_free"]) as statements:
+        response = client.get("/exercises/random?subject=arithmetic&difficulty=easy", headers=headers)
+    assert response.status_code == 200
+    assert any(statement.lstrip().upper().startswith("UPDATE") for statement in statements)
+    db_session.refresh(plan_profile)
+    assert plan_profile.uses_count == 1
+
+
+def test_create_attempt_budget(client, user, exercise, assert_max_queries, auth_headers):
+    payload = {"exercise_id": str(exercise.id), "user_answer": "4", "is_correct": True, "time_spent_seconds": 12}
+    headers = auth_headers(user)
+    with assert_max_queries(BUDGETS["create_attempt"]):
+        response = client.post("/attempts", json=payload, headers=headers)
+    assert response.status_code == 200
+
+
+def test_attempt_stats_budget(client, user, assert_max_queries, auth_headers):
+    headers = auth_headers(user)
+    with assert_max_queries(BUDGETS["attempt_stats"]):
+        response = client.get("/attempts/stats", headers=headers)
+    assert response.status_code == 200
+
+
+def test_vestibular_answer_budget(client, db_session, user, assert_max_queries, auth_headers):
+    exercise = VestibularExercise(
+        id=uuid.uuid4(),
+        question="Resolva: 3x + 9 = 18",
+        options=["1", "2", "3", "4"],
+        correct_answer="3",
+        explanation="3x = 9, x = 3.",
+        difficulty="medium",
+    )
+    db_session.add(exercise)
+    db_session.commit()
+    payload = {"exercise_id": str(exercise.id), "answer": "3"}
+    headers = auth_headers(user)
+
+    with assert_max_queries(BUDGETS["vestibular_answer"]):
+        response = client.post("/vestibular/answer", json=payload, headers=headers)
+    assert response.status_code == 200
+
+
+def test_login_and_refresh_budgets(client, user, assert_max_queries):
+    credentials = {"username": user.email, "password": "secret123"}
+    with assert_max_queries(BUDGETS["login"]):
+        login = client.post(
+            "/auth/login",
+            data=credentials,
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+        )
+    assert login.status_code == 200
+
+    with assert_max_queries(BUDGETS["refresh"]):
+        refresh = client.post("/auth/refresh")
+    assert refresh.status_code == 200
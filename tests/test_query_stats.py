@@ -0,0 +1,40 @@
+import logging
+
+from sqlalchemy import text
+
+from app.models import Exercise, User
+from app.query_stats import track_queries
+
+
+def test_track_queries_counts_statements_and_flags_repeats(db_session):
+    with track_queries() as stats:
+        for value in range(6):
+            db_session.execute(text("SELECT :value"), {"value": value})
+        db_session.execute(text("SELECT 42"))
+
+    assert stats.count == 7
+    assert stats.duration_seconds > 0
+    assert stats.repeated_statements(5) == [("SELECT ?", 6)]
+
+    db_session.execute(text("SELECT 1"))
+    assert stats.count == 7
+
+
+def test_responses_carry_server_timing_for_db_work(
+    client, db_session, auth_headers, caplog
+):
+    user = User(email="timing@example.com", email_verified=True)
+    exercise = Exercise(subject="arithmetic", difficulty="easy", question="1+1?", correct_answer="2", explanation="Soma.")
+    db_session.add_all([user, exercise])
+    db_session.commit()
+    headers = auth_headers(user)
+
+    with caplog.at_level(logging.WARNING, logger="app.middleware"):
+        response = client.get("/exercises", headers=headers)
+
+    assert response.status_code == 200
+    timing = response.headers["server-timing"]
+    assert timing.startswith("app;dur=")
+    assert 'db;dur=' in timing
+    assert '2 queries"' in timing
+    assert "sql_n_plus_one" not in caplog.text
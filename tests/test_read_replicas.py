@@ -0,0 +1,118 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app import database
+from app.config import DB_REPLICA_STICKY_COOKIE_NAME
+from app.database import RecentWriters, ReplicaSet
+from app.models import Base, Exercise, User
+
+
+@pytest.fixture
+def replica_engine(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'replica.db'}",
+        connect_args={"check_same_thread": False},
+    )
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+def _exercise(question: str) -> Exercise:
+    return Exercise(subject="arithmetic", difficulty="easy", question=question, correct_answer="2", explanation="Soma.")
+
+
+def _seed_primary(db_session, email: str) -> tuple[User, Exercise]:
+    user = User(email=email, email_verified=True)
+    exercise = _exercise("primary")
+    db_session.add_all([user, exercise])
+    db_session.commit()
+    return user, exercise
+
+
+def test_reads_go_to_replica_until_the_user_writes(client, db_session, replica_engine, monkeypatch, auth_headers):
+    monkeypatch.setattr(database, "replica_set", ReplicaSet([replica_engine], retry_seconds=30))
+    user, exercise = _seed_primary(db_session, "replica-reader@example.com")
+    with Session(replica_engine) as replica:
+        replica.add(_exercise("replica"))
+        replica.commit()
+
+    listed = client.get("/exercises", headers=auth_headers(user))
+    assert [item["question"] for item in listed.json()] == ["replica"]
+    assert client.get("/exercises/seo").json()[0]["question"] == "replica"
+
+    created = client.post(
+        "/attempts",
+        json={"exercise_id": str(exercise.id), "user_answer": "2", "is_correct": True},
+        headers=auth_headers(user),
+    )
+    assert created.status_code == 200
+
+    # The replica has no attempts; the stats must reflect the write just made.
+    stats = client.get("/attempts/stats", headers=auth_headers(user))
+    assert stats.json()["total"] == 1
+    # Other users keep reading from the replica.
+    assert client.get("/exercises/seo").json()[0]["question"] == "replica"
+
+
+def test_unreachable_replica_falls_back_to_primary(client, db_session, tmp_path, monkeypatch, auth_headers):
+    broken = create_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    replicas = ReplicaSet([broken], retry_seconds=30)
+    monkeypatch.setattr(database, "replica_set", replicas)
+    user, _ = _seed_primary(db_session, "replica-fallback@example.com")
+
+    response = client.get("/exercises", headers=auth_headers(user))
+
+    assert response.status_code == 200
+    assert [item["question"] for item in response.json()] == ["primary"]
+    assert replicas.choose() is None
+
+
+def test_replica_set_round_robins_and_retries_after_cooldown():
+    now = [0.0]
+    first, second = create_engine("sqlite://"), create_engine("sqlite://")
+    replicas = ReplicaSet([first, second], retry_seconds=10, clock=lambda: now[0])
+
+    assert [replicas.choose(), replicas.choose(), replicas.choose()] == [first, second, first]
+
+    replicas.mark_down(second)
+    assert [replicas.choose(), replicas.choose()] == [first, first]
+
+    now[0] = 11
+    assert {replicas.choose(), replicas.choose()} == {first, second}
+
+
+def test_write_marker_cookie_keeps_reads_on_primary_in_another_worker(
+    client, db_session, replica_engine, monkeypatch, auth_headers
+):
+    monkeypatch.setattr(database, "replica_set", ReplicaSet([replica_engine], retry_seconds=30))
+    user, exercise = _seed_primary(db_session, "replica-cookie@example.com")
+
+    created = client.post(
+        "/attempts",
+        json={"exercise_id": str(exercise.id), "user_answer": "2", "is_correct": True},
+        headers=auth_headers(user),
+    )
+    assert DB_REPLICA_STICKY_COOKIE_NAME in created.cookies
+
+    # Another worker never saw the write; only the cookie tells it.
+    monkeypatch.setattr(database.recent_writers, "_until", {})
+    assert client.get("/attempts/stats", headers=auth_headers(user)).json()["total"] == 1
+    assert client.get("/dashboard", headers=auth_headers(user)).json()["stats"]["total"] == 1
+
+    client.cookies.clear()
+    assert client.get("/attempts/stats", headers=auth_headers(user)).json()["total"] == 0
+
+
+def test_write_marker_is_bound_to_user_signature_and_expiry():
+    now = [1000.0]
+    writers = RecentWriters(5, "secret", clock=lambda: 0.0, wall_clock=lambda: now[0])
+    marker = writers.write_marker("user-1")
+
+    assert writers.wrote_recently("user-1", marker)
+    assert not writers.wrote_recently("user-2", marker)
+    assert not writers.wrote_recently("user-1", marker[:-1] + ("0" if marker[-1] != "0" else "1"))
+    assert not RecentWriters(5, "other-secret", wall_clock=lambda: now[0]).wrote_recently("user-1", marker)
+    now[0] += 10
+    assert not writers.wrote_recently("user-1", marker)
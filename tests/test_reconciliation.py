@@ -0,0 +1,78 @@
+import json
+
+from app.models import User, UserProfile
+from app.services.plan_service import ensure_user_plan_profile
+from app.services.reconciliation_service import iter_export_rows, reconcile_hotmart_sales
+
+
+def _users(db_session, *emails):
+    users = [User(email=email, email_verified=True) for email in emails]
+    db_session.add_all(users)
+    db_session.commit()
+    return users
+
+
+def test_reconciliation_applies_latest_sale_per_buyer(db_session, tmp_path):
+    new_buyer, refunded, already_premium = _users(
+        db_session, "new@example.com", "refunded@example.com", "kept@example.com"
+    )
+    for user in (refunded, already_premium):
+        profile = ensure_user_plan_profile(user)
+        profile.plan = "premium"
+        profile.is_premium = True
+        profile.subscription_status = "active"
+        profile.payment_status = "approved"
+        profile.hotmart_purchase_id = "HP-KEEP" if user is already_premium else "HP-OLD"
+        profile.uses_count = 1
+    db_session.commit()
+
+    export = tmp_path / "vendas.csv"
+    export.write_text(
+        "Transação;Status;E-mail do Comprador;Data da Transação\n"
+        "HP-1;Aprovado;NEW@example.com;01/03/2026 10:00:00\n"
+        "HP-OLD;Aprovado;refunded@example.com;01/02/2026 10:00:00\n"
+        "HP-OLD;Reembolsado;refunded@example.com;05/02/2026 10:00:00\n"
+        "HP-KEEP;Completo;kept@example.com;01/01/2026 10:00:00\n"
+        "HP-9;Aprovado;ghost@example.com;01/01/2026 10:00:00\n"
+        "HP-10;Aguardando pagamento;new@example.com;02/03/2026 10:00:00\n",
+        encoding="utf-8",
+    )
+
+    report = reconcile_hotmart_sales(db_session, iter_export_rows(export), batch_size=2)
+
+    assert report.as_dict()["diff"] == {
+        "activated": ["new@example.com"],
+        "canceled": ["refunded@example.com"],
+        "not_found": ["ghost@example.com"],
+    }
+    assert report.rows_read == 6
+    assert report.rows_skipped == 1
+    assert report.unchanged == 1
+
+    db_session.expire_all()
+    profiles = {profile.email: profile for profile in db_session.query(UserProfile).all()}
+    assert profiles["new@example.com"].is_premium is True
+    assert profiles["new@example.com"].hotmart_purchase_id == "HP-1"
+    assert profiles["refunded@example.com"].is_premium is False
+    assert profiles["refunded@example.com"].uses_count == profiles["refunded@example.com"].free_uses
+    assert profiles["refunded@example.com"].hotmart_purchase_id is None
+    assert profiles["kept@example.com"].hotmart_purchase_id == "HP-KEEP"
+
+
+def test_reconciliation_dry_run_reports_without_writing(db_session, tmp_path):
+    (user,) = _users(db_session, "dry@example.com")
+    ensure_user_plan_profile(user)
+    db_session.commit()
+
+    export = tmp_path / "sales.jsonl"
+    export.write_text(
+        json.dumps({"event": "PURCHASE_APPROVED", "data": {"buyer": {"email": "dry@example.com"},
+                    "purchase": {"transaction": "HP-7", "status": "APPROVED"}}}) + "\n",
+        encoding="utf-8",
+    )
+
+    report = reconcile_hotmart_sales(db_session, iter_export_rows(export), dry_run=True)
+
+    assert report.activated == ["dry@example.com"]
+    db_session.expire_all()
+    assert db_session.get(UserProfile, user.id).is_premium is False
@@ -0,0 +1,114 @@
+import threading
+import uuid
+
+import pytest
+
+from app import resilience
+from app.exceptions import DependencyUnavailableError
+from app.models import User
+from app.resilience import Bulkhead, CircuitBreaker, DependencyGuard
+from app.services import auth_service, email_service
+
+
+def _breaker(clock, **overrides) -> CircuitBreaker:
+    options = {
+        "window_size": 4,
+        "min_calls": 4,
+        "failure_rate": 0.5,
+        "slow_call_seconds": 1.0,
+        "slow_call_rate": 1.0,
+        "open_seconds": 30,
+        "clock": clock,
+    }
+    options.update(overrides)
+    return CircuitBreaker(f"test-{uuid.uuid4().hex[:8]}", **options)
+
+
+def test_circuit_breaker_opens_on_failures_and_recovers_after_trial_call():
+    now = [0.0]
+    breaker = _breaker(lambda: now[0])
+
+    for success in (True, False, True, False):
+        breaker.before_call()
+        breaker.record(success, 0.01)
+    assert breaker.state == "open"
+
+    with pytest.raises(DependencyUnavailableError) as exc_info:
+        breaker.before_call()
+    assert exc_info.value.retry_after_seconds == 30
+
+    now[0] = 31
+    breaker.before_call()
+    assert breaker.state == "half_open"
+    with pytest.raises(DependencyUnavailableError):
+        breaker.before_call()
+
+    breaker.record(True, 0.01)
+    assert breaker.state == "closed"
+
+
+def test_circuit_breaker_opens_on_slow_calls():
+    breaker = _breaker(lambda: 0.0, slow_call_rate=0.75)
+
+    for _ in range(4):
+        breaker.before_call()
+        breaker.record(True, 2.5)
+
+    assert breaker.state == "open"
+
+
+def test_bulkhead_rejects_when_slots_and_queue_are_full():
+    bulkhead = Bulkhead("test-bulkhead", max_concurrent=1, max_queue=0, queue_timeout_seconds=0.05)
+    holding = threading.Event()
+    release = threading.Event()
+
+    def _hold_slot():
+        with bulkhead.acquire():
+            holding.set()
+            release.wait(timeout=2)
+
+    worker = threading.Thread(target=_hold_slot)
+    worker.start()
+    holding.wait(timeout=2)
+    try:
+        with pytest.raises(DependencyUnavailableError):
+            with bulkhead.acquire():
+                pass
+    finally:
+        release.set()
+        worker.join()
+
+    with bulkhead.acquire():
+        pass
+
+
+def test_thread_budget_keeps_outbound_calls_under_half_the_threadpool():
+    resilience.check_thread_budget(40)
+    resilience.check_thread_budget(32, max_concurrent=4, max_queue=4)
+
+    # The previous defaults: two stalled providers could hold 48 of 40 workers.
+    with pytest.raises(RuntimeError, match="48 of 40"):
+        resilience.check_thread_budget(40, max_concurrent=8, max_queue=16)
+
+
+def test_open_resend_breaker_returns_503_with_retry_after(client, db_session, monkeypatch):
+    breaker = _breaker(lambda: 0.0)
+    breaker._open()
+    guard = DependencyGuard(
+        "resend",
+        breaker,
+        Bulkhead("resend", max_concurrent=1, max_queue=1, queue_timeout_seconds=0.05),
+    )
+    monkeypatch.setitem(resilience._guards, "resend", guard)
+    monkeypatch.setattr(email_service, "RESEND_API_KEY", "re_test_key")
+    monkeypatch.setattr(auth_service, "send_verification_email", email_service.send_verification_email)
+
+    user = User(email="pending@example.com", full_name="Pending", email_verified=False)
+    db_session.add(user)
+    db_session.commit()
+    pending_token = auth_service._create_pending_token(user.id, uuid.uuid4())
+
+    response = client.post("/auth/resend-code", json={"pending_token": pending_token})
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "30"
@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta
+
+from app.models import Exercise, ExerciseAttempt, User, UserProfile, VestibularExercise
+from app.schemas import (
+    AttemptResponse,
+    ExerciseResponse,
+    ProgressResponse,
+    StatsResponse,
+    VestibularExerciseResponse,
+)
+from app.serializers import AttemptRow, ExerciseRow, ProgressRow, StatsRow, VestibularExerciseRow
+
+
+def test_row_types_mirror_the_response_schemas():
+    for row_type, schema in (
+        (ExerciseRow, ExerciseResponse),
+        (AttemptRow, AttemptResponse),
+        (StatsRow, StatsResponse),
+        (ProgressRow, ProgressResponse),
+        (VestibularExerciseRow, VestibularExerciseResponse),
+    ):
+        assert list(row_type.__annotations__) == list(schema.model_fields)
+
+
+def test_list_endpoints_match_the_response_model_output(client, db_session, auth_headers):
+    user = User(email="serializer@example.com", email_verified=True)
+    now = datetime.utcnow()
+    exercises = [
+        Exercise(
+            subject="algebra",
+            difficulty="easy",
+            question=f"Questão {index}",
+            options=["1", "2", "3"] if index % 2 else None,
+            correct_answer="2",
+            explanation="Soma." if index % 2 else None,
+            source="ENEM",
+            exam_year=2020 + index,
+            created_at=now - timedelta(minutes=index),
+        )
+        for index in range(3)
+    ]
+    db_session.add(user)
+    db_session.add_all(exercises)
+    db_session.flush()
+    attempts = [
+        ExerciseAttempt(
+            user_id=user.id,
+            exercise_id=exercise.id,
+            user_answer="2",
+            is_correct=index != 1,
+            time_spent_seconds=index * 10 or None,
+            created_at=now - timedelta(seconds=index),
+        )
+        for index, exercise in enumerate(exercises)
+    ]
+    db_session.add_all(attempts)
+    db_session.commit()
+    headers = auth_headers(user)
+
+    expected_exercises = [ExerciseResponse.model_validate(item).model_dump(mode="json") for item in exercises]
+    expected_attempts = [AttemptResponse.model_validate(item).model_dump(mode="json") for item in attempts]
+
+    listed = client.get("/exercises", headers=headers)
+    assert listed.headers["content-type"] == "application/json"
+    assert listed.json() == expected_exercises
+    assert client.get("/attempts", headers=headers).json() == expected_attempts
+    assert client.get("/attempts/progress", headers=headers).json() == {
+        "attempts": expected_attempts,
+        "stats": {"total": 3, "correct": 2, "accuracy": 67},
+    }
+
+
+def test_vestibular_listing_matches_the_orm_output(client, db_session, auth_headers):
+    user = User(email="vest-rows@example.com", email_verified=True)
+    db_session.add(user)
+    db_session.flush()
+    db_session.add(
+        UserProfile(
+            id=user.id,
+            email=user.email,
+            plan="premium",
+            is_premium=True,
+            subscription_status="active",
+            payment_status="paid",
+        )
+    )
+    now = datetime.utcnow()
+    exercises = [
+        VestibularExercise(
+            question="Qual a capital do Brasil?",
+            options={"B": "Brasília", "A": "Rio de Janeiro"},
+            correct_answer="Brasília",
+            difficulty="medium",
+            created_at=now,
+        ),
+        VestibularExercise(
+            question="Quanto é 2 + 2?",
+            options=["3", "4"],
+            correct_answer="4",
+            difficulty="medium",
+            created_at=now - timedelta(minutes=1),
+        ),
+    ]
+    db_session.add_all(exercises)
+    db_session.commit()
+    headers = auth_headers(user)
+
+    response = client.get("/vestibular/exercises?difficulty=medium", headers=headers)
+
+    assert response.status_code == 200
+    assert response.json()["data"]["items"] == [
+        VestibularExerciseResponse.model_validate(item).model_dump(mode="json") for item in exercises
+    ]
+    assert response.json()["data"]["items"][0]["options"] == ["Rio de Janeiro", "Brasília"]
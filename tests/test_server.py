@@ -0,0 +1,98 @@
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.server import server_options
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _children(pid: int) -> list[int]:
+    with open(f"/proc/{pid}/task/{pid}/children") as handle:
+        return [int(child) for child in handle.read().split()]
+
+
+def test_server_options_preload_and_size_workers(monkeypatch):
+    monkeypatch.setattr("app.server.WEB_CONCURRENCY", 0)
+    monkeypatch.setattr("app.server.default_worker_count", lambda: 6)
+
+    options = server_options()
+
+    assert options["workers"] == 6
+    assert options["preload_app"] is True
+    assert options["worker_class"] == "uvicorn.workers.UvicornWorker"
+    assert server_options(workers=2, bind="127.0.0.1:9000")["workers"] == 2
+
+
+def test_preloaded_workers_serve_and_shut_down_gracefully(tmp_path):
+    port = _free_port()
+    log_path = tmp_path / "server.log"
+    log = log_path.open("wb")
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{tmp_path / 'server.db'}",
+        "AUTO_CREATE_TABLES": "true",
+        "AUTH_SWEEPER_ENABLED": "false",
+        "HOTMART_INBOX_WORKER_ENABLED": "false",
+        "GOOGLE_CLIENT_ID": "",
+    }
+    master = subprocess.Popen(
+        [sys.executable, "-m", "app.server", "--workers", "2", "--bind", f"127.0.0.1:{port}"],
+        cwd=ROOT,
+        env=env,
+        stdout=log,
+        stderr=subprocess.STDOUT,
+    )
+    try:
+        # A worker stopped before its lifespan finished exits as a boot error,
+        # so wait for both to be up before checking and shutting down.
+        for _ in range(600):
+            if log_path.read_bytes().count(b"Application startup complete") == 2:
+                break
+            time.sleep(0.05)
+        assert len(_children(master.pid)) == 2
+        for _ in range(200):
+            ready = httpx.get(f"http://127.0.0.1:{port}/ready", timeout=5)
+            if ready.status_code == 200:
+                break
+            time.sleep(0.05)
+        assert ready.status_code == 200
+    finally:
+        master.send_signal(signal.SIGTERM)
+        master.wait(timeout=60)
+        log.close()
+
+    output = log_path.read_bytes()
+    assert master.returncode == 0, output.decode()[-2000:]
+    assert output.count(b"Booting worker") == 2
+    # Created once in the master, not again in each worker's lifespan.
+    assert output.count(b"schema_create_all") == 1
+
+
+def test_lifespan_skips_create_all_after_preload(monkeypatch):
+    runs = []
+    monkeypatch.setattr("app.main.AUTO_CREATE_TABLES", True)
+    monkeypatch.setattr("app.main._create_tables", lambda: runs.append("lifespan"))
+
+    with TestClient(app):
+        pass
+    assert runs == ["lifespan"]
+
+    monkeypatch.setattr(app.state, "schema_created", True, raising=False)
+    with TestClient(app):
+        pass
+    assert runs == ["lifespan"]
@@ -0,0 +1,66 @@
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from app import main, warmup
+from app.main import app
+from app.models import Exercise
+from app.services.google_identity import JwksCache
+from app.hot_queries import registered_hot_queries
+from app.warmup import WarmupState
+
+
+def test_ready_waits_for_warmup_while_health_answers(db_session, monkeypatch):
+    db_session.add(
+        Exercise(subject="arithmetic", difficulty="easy", question="1+1", correct_answer="2", explanation="Soma.")
+    )
+    db_session.commit()
+    state = WarmupState()
+    monkeypatch.setattr(main, "warmup_state", state)
+    monkeypatch.setattr(warmup, "warmup_state", state)
+    monkeypatch.setattr(main, "WARMUP_ENABLED", True)
+    monkeypatch.setattr(warmup, "GOOGLE_CLIENT_ID", "client-id")
+    jwks = JwksCache("https://jwks.invalid/certs", fetcher=lambda url: ({"keys": [{"kid": "k1"}]}, 3600))
+    monkeypatch.setattr(warmup, "google_jwks_cache", jwks)
+
+    release = threading.Event()
+    preload_password_hashing = warmup.preload_password_hashing
+
+    def _blocked_password_hashing() -> None:
+        release.wait(timeout=10)
+        preload_password_hashing()
+
+    monkeypatch.setattr(warmup, "preload_password_hashing", _blocked_password_hashing)
+
+    with TestClient(app) as client:
+        assert client.get("/health").status_code == 200
+        pending = client.get("/ready")
+        assert pending.status_code == 503
+        assert pending.json()["status"] == "warming_up"
+
+        release.set()
+        for _ in range(500):
+            response = client.get("/ready")
+            if response.status_code == 200:
+                break
+            time.sleep(0.01)
+
+    assert response.status_code == 200
+    assert response.json()["steps"] == {
+        "pool": "ok",
+        "statements": "ok",
+        "password_hashing": "ok",
+        "openapi": "ok",
+        "google_jwks": "ok",
+    }
+    assert jwks.get_key("k1") == {"kid": "k1"}
+
+
+def test_routers_register_their_hot_queries():
+    assert set(registered_hot_queries()) == {
+        "current_user",
+        "latest_exercises",
+        "attempt_stats",
+        "vestibular_stats",
+    }